@@ -1,24 +1,35 @@
 import os
+from typing import Optional
 
 import aio_pika.abc
 import aioredis
 from aioredis import Redis
 from fastapi import Depends
-from httpx import AsyncClient
+from httpx import AsyncClient, Limits
 
 from logic.algorithm_decider import AlgorithmDecider
 from logic.algorithm_runner import AlgorithmRunner
 from logic.claims_service import ClaimsService
-from logic.cluster_availability_service import ClusterAvailabilityService
+from logic.cluster_availability_sampler import ClusterAvailabilitySampler
 from logic.consumer.solver_instance_consumer import SolverInstanceConsumer
 from logic.producer.solver_router_producer import SolverRouterProducer
 from logic.rabbit_channel_context import RabbitChannelContext
+from logic.rabbit_channel_pool import RabbitChannelPool
+from logic.redis_connection_pool import MeteredConnectionPool
 from logic.solution_maintainer import SolutionMaintainer
 from logic.solution_report_waiter import SolutionReportWaiter
+from logic.solution_reports_listener import SolutionReportsListener
 from logic.solution_reporter import SolutionReporter
+from logic.solve_cancellation_publisher import SolveCancellationPublisher
+from logic.solve_cancellations_listener import SolveCancellationsListener
+from logic.solve_jobs_service import SolveJobsService
+from logic.solve_jobs_tracker import SolveJobsTracker
 from logic.solver.solver_loader import SolverLoader
+from logic.solver_process_pool import SolverProcessPool
+from logic.subscription_score_cache import SubscriptionScoreCache
 from logic.subscriptions_service import SubscriptionsService
 from logic.suggested_solution_service import SuggestedSolutionsService
+from logic.suggestion_expiry_listener import SuggestionExpiryListener
 from logic.time_service import TimeService
 from models.config.configuration import Config, DeploymentType
 from models.knapsack_router_dto import RouterSolveRequest
@@ -42,34 +53,79 @@ def get_config() -> Config:
             port=int(os.getenv("REDIS_PORT", "6379")),
         ),
         solver_queue=os.getenv("SOLVER_QUEUE", "solver"),
+        solver_queue_max_priority=int(os.getenv("SOLVER_QUEUE_MAX_PRIORITY", "0")),
+        solver_queue_per_algorithm_class=os.getenv("SOLVER_QUEUE_PER_ALGORITHM_CLASS", "false").lower() == "true",
+        solver_consume_queues=[queue for queue in os.getenv("SOLVER_CONSUME_QUEUES", "").split(",") if queue],
         items_claim_hash=os.getenv("RUNNING_SOLVERS_CLAIM_HASH", "running_solvers_claims"),
-        suggested_solutions_claims_hash=os.getenv("SUGGESTED_SOLUTIONS_CLAIM_HASH", "suggested_solutions_claims"),
         running_knapsack_claims_hash=os.getenv("RUNNING_KNAPSACK_CLAIM_HASH", "running_knapsack_claims"),
         solutions_channel_prefix=os.getenv("SOLUTIONS_CHANNEL_PREFIX", "solutions"),
         wait_for_report_timeout_seconds=float(os.getenv("WAIT_FOR_REPORT_TIMEOUT_SECONDS", "60")),
+        solution_waiters_tracking_enabled=os.getenv("SOLUTION_WAITERS_TRACKING_ENABLED", "false").lower() == "true",
+        solve_cancellations_channel=os.getenv("SOLVE_CANCELLATIONS_CHANNEL", "solve_cancellations"),
+        solve_jobs_key_prefix=os.getenv("SOLVE_JOBS_KEY_PREFIX", "solve_jobs"),
+        solve_job_ttl_seconds=int(os.getenv("SOLVE_JOB_TTL_SECONDS", "600")),
+        solve_batch_max_size=int(os.getenv("SOLVE_BATCH_MAX_SIZE", "100")),
+        suggestions_key_prefix=os.getenv("SUGGESTIONS_KEY_PREFIX", "solution_suggestion"),
         suggested_solutions_hash=os.getenv("SOLUTION_SUGGESTIONS_HASH_NAME", "solution_suggestions"),
         accepted_solutions_list=os.getenv("ACCEPTED_SOLUTION_HASH_NAME", "accepted_solutions"),
+        suggestions_expiry_index=os.getenv("SUGGESTIONS_EXPIRY_INDEX_NAME", "solution_suggestions_expiry"),
+        accepted_solutions_index=os.getenv("ACCEPTED_SOLUTIONS_INDEX_NAME", "accepted_solutions_by_time"),
         clean_old_suggestion_interval_seconds=int(os.getenv("CLEAN_OLD_SUGGESTION_INTERVAL_SECONDS", "30")),
+        clean_old_suggestions_batch_size=int(os.getenv("CLEAN_OLD_SUGGESTIONS_BATCH_SIZE", "100")),
         clean_old_accepted_solutions_interval_seconds=int(
             os.getenv("CLEAN_OLD_ACCEPTED_SOLUTIONS_INTERVAL_SECONDS", f"{60 * 30}")
         ),
         suggestion_ttl_seconds=int(os.getenv("SUGGESTION_TTL_SECONDS", "60")),
         accepted_solution_ttl_seconds=int(os.getenv("ACCEPTED_SOLUTION_TTL_SECONDS", f"{60 * 60 * 4}")),
-        accepted_solutions_prefect_count=int(os.getenv("ACCEPTED_SOLUTIONS_PREFECT_COUNT", "5")),
+        accepted_solutions_prefect_count=int(os.getenv("ACCEPTED_SOLUTIONS_PREFECT_COUNT", "500")),
         solvers_moderate_busy_threshold=int(os.getenv("SOLVERS_MODERATE_BUSY_THRESHOLD", "40")),
         solvers_busy_threshold=int(os.getenv("SOLVERS_BUSY_THRESHOLD", "60")),
         solvers_very_busy_threshold=int(os.getenv("SOLVERS_VERY_BUSY_THRESHOLD", "100")),
         genetic_light_generations=int(os.getenv("GENETIC_LIGHT_GENERATIONS", "10")),
         genetic_light_mutation_probability=float(os.getenv("GENETIC_LIGHT_MUTATION_PROBABILITY", "0.2")),
         genetic_light_population=int(os.getenv("GENETIC_LIGHT_POPULATION", "10")),
-        genetic_heavy_generations=int(os.getenv("GENETIC_HEAVY_GENERATIONS", "40")),
+        genetic_heavy_generations=int(os.getenv("GENETIC_HEAVY_GENERATIONS", "400")),
         genetic_heavy_mutation_probability=float(os.getenv("GENETIC_HEAVY_MUTATION_PROBABILITY", "0.2")),
-        genetic_heavy_population=int(os.getenv("GENETIC_HEAVY_POPULATION", "30")),
+        genetic_heavy_population=int(os.getenv("GENETIC_HEAVY_POPULATION", "100")),
         algo_decider_branch_and_bound_max_items=int(os.getenv("ALGO_DECIDER_BRANCH_AND_BOUND_MAX_ITEMS", "15")),
         algo_decider_dynamic_programming_max_iterations=int(
-            os.getenv("ALGO_DECIDER_DYNAMIC_PROGRAMMING_MAX_ITERATIONS", "10000")
+            os.getenv("ALGO_DECIDER_DYNAMIC_PROGRAMMING_MAX_ITERATIONS", "2000000000")
         ),
+        algo_decider_dynamic_programming_max_table_bytes=int(
+            os.getenv("ALGO_DECIDER_DYNAMIC_PROGRAMMING_MAX_TABLE_BYTES", f"{64 * 1024 * 1024}")
+        ),
+        solver_request_budget_seconds=float(os.getenv("SOLVER_REQUEST_BUDGET_SECONDS", "50")),
+        solver_process_pool_workers=int(os.getenv("SOLVER_PROCESS_POOL_WORKERS", f"{os.cpu_count() or 1}")),
+        solver_process_pool_max_tasks_per_worker=int(os.getenv("SOLVER_PROCESS_POOL_MAX_TASKS_PER_WORKER", "50")),
+        solver_process_pool_timeout_grace_seconds=float(os.getenv("SOLVER_PROCESS_POOL_TIMEOUT_GRACE_SECONDS", "5")),
+        solver_portfolio_mode=os.getenv("SOLVER_PORTFOLIO_MODE", "true").lower() == "true",
+        solver_prefetch_count=int(os.getenv("SOLVER_PREFETCH_COUNT", "4")),
+        solver_max_concurrent_messages=int(os.getenv("SOLVER_MAX_CONCURRENT_MESSAGES", "4")),
+        redis_pool_max_connections=int(os.getenv("REDIS_POOL_MAX_CONNECTIONS", "200")),
+        redis_pool_checkout_timeout_seconds=float(os.getenv("REDIS_POOL_CHECKOUT_TIMEOUT_SECONDS", "5")),
+        redis_pool_health_check_interval_seconds=float(os.getenv("REDIS_POOL_HEALTH_CHECK_INTERVAL_SECONDS", "30")),
+        redis_pool_metrics_enabled=os.getenv("REDIS_POOL_METRICS_ENABLED", "false").lower() == "true",
+        redis_pool_slow_checkout_seconds=float(os.getenv("REDIS_POOL_SLOW_CHECKOUT_SECONDS", "0.05")),
+        redis_pool_metrics_log_interval_seconds=float(os.getenv("REDIS_POOL_METRICS_LOG_INTERVAL_SECONDS", "60")),
+        rabbit_channel_pool_max_channels=int(os.getenv("RABBIT_CHANNEL_POOL_MAX_CHANNELS", "32")),
+        rabbit_channel_pool_metrics_enabled=os.getenv("RABBIT_CHANNEL_POOL_METRICS_ENABLED", "false").lower() == "true",
+        rabbit_channel_pool_metrics_log_interval_seconds=float(
+            os.getenv("RABBIT_CHANNEL_POOL_METRICS_LOG_INTERVAL_SECONDS", "60")
+        ),
+        cluster_availability_sample_interval_seconds=float(
+            os.getenv("CLUSTER_AVAILABILITY_SAMPLE_INTERVAL_SECONDS", "1")
+        ),
+        cluster_availability_smoothing_factor=float(os.getenv("CLUSTER_AVAILABILITY_SMOOTHING_FACTOR", "0.3")),
+        cluster_availability_hysteresis_ratio=float(os.getenv("CLUSTER_AVAILABILITY_HYSTERESIS_RATIO", "0.2")),
         subscription_backend_base_url=os.getenv("SUBSCRIPTION_BACKEND_BASE_URL"),
+        subscription_client_max_connections=int(os.getenv("SUBSCRIPTION_CLIENT_MAX_CONNECTIONS", "100")),
+        subscription_client_max_keepalive_connections=int(
+            os.getenv("SUBSCRIPTION_CLIENT_MAX_KEEPALIVE_CONNECTIONS", "20")
+        ),
+        subscription_cache_max_entries=int(os.getenv("SUBSCRIPTION_CACHE_MAX_ENTRIES", "10000")),
+        subscription_cache_ttl_seconds=float(os.getenv("SUBSCRIPTION_CACHE_TTL_SECONDS", "60")),
+        subscription_cache_not_found_ttl_seconds=float(os.getenv("SUBSCRIPTION_CACHE_NOT_FOUND_TTL_SECONDS", "10")),
+        subscription_cache_stale_seconds=float(os.getenv("SUBSCRIPTION_CACHE_STALE_SECONDS", "300")),
     )
 
 
@@ -77,28 +133,97 @@ def get_solver_loader(config: Config = get_config()):
     return SolverLoader(config)
 
 
-def get_algorithm_runner(solver_loader=get_solver_loader()) -> AlgorithmRunner:
-    return AlgorithmRunner(solver_loader)
+def get_solver_process_pool(config: Config = get_config()) -> Optional[SolverProcessPool]:
+    if config.solver_process_pool_workers <= 0:
+        return None
+    return SolverProcessPool(
+        config,
+        config.solver_process_pool_workers,
+        config.solver_process_pool_max_tasks_per_worker,
+        config.solver_process_pool_timeout_grace_seconds,
+    )
+
+
+def get_algorithm_runner(
+    solver_loader=get_solver_loader(), config: Config = get_config(), process_pool=get_solver_process_pool()
+) -> AlgorithmRunner:
+    return AlgorithmRunner(
+        solver_loader, config.solver_request_budget_seconds, process_pool, config.solver_portfolio_mode
+    )
 
 
 def get_rabbit_channel_context(config: Config = get_config()) -> RabbitChannelContext:
     return RabbitChannelContext(config.rabbit_connection_params)
 
 
+_rabbit_channel_pool: Optional[RabbitChannelPool] = None
+
+
+def open_rabbit_channel_pool(config: Config = get_config()) -> RabbitChannelPool:
+    global _rabbit_channel_pool
+    if not _rabbit_channel_pool:
+        _rabbit_channel_pool = RabbitChannelPool(
+            config.rabbit_connection_params,
+            config.rabbit_channel_pool_max_channels,
+            config.rabbit_channel_pool_metrics_enabled,
+            config.rabbit_channel_pool_metrics_log_interval_seconds,
+        )
+    return _rabbit_channel_pool
+
+
+async def close_rabbit_channel_pool() -> None:
+    global _rabbit_channel_pool
+    if _rabbit_channel_pool:
+        await _rabbit_channel_pool.close()
+        _rabbit_channel_pool = None
+
+
 async def get_rabbit_channel_api(config: Config = Depends(get_config)) -> aio_pika.abc.AbstractChannel:
-    ctx = RabbitChannelContext(config.rabbit_connection_params)
-    async with ctx as channel:
+    async with open_rabbit_channel_pool(config).acquire() as channel:
         yield channel
 
 
 def get_solver_router_producer_api(
     rabbit_channel: aio_pika.abc.AbstractChannel = Depends(get_rabbit_channel_api), config: Config = Depends(get_config)
 ) -> SolverRouterProducer:
-    return SolverRouterProducer(rabbit_channel, config.solver_queue)
+    return SolverRouterProducer(
+        rabbit_channel,
+        config.solver_queue,
+        config.solver_queue_max_priority,
+        config.solver_queue_per_algorithm_class,
+        config.wait_for_report_timeout_seconds,
+    )
+
+
+_redis_api_pool: Optional[MeteredConnectionPool] = None
+
+
+def open_redis_api_pool(config: Config = get_config()) -> MeteredConnectionPool:
+    global _redis_api_pool
+    if not _redis_api_pool:
+        host, port = config.redis_connection_params
+        _redis_api_pool = MeteredConnectionPool.from_url(
+            f"redis://{host}:{port}",
+            max_connections=config.redis_pool_max_connections,
+            timeout=config.redis_pool_checkout_timeout_seconds,
+            health_check_interval=config.redis_pool_health_check_interval_seconds,
+            metrics_enabled=config.redis_pool_metrics_enabled,
+            slow_checkout_seconds=config.redis_pool_slow_checkout_seconds,
+            metrics_log_interval_seconds=config.redis_pool_metrics_log_interval_seconds,
+        )
+    return _redis_api_pool
+
+
+async def close_redis_api_pool() -> None:
+    global _redis_api_pool
+    if _redis_api_pool:
+        await _redis_api_pool.disconnect()
+        _redis_api_pool = None
 
 
 def get_redis_api(config: Config = Depends(get_config)) -> Redis:
-    return get_redis(config)
+    # The pool is opened on application startup, opening it here covers clients that skip the lifespan events
+    return Redis(connection_pool=open_redis_api_pool(config))
 
 
 def get_claims_service_api(redis: Redis = Depends(get_redis_api)) -> ClaimsService:
@@ -111,32 +236,88 @@ def get_redis(config: Config = get_config()) -> Redis:
 
 
 def get_claims_service(redis: Redis = get_redis(), config: Config = get_config()) -> ClaimsService:
-    return ClaimsService(
-        redis, config.items_claim_hash, config.suggested_solutions_claims_hash, config.running_knapsack_claims_hash
-    )
+    return ClaimsService(redis, config.items_claim_hash, config.running_knapsack_claims_hash)
+
+
+_subscriptions_client: Optional[AsyncClient] = None
+
+
+def open_subscriptions_client(config: Config = get_config()) -> AsyncClient:
+    global _subscriptions_client
+    if not _subscriptions_client:
+        # Shared so connections to the subscriptions server are kept alive between requests
+        _subscriptions_client = AsyncClient(
+            base_url=config.subscription_backend_base_url,
+            limits=Limits(
+                max_connections=config.subscription_client_max_connections,
+                max_keepalive_connections=config.subscription_client_max_keepalive_connections,
+            ),
+        )
+    return _subscriptions_client
+
+
+async def close_subscriptions_client() -> None:
+    global _subscriptions_client
+    if _subscriptions_client:
+        await _subscriptions_client.aclose()
+        _subscriptions_client = None
+
+
+_subscription_score_cache: Optional[SubscriptionScoreCache] = None
+
+
+def get_subscription_score_cache(config: Config = get_config()) -> Optional[SubscriptionScoreCache]:
+    global _subscription_score_cache
+    if config.subscription_cache_max_entries <= 0:
+        return None
+    if not _subscription_score_cache:
+        _subscription_score_cache = SubscriptionScoreCache(
+            config.subscription_cache_max_entries,
+            config.subscription_cache_ttl_seconds,
+            config.subscription_cache_not_found_ttl_seconds,
+            config.subscription_cache_stale_seconds,
+        )
+    return _subscription_score_cache
 
 
 def get_subscriptions_service(config: Config = Depends(get_config)) -> SubscriptionsService:
-    client = AsyncClient(base_url=config.subscription_backend_base_url)
-    return SubscriptionsService(client)
+    return SubscriptionsService(open_subscriptions_client(config), get_subscription_score_cache(config))
 
 
-def get_cluster_availability_service_api(
-    rabbit_channel: aio_pika.abc.AbstractChannel = Depends(get_rabbit_channel_api), config: Config = Depends(get_config)
-) -> ClusterAvailabilityService:
-    return ClusterAvailabilityService(rabbit_channel, config)
+_cluster_availability_samplers: dict[str, ClusterAvailabilitySampler] = {}
+
+
+async def open_cluster_availability_sampler(config: Config = get_config()) -> ClusterAvailabilitySampler:
+    # One sampler per solver queue keeps the queue depth polling off the request path
+    sampler = _cluster_availability_samplers.get(config.solver_queue)
+    if not sampler:
+        sampler = ClusterAvailabilitySampler(open_rabbit_channel_pool(config), config)
+        _cluster_availability_samplers[config.solver_queue] = sampler
+    await sampler.start()
+    return sampler
+
+
+async def close_cluster_availability_samplers() -> None:
+    while _cluster_availability_samplers:
+        _, sampler = _cluster_availability_samplers.popitem()
+        await sampler.stop()
+
+
+async def get_cluster_availability_sampler_api(config: Config = Depends(get_config)) -> ClusterAvailabilitySampler:
+    return await open_cluster_availability_sampler(config)
 
 
 def get_algorithm_decider_api(
     subscriptions_service: SubscriptionsService = Depends(get_subscriptions_service),
-    cluster_availability_service: ClusterAvailabilityService = Depends(get_cluster_availability_service_api),
+    cluster_availability_sampler: ClusterAvailabilitySampler = Depends(get_cluster_availability_sampler_api),
     config: Config = Depends(get_config),
 ) -> AlgorithmDecider:
     return AlgorithmDecider(
         subscriptions_service,
-        cluster_availability_service,
+        cluster_availability_sampler,
         config.algo_decider_branch_and_bound_max_items,
         config.algo_decider_dynamic_programming_max_iterations,
+        config.algo_decider_dynamic_programming_max_table_bytes,
     )
 
 
@@ -151,7 +332,15 @@ def get_suggested_solutions_service(
     config: Config = get_config(),
 ) -> SuggestedSolutionsService:
     return SuggestedSolutionsService(
-        redis, claims_service, time_service, config.suggested_solutions_hash, config.accepted_solutions_list
+        redis,
+        claims_service,
+        time_service,
+        config.suggested_solutions_hash,
+        config.accepted_solutions_list,
+        config.suggestions_expiry_index,
+        config.accepted_solutions_index,
+        config.suggestions_key_prefix,
+        config.suggestion_ttl_seconds,
     )
 
 
@@ -162,7 +351,15 @@ def get_suggested_solutions_service_api(
     config: Config = Depends(get_config),
 ) -> SuggestedSolutionsService:
     return SuggestedSolutionsService(
-        redis, claims_service, time_service, config.suggested_solutions_hash, config.accepted_solutions_list
+        redis,
+        claims_service,
+        time_service,
+        config.suggested_solutions_hash,
+        config.accepted_solutions_list,
+        config.suggestions_expiry_index,
+        config.accepted_solutions_index,
+        config.suggestions_key_prefix,
+        config.suggestion_ttl_seconds,
     )
 
 
@@ -174,14 +371,75 @@ def get_solution_reporter(
     return SolutionReporter(redis, config.solutions_channel_prefix, suggested_solutions_service)
 
 
-def get_solution_report_waiter_api_route_solve(
-    request: RouterSolveRequest,
-    redis: Redis = Depends(get_redis_api),
-    config: Config = Depends(get_config),
+_solution_reports_listeners: dict[str, SolutionReportsListener] = {}
+
+
+async def open_solution_reports_listener(config: Config = get_config()) -> SolutionReportsListener:
+    # One pattern subscription per channel prefix serves every waiting request of this process
+    listener = _solution_reports_listeners.get(config.solutions_channel_prefix)
+    if not listener:
+        listener = SolutionReportsListener(
+            Redis(connection_pool=open_redis_api_pool(config)),
+            config.solutions_channel_prefix,
+            waiters_ttl_seconds=(
+                config.wait_for_report_timeout_seconds if config.solution_waiters_tracking_enabled else None
+            ),
+        )
+        _solution_reports_listeners[config.solutions_channel_prefix] = listener
+    await listener.start()
+    return listener
+
+
+async def close_solution_reports_listeners() -> None:
+    while _solution_reports_listeners:
+        _, listener = _solution_reports_listeners.popitem()
+        await listener.stop()
+
+
+async def get_solution_reports_listener_api(config: Config = Depends(get_config)) -> SolutionReportsListener:
+    return await open_solution_reports_listener(config)
+
+
+async def get_solution_report_waiter_api_route_solve(
+    request: RouterSolveRequest, config: Config = Depends(get_config)
 ) -> SolutionReportWaiter:
-    return SolutionReportWaiter(
-        redis, config.solutions_channel_prefix, request.knapsack_id, config.wait_for_report_timeout_seconds
-    )
+    listener = await open_solution_reports_listener(config)
+    return SolutionReportWaiter(listener, request.knapsack_id, config.wait_for_report_timeout_seconds)
+
+
+def get_solve_jobs_service_api(
+    redis: Redis = Depends(get_redis_api), config: Config = Depends(get_config)
+) -> SolveJobsService:
+    return SolveJobsService(redis, config.solve_jobs_key_prefix, config.solve_job_ttl_seconds)
+
+
+_solve_jobs_tracker: Optional[SolveJobsTracker] = None
+
+
+def get_solve_jobs_tracker() -> SolveJobsTracker:
+    global _solve_jobs_tracker
+    if not _solve_jobs_tracker:
+        _solve_jobs_tracker = SolveJobsTracker()
+    return _solve_jobs_tracker
+
+
+async def close_solve_jobs_tracker() -> None:
+    global _solve_jobs_tracker
+    if _solve_jobs_tracker:
+        await _solve_jobs_tracker.close()
+        _solve_jobs_tracker = None
+
+
+def get_solve_cancellations_listener(
+    redis_client: Redis = get_redis(), config: Config = get_config()
+) -> SolveCancellationsListener:
+    return SolveCancellationsListener(redis_client, config.solve_cancellations_channel)
+
+
+def get_solve_cancellation_publisher_api(
+    redis: Redis = Depends(get_redis_api), config: Config = Depends(get_config)
+) -> SolveCancellationPublisher:
+    return SolveCancellationPublisher(redis, config.solve_cancellations_channel)
 
 
 def get_solver_consumer(
@@ -190,17 +448,31 @@ def get_solver_consumer(
     claims_service=get_claims_service(),
     solution_reporter=get_solution_reporter(),
     suggested_solution_service=get_suggested_solutions_service(),
+    cancellations_listener=get_solve_cancellations_listener(),
+    config: Config = get_config(),
 ) -> SolverInstanceConsumer:
     return SolverInstanceConsumer(
-        rabbit_channel_context, algo_runner, claims_service, solution_reporter, suggested_solution_service
+        rabbit_channel_context,
+        algo_runner,
+        claims_service,
+        solution_reporter,
+        suggested_solution_service,
+        config,
+        cancellations_listener,
     )
 
 
 def get_solution_maintainer(
     suggested_solution_service: SuggestedSolutionsService = get_suggested_solutions_service(),
-    redis_client: Redis = get_redis(),
     time_service: TimeService = get_time_service(),
-    claims_service: ClaimsService = get_claims_service(),
     config: Config = get_config(),
 ) -> SolutionMaintainer:
-    return SolutionMaintainer(suggested_solution_service, redis_client, time_service, claims_service, config)
+    return SolutionMaintainer(suggested_solution_service, time_service, config)
+
+
+def get_suggestion_expiry_listener(
+    redis_client: Redis = get_redis(),
+    suggested_solution_service: SuggestedSolutionsService = get_suggested_solutions_service(),
+    config: Config = get_config(),
+) -> SuggestionExpiryListener:
+    return SuggestionExpiryListener(redis_client, suggested_solution_service, config.clean_old_suggestions_batch_size)
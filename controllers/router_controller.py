@@ -1,8 +1,11 @@
+import asyncio
 import http
+from contextlib import AsyncExitStack
 from datetime import timedelta
+from typing import Optional, AsyncIterator
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from component_factory import (
     get_solver_router_producer_api,
@@ -11,12 +14,20 @@ from component_factory import (
     get_solution_report_waiter_api_route_solve,
     get_claims_service_api,
     get_config,
+    get_solve_jobs_service_api,
+    get_solve_jobs_tracker,
+    get_solution_reports_listener_api,
+    get_solve_cancellation_publisher_api,
 )
 from logger import logger
 from logic.algorithm_decider import AlgorithmDecider
 from logic.claims_service import ClaimsService
 from logic.producer.solver_router_producer import SolverRouterProducer
 from logic.solution_report_waiter import SolutionReportWaiter
+from logic.solution_reports_listener import SolutionReportsListener
+from logic.solve_cancellation_publisher import SolveCancellationPublisher
+from logic.solve_jobs_service import SolveJobsService
+from logic.solve_jobs_tracker import SolveJobsTracker
 from logic.suggested_solution_service import SuggestedSolutionsService
 from models.config.configuration import Config
 from models.knapsack_router_dto import (
@@ -26,22 +37,31 @@ from models.knapsack_router_dto import (
     RejectSolutionResponse,
     RejectSolutionsRequest,
     ItemClaimedResponse,
+    RouterSolveAsyncResponse,
+    SolveJobResponse,
+    RouterSolveBatchRequest,
+    RouterSolveBatchResponse,
+    RouterSolveBatchResult,
 )
 from models.knapsack_solver_instance_dto import SolverInstanceRequest
 from models.solution import SolutionReport, SolutionReportCause, SuggestedSolution
-from models.suggested_solutions_actions_statuses import AcceptResult, RejectResult
+from models.solve_job import SolveJob, SolveJobStatus
 
 router = APIRouter()
 
+CLIENT_DISCONNECT_POLL_INTERVAL_SECONDS = 0.5
+
 
 @router.post("/solve")
 async def route_solve(
     request: RouterSolveRequest,
+    http_request: Request,
     algorithm_decider: AlgorithmDecider = Depends(get_algorithm_decider_api),
     solve_request_producer: SolverRouterProducer = Depends(get_solver_router_producer_api),
     solution_reports_waiter: SolutionReportWaiter = Depends(get_solution_report_waiter_api_route_solve),
     suggested_solution_service: SuggestedSolutionsService = Depends(get_suggested_solutions_service_api),
     config: Config = Depends(get_config),
+    solve_cancellation_publisher: SolveCancellationPublisher = Depends(get_solve_cancellation_publisher_api),
 ) -> SuggestedSolution:
     if not request.items:
         logger.info(f"Got no items request for {request.knapsack_id}. Aborting.")
@@ -50,7 +70,14 @@ async def route_solve(
 
     async with solution_reports_waiter, solve_request_producer:
         await solve_request_producer.produce_solver_instance_request(solver_instance_request)
-        report: SolutionReport = await solution_reports_waiter.wait_for_solution_report()
+        # Solvers report every solution as it is found, a client deadline answers with the best one found by then
+        report: Optional[SolutionReport] = await _wait_for_report_unless_disconnected(
+            http_request, solution_reports_waiter, request.deadline_seconds
+        )
+        if not report:
+            logger.info(f"Client of {request.knapsack_id} disconnected, cancelling its solve")
+            await solve_cancellation_publisher.cancel(request.knapsack_id)
+            report = SolutionReport(cause=SolutionReportCause.CANCELLED)
 
     if report.cause == SolutionReportCause.NO_ITEM_CLAIMED:
         logger.info(f"Could not claim any items for {request.knapsack_id}. Given items: {request.items}")
@@ -60,12 +87,220 @@ async def route_solve(
         logger.warn(f"Failed solving due to: {report.cause}")
         return _generate_solve_fail_error_response(report)
 
-    res = await suggested_solution_service.get_solutions(request.knapsack_id)
+    return await _get_suggested_solution(request.knapsack_id, suggested_solution_service, config)
+
+
+async def _wait_for_report_unless_disconnected(
+    http_request: Request, solution_reports_waiter: SolutionReportWaiter, answer_within_seconds: Optional[float]
+) -> Optional[SolutionReport]:
+    report_task = asyncio.create_task(solution_reports_waiter.wait_for_solution_report(answer_within_seconds))
+    try:
+        while True:
+            done, _ = await asyncio.wait({report_task}, timeout=CLIENT_DISCONNECT_POLL_INTERVAL_SECONDS)
+            if done:
+                return report_task.result()
+            if await http_request.is_disconnected():
+                return None
+    finally:
+        report_task.cancel()
+
+
+@router.post("/solve-async", status_code=http.HTTPStatus.ACCEPTED)
+async def route_solve_async(
+    request: RouterSolveRequest,
+    algorithm_decider: AlgorithmDecider = Depends(get_algorithm_decider_api),
+    solve_request_producer: SolverRouterProducer = Depends(get_solver_router_producer_api),
+    solution_reports_waiter: SolutionReportWaiter = Depends(get_solution_report_waiter_api_route_solve),
+    solve_jobs_service: SolveJobsService = Depends(get_solve_jobs_service_api),
+    solve_jobs_tracker: SolveJobsTracker = Depends(get_solve_jobs_tracker),
+) -> RouterSolveAsyncResponse:
+    if not request.items:
+        logger.info(f"Got no items request for {request.knapsack_id}. Aborting.")
+        return await no_items_claimed_response()
+    solver_instance_request: SolverInstanceRequest = await _generate_solve_request(algorithm_decider, request)
+    job = await solve_jobs_service.create_job(request.knapsack_id)
+
+    async with AsyncExitStack() as waiter_exit_stack:
+        await waiter_exit_stack.enter_async_context(solution_reports_waiter)
+        async with solve_request_producer:
+            await solve_request_producer.produce_solver_instance_request(solver_instance_request)
+        # The report is awaited in the background, the waiter is released once the job is completed
+        solve_jobs_tracker.track(job, solution_reports_waiter, waiter_exit_stack.pop_all(), solve_jobs_service)
+
+    return RouterSolveAsyncResponse(job_id=job.job_id)
+
+
+@router.get("/solve-jobs/{job_id}")
+async def get_solve_job(
+    job_id: str,
+    solve_jobs_service: SolveJobsService = Depends(get_solve_jobs_service_api),
+    suggested_solution_service: SuggestedSolutionsService = Depends(get_suggested_solutions_service_api),
+    config: Config = Depends(get_config),
+) -> SolveJobResponse:
+    job = await solve_jobs_service.get_job(job_id)
+    if not job:
+        return _solve_job_not_found_response(job_id)
+    return await _generate_solve_job_response(job, job.report, suggested_solution_service, config)
+
+
+@router.get("/solve-jobs/{job_id}/events")
+async def stream_solve_job_events(
+    job_id: str,
+    solve_jobs_service: SolveJobsService = Depends(get_solve_jobs_service_api),
+    solution_reports_listener: SolutionReportsListener = Depends(get_solution_reports_listener_api),
+    suggested_solution_service: SuggestedSolutionsService = Depends(get_suggested_solutions_service_api),
+    config: Config = Depends(get_config),
+):
+    job = await solve_jobs_service.get_job(job_id)
+    if not job:
+        return _solve_job_not_found_response(job_id)
+    waiter = SolutionReportWaiter(solution_reports_listener, job.knapsack_id, config.wait_for_report_timeout_seconds)
+    return StreamingResponse(
+        _generate_solve_job_events(job, waiter, solve_jobs_service, suggested_solution_service, config),
+        media_type="text/event-stream",
+    )
+
+
+async def _generate_solve_job_events(
+    job: SolveJob,
+    solution_reports_waiter: SolutionReportWaiter,
+    solve_jobs_service: SolveJobsService,
+    suggested_solution_service: SuggestedSolutionsService,
+    config: Config,
+) -> AsyncIterator[str]:
+    async with solution_reports_waiter:
+        # Read again once waiting, so a job completed in between is not waited on
+        job = await solve_jobs_service.get_job(job.job_id) or job
+        if job.report:
+            yield _server_sent_event(
+                await _generate_solve_job_response(job, job.report, suggested_solution_service, config)
+            )
+            return
+        yield _server_sent_event(SolveJobResponse(job_id=job.job_id, status=SolveJobStatus.PENDING))
+        # Every solution found before the final report is streamed as an improvement of the pending job
+        async for report in solution_reports_waiter.iter_solution_reports():
+            response = await _generate_solve_job_response(job, report, suggested_solution_service, config)
+            if not report.is_final:
+                response.status = SolveJobStatus.PENDING
+            yield _server_sent_event(response)
+
+
+def _server_sent_event(response: SolveJobResponse) -> str:
+    return f"event: {response.status.value}\ndata: {response.json(by_alias=True)}\n\n"
+
+
+async def _generate_solve_job_response(
+    job: SolveJob,
+    report: Optional[SolutionReport],
+    suggested_solution_service: SuggestedSolutionsService,
+    config: Config,
+) -> SolveJobResponse:
+    if not report:
+        return SolveJobResponse(job_id=job.job_id, status=SolveJobStatus.PENDING)
+    suggested_solution = None
+    if report.cause == SolutionReportCause.SOLUTION_FOUND:
+        suggested_solution = await _get_suggested_solution(job.knapsack_id, suggested_solution_service, config)
+    return SolveJobResponse(
+        job_id=job.job_id, status=SolveJobStatus.DONE, cause=report.cause, suggested_solution=suggested_solution
+    )
+
+
+def _solve_job_not_found_response(job_id: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=http.HTTPStatus.NOT_FOUND, content={"message": f"Solve job {job_id} does not exist or expired"}
+    )
+
+
+async def _get_suggested_solution(
+    knapsack_id: str, suggested_solution_service: SuggestedSolutionsService, config: Config
+) -> Optional[SuggestedSolution]:
+    return _prepare_suggested_solution(await suggested_solution_service.get_solutions(knapsack_id), config)
+
+
+def _prepare_suggested_solution(res: Optional[SuggestedSolution], config: Config) -> Optional[SuggestedSolution]:
+    if not res:
+        return None
     res.solutions = {sol_id: sol for sol_id, sol in res.solutions.items() if sol.items}
     res = add_expiry(res, config.suggestion_ttl_seconds)
     return res
 
 
+@router.post("/solve-batch")
+async def route_solve_batch(
+    request: RouterSolveBatchRequest,
+    algorithm_decider: AlgorithmDecider = Depends(get_algorithm_decider_api),
+    solve_request_producer: SolverRouterProducer = Depends(get_solver_router_producer_api),
+    solution_reports_listener: SolutionReportsListener = Depends(get_solution_reports_listener_api),
+    suggested_solution_service: SuggestedSolutionsService = Depends(get_suggested_solutions_service_api),
+    config: Config = Depends(get_config),
+) -> RouterSolveBatchResponse:
+    knapsack_ids = [r.knapsack_id for r in request.requests]
+    if len(knapsack_ids) > config.solve_batch_max_size or len(set(knapsack_ids)) != len(knapsack_ids):
+        return JSONResponse(
+            status_code=http.HTTPStatus.BAD_REQUEST,
+            content={"message": f"A batch holds up to {config.solve_batch_max_size} distinct knapsacks"},
+        )
+    solvable_requests = [r for r in request.requests if r.items]
+    decisions = await algorithm_decider.decide_many(
+        [(r.knapsack_id, len(r.items), r.volume) for r in solvable_requests]
+    )
+    # A knapsack that could not be decided or published fails on its own, the rest of the batch goes on
+    cause_by_knapsack: dict[str, SolutionReportCause] = {}
+    decided_requests: list[RouterSolveRequest] = []
+    solver_instance_requests: list[SolverInstanceRequest] = []
+    for r, decision in zip(solvable_requests, decisions):
+        if isinstance(decision, BaseException):
+            logger.error(f"Failed deciding algorithms for {r.knapsack_id}", exc_info=decision)
+            cause_by_knapsack[r.knapsack_id] = SolutionReportCause.GOT_EXCEPTION
+            continue
+        decided_requests.append(r)
+        solver_instance_requests.append(
+            SolverInstanceRequest(
+                items=r.items,
+                volume=r.volume,
+                knapsack_id=r.knapsack_id,
+                algorithms=decision.algorithms,
+                subscription_score=decision.subscription_score,
+            )
+        )
+    waiters = [
+        SolutionReportWaiter(solution_reports_listener, r.knapsack_id, config.wait_for_report_timeout_seconds)
+        for r in decided_requests
+    ]
+
+    async with AsyncExitStack() as waiters_exit_stack:
+        for waiter in waiters:
+            await waiters_exit_stack.enter_async_context(waiter)
+        async with solve_request_producer:
+            publish_errors = await solve_request_producer.produce_solver_instance_requests(solver_instance_requests)
+        published: list[tuple[RouterSolveRequest, SolutionReportWaiter]] = []
+        for r, waiter, error in zip(decided_requests, waiters, publish_errors):
+            if error:
+                logger.error(f"Failed publishing solve request of {r.knapsack_id}", exc_info=error)
+                cause_by_knapsack[r.knapsack_id] = SolutionReportCause.GOT_EXCEPTION
+            else:
+                published.append((r, waiter))
+        reports: list[SolutionReport] = await asyncio.gather(
+            *(waiter.wait_for_solution_report(r.deadline_seconds) for r, waiter in published)
+        )
+
+    cause_by_knapsack.update({r.knapsack_id: report.cause for (r, _), report in zip(published, reports)})
+    # Requests without items are answered the way /solve answers them, as if no item could be claimed
+    solved_knapsack_ids = [k for k, cause in cause_by_knapsack.items() if cause == SolutionReportCause.SOLUTION_FOUND]
+    suggestions = await suggested_solution_service.get_solutions_many(solved_knapsack_ids)
+    suggestion_by_knapsack = dict(zip(solved_knapsack_ids, suggestions))
+    return RouterSolveBatchResponse(
+        results=[
+            RouterSolveBatchResult(
+                knapsack_id=knapsack_id,
+                cause=cause_by_knapsack.get(knapsack_id, SolutionReportCause.NO_ITEM_CLAIMED),
+                suggested_solution=_prepare_suggested_solution(suggestion_by_knapsack.get(knapsack_id), config),
+            )
+            for knapsack_id in knapsack_ids
+        ]
+    )
+
+
 def add_expiry(res: SuggestedSolution, suggestion_ttl_seconds: int):
     res.expires_at = res.time + timedelta(seconds=suggestion_ttl_seconds)
     return res
@@ -81,9 +316,13 @@ async def no_items_claimed_response():
 async def _generate_solve_request(
     algorithm_decider: AlgorithmDecider, request: RouterSolveRequest
 ) -> SolverInstanceRequest:
-    requested_algorithms = await algorithm_decider.decide(request.knapsack_id, len(request.items), request.volume)
+    decision = await algorithm_decider.decide(request.knapsack_id, len(request.items), request.volume)
     solver_instance_request = SolverInstanceRequest(
-        items=request.items, volume=request.volume, knapsack_id=request.knapsack_id, algorithms=requested_algorithms
+        items=request.items,
+        volume=request.volume,
+        knapsack_id=request.knapsack_id,
+        algorithms=decision.algorithms,
+        subscription_score=decision.subscription_score,
     )
     return solver_instance_request
 
@@ -101,10 +340,6 @@ async def accept_solution(
     request: AcceptSolutionRequest,
     suggested_solution_service: SuggestedSolutionsService = Depends(get_suggested_solutions_service_api),
 ) -> AcceptSolutionResponse:
-    solution_exists = await suggested_solution_service.is_solution_exists(request.knapsack_id, request.solution_id)
-    if not solution_exists:
-        return AcceptSolutionResponse(result=AcceptResult.SOLUTION_NOT_EXISTS)
-
     result = await suggested_solution_service.accept_suggested_solution(request.knapsack_id, request.solution_id)
     return AcceptSolutionResponse(result=result)
 
@@ -114,10 +349,6 @@ async def reject_solutions(
     request: RejectSolutionsRequest,
     suggested_solution_service: SuggestedSolutionsService = Depends(get_suggested_solutions_service_api),
 ) -> RejectSolutionResponse:
-    solution_exists = bool(await suggested_solution_service.get_solutions(request.knapsack_id))
-    if not solution_exists:
-        return RejectSolutionResponse(result=RejectResult.SUGGESTION_NOT_EXISTS)
-
     result = await suggested_solution_service.reject_suggested_solutions(request.knapsack_id)
     return RejectSolutionResponse(result=result)
 
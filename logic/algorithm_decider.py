@@ -1,4 +1,7 @@
-from logic.cluster_availability_service import ClusterAvailabilityService
+import asyncio
+from typing import NamedTuple, Union
+
+from logic.cluster_availability_sampler import ClusterAvailabilitySampler
 from logic.subscriptions_service import SubscriptionsService
 from models.algorithms import Algorithms
 from models.cluster_availability import ClusterAvailabilityScore
@@ -24,22 +27,66 @@ _busyness_subscription_algo_mapping: dict[ClusterAvailabilityScore, dict[Subscri
 }
 
 
+class AlgorithmDecision(NamedTuple):
+    algorithms: list[Algorithms]
+    subscription_score: SubscriptionScore
+
+
 class AlgorithmDecider:
     def __init__(
         self,
         subscriptions_service: SubscriptionsService,
-        cluster_availability_service: ClusterAvailabilityService,
+        cluster_availability_sampler: ClusterAvailabilitySampler,
         branch_and_bound_max_items: int,
         dynamic_programming_max_iterations: int,
+        dynamic_programming_max_table_bytes: int,
     ):
         self._subscriptions_service: SubscriptionsService = subscriptions_service
-        self._cluster_availability_service = cluster_availability_service
+        self._cluster_availability_sampler = cluster_availability_sampler
         self._branch_and_bound_max_items = branch_and_bound_max_items
         self._dynamic_programming_max_iterations = dynamic_programming_max_iterations
+        self._dynamic_programming_max_table_bytes = dynamic_programming_max_table_bytes
 
-    async def decide(self, knapsack_id: str, items_count: int, capacity: int) -> list[Algorithms]:
-        availability = await self._cluster_availability_service.get_cluster_availability_score()
+    async def decide(self, knapsack_id: str, items_count: int, capacity: int) -> AlgorithmDecision:
         subscription_score = await self._subscriptions_service.get_subscription_score(knapsack_id)
+        algorithms = await self._decide_on_queue_availability(subscription_score, knapsack_id, items_count, capacity)
+        return AlgorithmDecision(algorithms, subscription_score)
+
+    async def decide_many(self, knapsacks: list[tuple[str, int, int]]) -> list[Union[AlgorithmDecision, BaseException]]:
+        # Subscriptions are looked up concurrently, a failed lookup is returned in place of its knapsack's decision
+        subscription_scores = await asyncio.gather(
+            *(self._subscriptions_service.get_subscription_score(knapsack_id) for knapsack_id, _, _ in knapsacks),
+            return_exceptions=True,
+        )
+        return [
+            subscription_score
+            if isinstance(subscription_score, BaseException)
+            else AlgorithmDecision(
+                await self._decide_on_queue_availability(subscription_score, knapsack_id, items_count, capacity),
+                subscription_score,
+            )
+            for (knapsack_id, items_count, capacity), subscription_score in zip(knapsacks, subscription_scores)
+        ]
+
+    async def _decide_on_queue_availability(
+        self, subscription_score: SubscriptionScore, knapsack_id: str, items_count: int, capacity: int
+    ) -> list[Algorithms]:
+        # Queue scores are sampled in the background, reading them costs no broker round trip. The most demanding
+        # decision is tried first and kept once the queue it is routed to is at least as available as it assumes.
+        for availability in sorted(ClusterAvailabilityScore, reverse=True):
+            algorithms = await self._decide(availability, subscription_score, knapsack_id, items_count, capacity)
+            if await self._cluster_availability_sampler.get_queue_availability_score(algorithms) >= availability:
+                break
+        return algorithms
+
+    async def _decide(
+        self,
+        availability: ClusterAvailabilityScore,
+        subscription_score: SubscriptionScore,
+        knapsack_id: str,
+        items_count: int,
+        capacity: int,
+    ) -> list[Algorithms]:
         algo = _busyness_subscription_algo_mapping.get(availability, {}).get(subscription_score)
         if not algo:
             print(
@@ -55,10 +102,29 @@ class AlgorithmDecider:
     async def _include_complexity_in_decision(self, algo, capacity, items_count):
         if algo == Algorithms.BRANCH_AND_BOUND and items_count > self._branch_and_bound_max_items:
             algo = Algorithms.DYNAMIC_PROGRAMMING
-        if algo == Algorithms.DYNAMIC_PROGRAMMING and capacity * items_count > self._dynamic_programming_max_iterations:
+        if algo == Algorithms.DYNAMIC_PROGRAMMING and self._estimate_dp_table_bytes(capacity, items_count) > (
+            self._dynamic_programming_max_table_bytes
+        ):
+            # Divide and conquer rebuilds the solution in O(capacity) memory for about the same amount of work
+            algo = Algorithms.DYNAMIC_PROGRAMMING_DIVIDE_AND_CONQUER
+        if algo in (Algorithms.DYNAMIC_PROGRAMMING, Algorithms.DYNAMIC_PROGRAMMING_DIVIDE_AND_CONQUER) and (
+            capacity * items_count > self._dynamic_programming_max_iterations
+            or self._estimate_dp_rows_bytes(capacity) > self._dynamic_programming_max_table_bytes
+        ):
+            # Both variants keep whole rows of the capacity in memory, however few items there are
             algo = Algorithms.GENETIC_HEAVY
         return algo
 
+    @staticmethod
+    def _estimate_dp_table_bytes(capacity: int, items_count: int) -> int:
+        # One decision bit per (item, volume) cell
+        return items_count * (capacity // 8 + 1)
+
+    @staticmethod
+    def _estimate_dp_rows_bytes(capacity: int) -> int:
+        # Up to three int64 rows of best values are alive at once
+        return 3 * 8 * (capacity + 1)
+
     @staticmethod
     def _get_extra_algorithms(availability: ClusterAvailabilityScore, subscription_score: SubscriptionScore):
         if availability <= ClusterAvailabilityScore.BUSY:
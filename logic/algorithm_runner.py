@@ -1,28 +1,119 @@
 from __future__ import annotations
 
+import asyncio
+import threading
 from time import perf_counter_ns
+from typing import AsyncIterator, Optional
 
 from logger import logger
-from logic.solver.base_solver import BaseSolver
+from logic.solver.base_solver import BaseSolver, SolverResult
+from logic.solver.deadline import Cancellation, ChildCancellation, Deadline
 from logic.solver.solver_loader import SolverLoader
+from logic.solver_process_pool import SolverProcessPool
 from models.algorithms import Algorithms
 from models.knapsack_item import KnapsackItem
 
 
 class AlgorithmRunner:
-    def __init__(self, solver_loader: SolverLoader):
+    def __init__(
+        self,
+        solver_loader: SolverLoader,
+        request_budget_seconds: float,
+        process_pool: Optional[SolverProcessPool] = None,
+        portfolio_mode: bool = False,
+    ):
         self._solver_loader = solver_loader
+        self._request_budget_seconds = request_budget_seconds
+        self._process_pool = process_pool
+        self._portfolio_mode = portfolio_mode
 
-    def run_algorithms(
-        self, items: list[KnapsackItem], volume: int, algorithms: list[Algorithms]
+    async def run_algorithms(
+        self,
+        items: list[KnapsackItem],
+        volume: int,
+        algorithms: list[Algorithms],
+        deadline: Optional[Deadline] = None,
     ) -> list[list[KnapsackItem]]:
-        return [self._run_algorithm(items, volume, alg) for alg in algorithms]
+        results = [[] for _ in algorithms]
+        async for index, solution in self.iter_algorithms(items, volume, algorithms, deadline):
+            results[index] = solution
+        return results
 
-    def _run_algorithm(self, items: list[KnapsackItem], volume: int, algorithm: Algorithms) -> list[KnapsackItem]:
+    async def iter_algorithms(
+        self,
+        items: list[KnapsackItem],
+        volume: int,
+        algorithms: list[Algorithms],
+        deadline: Optional[Deadline] = None,
+        cancellation: Optional[Cancellation] = None,
+    ) -> AsyncIterator[tuple[int, list[KnapsackItem]]]:
+        # Yields the index of every algorithm along with its solution as soon as it is found
+        deadline = deadline or Deadline.after(self._request_budget_seconds, cancellation)
+        if self._portfolio_mode and self._process_pool:
+            async for result in self._race_algorithms(items, volume, algorithms, deadline):
+                yield result
+            return
+
+        for index, alg in enumerate(algorithms):
+            # Whatever an algorithm leaves unused is split evenly between the ones still waiting to run
+            algorithm_deadline = Deadline.after(
+                deadline.remaining_seconds() / (len(algorithms) - index), deadline.cancellation
+            )
+            result = await self._run_algorithm(items, volume, alg, algorithm_deadline)
+            yield index, result.items
+            if self._portfolio_mode and result.proved_optimal:
+                logger.info(f"Algorithm {alg} proved optimality, skipping the remaining algorithms")
+                return
+
+    async def _race_algorithms(
+        self, items: list[KnapsackItem], volume: int, algorithms: list[Algorithms], deadline: Deadline
+    ) -> AsyncIterator[tuple[int, list[KnapsackItem]]]:
+        # Every algorithm gets the whole budget, the first one to prove its solution optimal cancels the others
+        race_cancellation = ChildCancellation(await self._process_pool.create_cancellation(), deadline.cancellation)
+        race_deadline = Deadline(deadline.at, race_cancellation)
+        index_by_task = {
+            asyncio.create_task(self._run_algorithm(items, volume, alg, race_deadline)): index
+            for index, alg in enumerate(algorithms)
+        }
+        pending = set(index_by_task)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                proven_optimal = False
+                for task in sorted(done, key=index_by_task.get):
+                    result = task.result()
+                    yield index_by_task[task], result.items
+                    proven_optimal = proven_optimal or result.proved_optimal
+                if proven_optimal:
+                    logger.info("An algorithm proved optimality, cancelling the remaining algorithms")
+                    break
+        finally:
+            if pending:
+                race_deadline.cancellation.set()
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _run_algorithm(
+        self, items: list[KnapsackItem], volume: int, algorithm: Algorithms, deadline: Deadline
+    ) -> SolverResult:
         start_time = perf_counter_ns()
-        logger.info(f"Started running algorithm: {algorithm}")
-        solver: BaseSolver = self._solver_loader.load(algorithm)
-        solution = solver.solve(items, volume)
+        logger.info(f"Started running algorithm: {algorithm}, budget {deadline.remaining_seconds():.2f} seconds")
+        if self._process_pool:
+            result = await self._process_pool.solve(algorithm, items, volume, deadline)
+        else:
+            solver: BaseSolver = self._solver_loader.load(algorithm)
+            result = solver.solve_with_proof(items, volume, deadline)
         end_time = perf_counter_ns()
         logger.info(f"Finished running algorithm: {algorithm}. took {int((end_time - start_time) / 1e6)} milliseconds")
-        return solution
+        return result
+
+    async def create_cancellation(self) -> Cancellation:
+        # Solves running in worker processes only see events shared through the pool
+        if self._process_pool:
+            return await self._process_pool.create_cancellation()
+        return threading.Event()
+
+    def shutdown(self) -> None:
+        if self._process_pool:
+            self._process_pool.shutdown()
@@ -4,22 +4,35 @@ from aioredis import Redis
 
 from models.knapsack_item import KnapsackItem
 
+# Claims every given item that is not claimed yet in a single round trip, returning a 1/0 flag per item
+CLAIM_ITEMS_SCRIPT = """
+local claimed = {}
+for i = 2, #ARGV do
+    claimed[i - 1] = redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[1])
+end
+return claimed
+"""
+
 
 class ClaimsService:
-    def __init__(
-        self, redis: Redis, items_claim_hash: str, suggested_solutions_claim_hash: str, running_knapsack_claim_hash: str
-    ):
+    def __init__(self, redis: Redis, items_claim_hash: str, running_knapsack_claim_hash: str):
         self._redis = redis
         self._items_claim_hash = items_claim_hash
-        self._suggested_solutions_claim_hash = suggested_solutions_claim_hash
         self._running_knapsack_claim_hash = running_knapsack_claim_hash
+        self._claim_items_script = redis.register_script(CLAIM_ITEMS_SCRIPT)
+
+    @property
+    def items_claim_hash(self) -> str:
+        return self._items_claim_hash
 
     async def claim_items(self, items: list[KnapsackItem], volume: int, knapsack_id: str) -> list[KnapsackItem]:
-        return [
-            item
-            for item in items
-            if item.volume <= volume and await self._redis.hsetnx(self._items_claim_hash, item.id, knapsack_id)
-        ]
+        eligible_items = [item for item in items if item.volume <= volume]
+        if not eligible_items:
+            return []
+        claimed = await self._claim_items_script(
+            keys=[self._items_claim_hash], args=[knapsack_id, *(item.id for item in eligible_items)]
+        )
+        return [item for item, is_claimed in zip(eligible_items, claimed) if is_claimed]
 
     async def release_items_claims(self, items: list[KnapsackItem]) -> None:
         items_ids = {i.id for i in items}
@@ -27,12 +40,6 @@ class ClaimsService:
             return
         await self._redis.hdel(self._items_claim_hash, *items_ids)
 
-    async def claim_suggested_solutions(self, knapsack_id: str) -> bool:
-        return bool(await self._redis.hsetnx(self._suggested_solutions_claim_hash, knapsack_id, knapsack_id))
-
-    async def release_claim_suggested_solutions(self, knapsack_id: str) -> None:
-        await self._redis.hdel(self._suggested_solutions_claim_hash, knapsack_id)
-
     async def claim_running_knapsack(self, knapsack_id: str) -> bool:
         return bool(await self._redis.hsetnx(self._running_knapsack_claim_hash, knapsack_id, knapsack_id))
 
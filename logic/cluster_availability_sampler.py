@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from logger import logger
+from logic.cluster_availability_service import ClusterAvailabilityService
+from logic.rabbit_channel_pool import RabbitChannelPool
+from logic.solver_queue import get_solver_queue_name
+from models.algorithms import Algorithms
+from models.cluster_availability import ClusterAvailabilityScore
+from models.config.configuration import Config
+
+
+class ClusterAvailabilitySampler:
+    def __init__(self, channel_pool: RabbitChannelPool, config: Config):
+        self._channel_pool = channel_pool
+        self._config = config
+        self._smoothed_queue_depths: dict[str, float] = {}
+        self._queue_scores: dict[str, ClusterAvailabilityScore] = {}
+        self._sample_task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._sample_task:
+                return
+            await self._sample_safely()
+            self._sample_task = asyncio.create_task(self._sample_periodically())
+
+    async def stop(self) -> None:
+        if self._sample_task:
+            self._sample_task.cancel()
+            await asyncio.gather(self._sample_task, return_exceptions=True)
+            self._sample_task = None
+
+    async def get_queue_availability_score(self, algorithms: list[Algorithms]) -> ClusterAvailabilityScore:
+        # A request only waits behind the queue it is routed to, the queues of the other classes don't slow it down
+        queue_name = get_solver_queue_name(
+            self._config.solver_queue, self._config.solver_queue_per_algorithm_class, algorithms
+        )
+        return self._queue_scores.get(queue_name, ClusterAvailabilityScore.AVAILABLE)
+
+    def get_queue_availability_scores(self) -> dict[str, ClusterAvailabilityScore]:
+        return dict(self._queue_scores)
+
+    async def sample(self) -> dict[str, ClusterAvailabilityScore]:
+        async with self._channel_pool.acquire() as channel:
+            service = ClusterAvailabilityService(channel, self._config)
+            queue_depths = {
+                queue_name: await service.get_queue_depth(queue_name) for queue_name in service.get_queue_names()
+            }
+
+        for queue_name, queue_depth in queue_depths.items():
+            self._queue_scores[queue_name] = self._score_queue(service, queue_name, queue_depth)
+        return self.get_queue_availability_scores()
+
+    def _score_queue(
+        self, service: ClusterAvailabilityService, queue_name: str, queue_depth: int
+    ) -> ClusterAvailabilityScore:
+        smoothing = self._config.cluster_availability_smoothing_factor
+        smoothed_queue_depth = self._smoothed_queue_depths.get(queue_name)
+        if smoothed_queue_depth is None:
+            smoothed_queue_depth = float(queue_depth)
+        else:
+            smoothed_queue_depth = smoothing * queue_depth + (1 - smoothing) * smoothed_queue_depth
+        self._smoothed_queue_depths[queue_name] = smoothed_queue_depth
+
+        score = self._queue_scores.get(queue_name, ClusterAvailabilityScore.AVAILABLE)
+        rising_score = service.score_queue_depth(smoothed_queue_depth)
+        if rising_score <= score:
+            return rising_score
+        # Leaving a busy band requires the depth to drop clearly below its threshold, so the score does not flap
+        falling_depth = smoothed_queue_depth / (1 - self._config.cluster_availability_hysteresis_ratio)
+        return max(score, service.score_queue_depth(falling_depth))
+
+    async def _sample_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._config.cluster_availability_sample_interval_seconds)
+            await self._sample_safely()
+
+    async def _sample_safely(self) -> None:
+        try:
+            await self.sample()
+        except Exception as e:
+            # Keep deciding on the last known score until the broker answers again
+            logger.warning("Failed sampling cluster availability, keeping the last queue scores", exc_info=e)
@@ -1,5 +1,6 @@
 import aio_pika.abc
 
+from logic.solver_queue import get_solver_queue_names
 from models.cluster_availability import ClusterAvailabilityScore
 from models.config.configuration import Config
 
@@ -10,15 +11,26 @@ class ClusterAvailabilityService:
         self._config = config
 
     async def get_cluster_availability_score(self) -> ClusterAvailabilityScore:
-        queue = await self._channel.declare_queue(self._config.solver_queue, passive=True)
+        # Every solver queue is scored on its own depth, the cluster is as available as its busiest queue
+        return min(
+            [self.score_queue_depth(await self.get_queue_depth(queue_name)) for queue_name in self.get_queue_names()]
+        )
 
-        if queue.declaration_result.message_count >= self._config.solvers_very_busy_threshold:
+    def get_queue_names(self) -> list[str]:
+        return get_solver_queue_names(self._config.solver_queue, self._config.solver_queue_per_algorithm_class)
+
+    async def get_queue_depth(self, queue_name: str) -> int:
+        queue = await self._channel.declare_queue(queue_name, passive=True)
+        return queue.declaration_result.message_count
+
+    def score_queue_depth(self, queue_depth: float) -> ClusterAvailabilityScore:
+        if queue_depth >= self._config.solvers_very_busy_threshold:
             return ClusterAvailabilityScore.VERY_BUSY
 
-        if queue.declaration_result.message_count >= self._config.solvers_busy_threshold:
+        if queue_depth >= self._config.solvers_busy_threshold:
             return ClusterAvailabilityScore.BUSY
 
-        if queue.declaration_result.message_count >= self._config.solvers_moderate_busy_threshold:
+        if queue_depth >= self._config.solvers_moderate_busy_threshold:
             return ClusterAvailabilityScore.MODERATE
 
         return ClusterAvailabilityScore.AVAILABLE
@@ -1,5 +1,6 @@
+import asyncio
 import json
-import traceback
+import time
 from typing import Optional
 
 import aio_pika
@@ -10,11 +11,14 @@ from logic.algorithm_runner import AlgorithmRunner
 from logic.claims_service import ClaimsService
 from logic.rabbit_channel_context import RabbitChannelContext
 from logic.solution_reporter import SolutionReporter
+from logic.solve_cancellations_listener import SolveCancellationsListener
+from logic.solver.deadline import Cancellation, Deadline
+from logic.solver_queue import get_solver_queue_arguments, get_request_deadline
 from logic.suggested_solution_service import SuggestedSolutionsService
-from models.algorithms import Algorithms
+from models.config.configuration import Config
 from models.knapsack_item import KnapsackItem
 from models.knapsack_solver_instance_dto import SolverInstanceRequest
-from models.solution import SolutionReportCause, AlgorithmSolution
+from models.solution import SolutionReportCause, AlgorithmSolution, SuggestedSolution
 
 
 class SolverInstanceConsumer:
@@ -25,40 +29,84 @@ class SolverInstanceConsumer:
         claims_service: ClaimsService,
         solution_reporter: SolutionReporter,
         suggested_solutions_service: SuggestedSolutionsService,
+        config: Config,
+        cancellations_listener: Optional[SolveCancellationsListener] = None,
     ):
         self._channel_context = channel_context
         self._algo_runner = algo_runner
         self._claims_service = claims_service
         self._solution_reporter = solution_reporter
         self._suggested_solutions_service = suggested_solutions_service
+        self._config = config
+        self._cancellations_listener = cancellations_listener
 
     async def __aenter__(self):
         self._channel = await self._channel_context.__aenter__()
+        if self._cancellations_listener:
+            await self._cancellations_listener.start()
         return self
 
-    async def start_consuming(self, queue_name: str):
-        queue: aio_pika.abc.AbstractQueue = await self._channel.declare_queue(queue_name)
+    async def start_consuming(self, *queue_names: str):
+        # Prefetch bounds how much of the backlog this pod holds, the rest stays available to the other pods
+        await self._channel.set_qos(prefetch_count=self._config.solver_prefetch_count)
+        queue_arguments = get_solver_queue_arguments(self._config.solver_queue_max_priority)
+        queues: list[aio_pika.abc.AbstractQueue] = [
+            await self._channel.declare_queue(queue_name, arguments=queue_arguments) for queue_name in queue_names
+        ]
+        # The consumed queues share the pod's concurrency limit
+        concurrency = asyncio.Semaphore(self._config.solver_max_concurrent_messages)
+        in_flight: set[asyncio.Task] = set()
 
-        async for request in self._consume_messages(queue):
-            await self._handle_message(request)
-
-    # noinspection PyUnresolvedReferences
-    @staticmethod
-    async def _consume_messages(queue: aio_pika.abc.AbstractQueue):
         try:
-            async with queue.iterator() as queue_iter:
-                async for message in queue_iter:
-                    async with message.process():
-                        try:
-                            yield SolverInstanceRequest(**json.loads(message.body.decode()))
-                        except Exception as e:
-                            print(f"Skipping message {message} because could not parse solver request due to {e}")
-                            continue
+            await asyncio.gather(*(self._consume_queue(queue, concurrency, in_flight) for queue in queues))
         except Exception as e:
             print(e)
             raise
+        finally:
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _consume_queue(
+        self, queue: aio_pika.abc.AbstractQueue, concurrency: asyncio.Semaphore, in_flight: set[asyncio.Task]
+    ):
+        async with queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                await concurrency.acquire()
+                task = asyncio.create_task(self._process_message(message, concurrency))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                task.add_done_callback(self._log_message_failure)
+
+    @staticmethod
+    def _log_message_failure(task: asyncio.Task) -> None:
+        # Message tasks are not awaited until shutdown, so their failures are logged as soon as they happen
+        if not task.cancelled() and task.exception():
+            logger.error("Failed processing solver message", exc_info=task.exception())
+
+    # noinspection PyUnresolvedReferences
+    async def _process_message(self, message: aio_pika.abc.AbstractIncomingMessage, concurrency: asyncio.Semaphore):
+        try:
+            # The message is acked only once it was handled, so a crashing pod hands its messages back to the queue
+            async with message.process():
+                deadline = get_request_deadline(message.headers)
+                if deadline is not None and time.time() >= deadline:
+                    logger.info(f"Skipping solver request {message.message_id}, its deadline passed in the queue")
+                    return
+                try:
+                    request = SolverInstanceRequest(**json.loads(message.body.decode()))
+                except Exception as e:
+                    print(f"Skipping message {message} because could not parse solver request due to {e}")
+                    return
+                await self._handle_message(request)
+        finally:
+            concurrency.release()
 
     async def _handle_message(self, request: SolverInstanceRequest) -> None:
+        if self._config.solution_waiters_tracking_enabled and not await self._solution_reporter.has_waiters(
+            request.knapsack_id
+        ):
+            logger.info(f"Nobody waits for the solution of {request.knapsack_id} anymore. Skipping execution.")
+            return
         if not await self._claims_service.claim_running_knapsack(request.knapsack_id):
             print(
                 f"Knapsack {request.knapsack_id} is already running on a different node. Skipping execution. "
@@ -66,6 +114,7 @@ class SolverInstanceConsumer:
             )
             return
 
+        cancellation = await self._register_cancellation(request.knapsack_id)
         try:
             if await self._suggested_solutions_service.get_solutions(request.knapsack_id):
                 await self._solution_reporter.report_error(
@@ -78,21 +127,76 @@ class SolverInstanceConsumer:
                 await self._solution_reporter.report_error(request.knapsack_id, SolutionReportCause.NO_ITEM_CLAIMED)
                 return
 
-            solutions = self._algo_runner.run_algorithms(claimed_items, request.volume, request.algorithms)
-            solutions_with_algos = list(zip(request.algorithms, solutions))
-            await self._release_non_needed_items(claimed_items, solutions)
-            solutions = self._dedup_solutions(solutions_with_algos)
-            solutions = [AlgorithmSolution(algorithm=alg, items=sol) for alg, sol in solutions]
-            await self._solution_reporter.report_solution_suggestions(solutions, request.knapsack_id)
+            suggested_solutions = await self._suggest_solutions_progressively(request, claimed_items, cancellation)
+            await self._release_non_needed_items(claimed_items, [s.items for s in suggested_solutions])
+            if cancellation and cancellation.is_set():
+                # Nobody will accept the suggestion, so its items are handed back without waiting for it to expire
+                logger.info(f"Solve of {request.knapsack_id} was cancelled, releasing its claims")
+                await self._suggested_solutions_service.reject_suggested_solutions(request.knapsack_id)
+                await self._solution_reporter.report_error(request.knapsack_id, SolutionReportCause.CANCELLED)
+                return
+            await self._solution_reporter.report_solutions_complete(request.knapsack_id)
         except Exception as e:
             logger.error(f"Failed calculating solution for {request.knapsack_id}.", exc_info=e)
             await self._claims_service.release_items_claims(request.items)
             await self._solution_reporter.report_error(request.knapsack_id, SolutionReportCause.GOT_EXCEPTION)
-            traceback.print_exc()
         finally:
+            if cancellation:
+                self._cancellations_listener.unregister(request.knapsack_id, cancellation)
             if request:
                 await self._claims_service.release_claim_running_knapsack(request.knapsack_id)
 
+    async def _register_cancellation(self, knapsack_id: str) -> Optional[Cancellation]:
+        if not self._cancellations_listener:
+            return None
+        cancellation = await self._algo_runner.create_cancellation()
+        self._cancellations_listener.register(knapsack_id, cancellation)
+        return cancellation
+
+    async def _suggest_solutions_progressively(
+        self, request: SolverInstanceRequest, claimed_items: list[KnapsackItem], cancellation: Optional[Cancellation]
+    ) -> list[AlgorithmSolution]:
+        # Every new solution is suggested and reported as soon as its algorithm finishes, so waiting routers can
+        # answer with the best solution so far instead of waiting for the slowest algorithm
+        suggestion: Optional[SuggestedSolution] = None
+        suggested_solutions: list[AlgorithmSolution] = []
+        # Solving past the request deadline is wasted, the router stopped waiting for the solution by then
+        deadline_at = time.time() + self._config.solver_request_budget_seconds
+        if request.deadline is not None:
+            deadline_at = min(deadline_at, request.deadline)
+        results = self._algo_runner.iter_algorithms(
+            claimed_items, request.volume, request.algorithms, Deadline(deadline_at, cancellation)
+        )
+        try:
+            async for index, items in results:
+                if cancellation and cancellation.is_set():
+                    break
+                if any(items == s.items for s in suggested_solutions):
+                    continue
+                solution = AlgorithmSolution(algorithm=request.algorithms[index], items=items)
+                if not suggestion:
+                    suggestion = await self._suggested_solutions_service.register_suggested_solutions(
+                        [solution], request.knapsack_id
+                    )
+                elif not await self._suggested_solutions_service.add_suggested_solution(
+                    suggestion, solution, request.knapsack_id
+                ):
+                    logger.info(f"Suggestion of {request.knapsack_id} was already accepted or rejected, stop solving")
+                    break
+                suggested_solutions.append(solution)
+                await self._solution_reporter.report_partial_solution(request.knapsack_id)
+        except Exception as e:
+            if not suggestion:
+                raise
+            # Solutions already suggested stay valid, the failed algorithm just does not add its own
+            logger.error(f"Failed running algorithms for {request.knapsack_id}, keeping found solutions", exc_info=e)
+        finally:
+            await results.aclose()
+
+        if not suggestion and not (cancellation and cancellation.is_set()):
+            await self._suggested_solutions_service.register_suggested_solutions([], request.knapsack_id)
+        return suggested_solutions
+
     async def _should_run(self, request: SolverInstanceRequest):
         if await self._suggested_solutions_service.get_solutions(request.knapsack_id):
             await self._solution_reporter.report_error(
@@ -120,10 +224,7 @@ class SolverInstanceConsumer:
         await self._claims_service.release_items_claims(released_items)
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._cancellations_listener:
+            await self._cancellations_listener.stop()
+        self._algo_runner.shutdown()
         await self._channel_context.__aexit__(exc_type, exc_val, exc_tb)
-
-    def _dedup_solutions(
-        self, solutions: list[tuple[Algorithms, list[KnapsackItem]]]
-    ) -> list[tuple[Algorithms, list[KnapsackItem]]]:
-        seen = list()
-        return [seen.append(sol) or (alg, sol) for alg, sol in solutions if sol not in seen]
@@ -1,21 +1,65 @@
+import asyncio
+import time
+from typing import Optional
+
 import aio_pika
 
+from logic.solver_queue import (
+    DEADLINE_HEADER,
+    get_solver_queue_arguments,
+    get_solver_queue_names,
+    get_solver_queue_name,
+)
 from models.knapsack_solver_instance_dto import SolverInstanceRequest
 
 
 class SolverRouterProducer:
-    def __init__(self, rabbit_channel: aio_pika.abc.AbstractChannel, queue: str):
+    def __init__(
+        self,
+        rabbit_channel: aio_pika.abc.AbstractChannel,
+        queue: str,
+        max_priority: int = 0,
+        per_algorithm_class: bool = False,
+        request_ttl_seconds: Optional[float] = None,
+    ):
         self._channel = rabbit_channel
         self._queue_name = queue
+        self._max_priority = max_priority
+        self._per_algorithm_class = per_algorithm_class
+        self._request_ttl_seconds = request_ttl_seconds
 
     async def __aenter__(self):
-        await self._channel.declare_queue(self._queue_name)
+        arguments = get_solver_queue_arguments(self._max_priority)
+        await asyncio.gather(
+            *(
+                self._channel.declare_queue(queue_name, arguments=arguments)
+                for queue_name in get_solver_queue_names(self._queue_name, self._per_algorithm_class)
+            )
+        )
         return self
 
     async def produce_solver_instance_request(self, request: SolverInstanceRequest):
+        # Higher subscriptions are delivered first, so they do not wait behind a backlog of lower ones
+        priority = min(int(request.subscription_score), self._max_priority) if self._max_priority > 0 else None
+        expiration, headers = None, None
+        if self._request_ttl_seconds is not None and request.deadline is None:
+            request = request.copy(update={"deadline": time.time() + self._request_ttl_seconds})
+        if request.deadline is not None:
+            # The broker drops the request once nobody waits for it, solvers check the header for the ones it kept
+            expiration = max(request.deadline - time.time(), 0)
+            headers = {DEADLINE_HEADER: request.deadline}
         await self._channel.default_exchange.publish(
-            aio_pika.Message(body=request.json().encode()),
-            routing_key=self._queue_name,
+            aio_pika.Message(body=request.json().encode(), priority=priority, expiration=expiration, headers=headers),
+            routing_key=get_solver_queue_name(self._queue_name, self._per_algorithm_class, request.algorithms),
+        )
+
+    async def produce_solver_instance_requests(
+        self, requests: list[SolverInstanceRequest]
+    ) -> list[Optional[BaseException]]:
+        # Publishing concurrently overlaps the broker confirmations instead of waiting for each one in turn.
+        # Every request fails on its own, the error of each one is returned in its place.
+        return await asyncio.gather(
+            *(self.produce_solver_instance_request(request) for request in requests), return_exceptions=True
         )
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Optional
+
+from aioredis import Redis
+from aioredis.client import PubSub
+
+from logger import logger
+
+
+class PubSubListener:
+    def __init__(
+        self,
+        redis: Redis,
+        channel: str,
+        name: str,
+        pattern: bool = False,
+        resubscribe_delay_seconds: float = 1,
+        batch_size: int = 1,
+    ):
+        self._redis = redis
+        self._channel = channel
+        self._name = name
+        self._pattern = pattern
+        self._resubscribe_delay_seconds = resubscribe_delay_seconds
+        self._batch_size = batch_size
+        self._pubsub: Optional[PubSub] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._listen_task:
+                return
+            await self._subscribe()
+            self._listen_task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listen_task:
+            self._listen_task.cancel()
+            await asyncio.gather(self._listen_task, return_exceptions=True)
+            self._listen_task = None
+        await self._close_pubsub()
+
+    async def _handle_messages(self, messages: list[dict]) -> None:
+        raise NotImplementedError()
+
+    async def _subscribe(self) -> None:
+        self._pubsub = self._redis.pubsub()
+        if self._pattern:
+            await self._pubsub.psubscribe(self._channel)
+        else:
+            await self._pubsub.subscribe(self._channel)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                if not self._pubsub:
+                    await self._subscribe()
+                await self._receive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Redis keeps no backlog for subscribers, messages published while resubscribing are lost
+                logger.error(f"{self._name} subscription failed, resubscribing", exc_info=e)
+                await self._close_pubsub()
+                await asyncio.sleep(self._resubscribe_delay_seconds)
+
+    async def _receive(self) -> None:
+        # Waits for a message, then takes the ones that are already pending to handle them together
+        messages: list[dict] = []
+        message_type = "pmessage" if self._pattern else "message"
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+        while message:
+            if message["type"] == message_type:
+                messages.append(message)
+            if len(messages) >= self._batch_size:
+                break
+            message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=0)
+        if messages:
+            await self._handle_messages(messages)
+
+    async def _close_pubsub(self) -> None:
+        if self._pubsub:
+            pubsub, self._pubsub = self._pubsub, None
+            try:
+                await pubsub.reset()
+            except Exception as e:
+                logger.warning(f"Failed closing {self._name.lower()} subscription", exc_info=e)
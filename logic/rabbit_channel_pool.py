@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aio_pika
+import aio_pika.abc
+from aio_pika.pool import Pool
+
+from logger import logger
+from models.config.rabbit_connection_params import RabbitConnectionParams
+
+
+class RabbitChannelPool:
+    def __init__(
+        self,
+        connection_params: RabbitConnectionParams,
+        max_channels: int,
+        metrics_enabled: bool = False,
+        metrics_log_interval_seconds: float = 60,
+    ):
+        self._connection_params = connection_params
+        self._max_channels = max_channels
+        self._metrics_enabled = metrics_enabled
+        self._metrics_log_interval_seconds = metrics_log_interval_seconds
+        self._metrics_log_task: Optional[asyncio.Task] = None
+        self._connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self._connection_lock = asyncio.Lock()
+        self._channels: Pool[aio_pika.abc.AbstractChannel] = Pool(self._create_channel, max_size=max_channels)
+        self._created_channels = 0
+        self._in_use_channels = 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[aio_pika.abc.AbstractChannel]:
+        # Started on the first acquire, the pool itself is created before the event loop runs
+        if self._metrics_enabled and not self._metrics_log_task:
+            self._metrics_log_task = asyncio.create_task(self._log_metrics_periodically())
+        async with self._channels.acquire() as channel:
+            self._in_use_channels += 1
+            try:
+                if channel.is_closed:
+                    # Robust channels reopen themselves after a broker side close, this covers acquiring in between
+                    await channel.reopen()
+                yield channel
+            finally:
+                self._in_use_channels -= 1
+
+    def in_use_channels(self) -> int:
+        return self._in_use_channels
+
+    def idle_channels(self) -> int:
+        return self._created_channels - self._in_use_channels
+
+    def log_metrics(self) -> None:
+        logger.info(
+            f"Rabbit channel pool: {self.in_use_channels()}/{self._max_channels} channels in use, "
+            f"{self.idle_channels()} idle"
+        )
+
+    async def _log_metrics_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._metrics_log_interval_seconds)
+            self.log_metrics()
+
+    async def close(self) -> None:
+        if self._metrics_log_task:
+            self._metrics_log_task.cancel()
+            await asyncio.gather(self._metrics_log_task, return_exceptions=True)
+            self._metrics_log_task = None
+        await self._channels.close()
+        if self._connection:
+            await self._connection.close()
+            self._connection = None
+
+    async def _create_channel(self) -> aio_pika.abc.AbstractChannel:
+        channel = await (await self._get_connection()).channel()
+        self._created_channels += 1
+        return channel
+
+    async def _get_connection(self) -> aio_pika.abc.AbstractRobustConnection:
+        async with self._connection_lock:
+            if not self._connection:
+                host, port, user, password = self._connection_params
+                # A robust connection reconnects and restores its channels on its own after broker restarts
+                self._connection = await aio_pika.connect_robust(f"amqp://{user}:{password}@{host}:{port}/")
+            return self._connection
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+from time import perf_counter
+from typing import Optional
+
+import aioredis
+
+from logger import logger
+
+
+class MeteredConnectionPool(aioredis.BlockingConnectionPool):
+    def __init__(
+        self,
+        *,
+        metrics_enabled: bool = False,
+        slow_checkout_seconds: float = 0.05,
+        metrics_log_interval_seconds: float = 60,
+        **kwargs,
+    ):
+        self._in_use_connections = 0
+        super().__init__(**kwargs)
+        self._metrics_enabled = metrics_enabled
+        self._slow_checkout_seconds = slow_checkout_seconds
+        self._metrics_log_interval_seconds = metrics_log_interval_seconds
+        self._metrics_log_task: Optional[asyncio.Task] = None
+        self.checkouts = 0
+        self.total_checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+
+    async def get_connection(self, command_name, *keys, **options):
+        if not self._metrics_enabled:
+            connection = await super().get_connection(command_name, *keys, **options)
+            self._in_use_connections += 1
+            return connection
+
+        # Started on the first checkout, the pool itself is created before the event loop runs
+        if not self._metrics_log_task:
+            self._metrics_log_task = asyncio.create_task(self._log_metrics_periodically())
+        start = perf_counter()
+        connection = await super().get_connection(command_name, *keys, **options)
+        waited = perf_counter() - start
+        self._in_use_connections += 1
+        self.checkouts += 1
+        self.total_checkout_seconds += waited
+        self.max_checkout_seconds = max(self.max_checkout_seconds, waited)
+        if waited >= self._slow_checkout_seconds:
+            # Waiting on the pool means every connection is busy, max connections is probably too low
+            logger.warning(f"Redis connection checkout for {command_name} waited {int(waited * 1000)} milliseconds")
+        return connection
+
+    async def release(self, connection):
+        self._in_use_connections -= 1
+        await super().release(connection)
+
+    def in_use_connections(self) -> int:
+        return self._in_use_connections
+
+    def log_metrics(self) -> None:
+        average_checkout_seconds = self.total_checkout_seconds / self.checkouts if self.checkouts else 0.0
+        logger.info(
+            f"Redis connection pool: {self.in_use_connections()}/{self.max_connections} connections in use, "
+            f"{self.checkouts} checkouts, average wait {int(average_checkout_seconds * 1000)} milliseconds, "
+            f"max wait {int(self.max_checkout_seconds * 1000)} milliseconds"
+        )
+
+    async def _log_metrics_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._metrics_log_interval_seconds)
+            self.log_metrics()
+
+    async def disconnect(self, inuse_connections: bool = True):
+        if self._metrics_log_task:
+            self._metrics_log_task.cancel()
+            await asyncio.gather(self._metrics_log_task, return_exceptions=True)
+            self._metrics_log_task = None
+        await super().disconnect(inuse_connections)
@@ -1,41 +1,58 @@
-import json
-
-from aioredis import Redis
+import asyncio
+from typing import AsyncIterator, Optional
 
+from logic.solution_reports_listener import SolutionReportsListener
 from models.solution import SolutionReport, SolutionReportCause
 
 
 class SolutionReportWaiter:
-    def __init__(
-        self, redis: Redis, solutions_channel_prefix: str, knapsack_id: str, wait_for_report_timeout_seconds: float
-    ):
-        self._redis = redis
-        self._solutions_channel_prefix = solutions_channel_prefix
+    def __init__(self, listener: SolutionReportsListener, knapsack_id: str, wait_for_report_timeout_seconds: float):
+        self._listener = listener
         self._knapsack_id = knapsack_id
-        self._is_consuming = False
-        self._pubsub = None
+        self._reports: Optional[asyncio.Queue] = None
         self._wait_for_report_timeout_seconds = wait_for_report_timeout_seconds
 
     async def __aenter__(self) -> "SolutionReportWaiter":
-        self._pubsub_context = self._redis.pubsub()
-        self._pubsub = await self._pubsub_context.__aenter__()
-        channel_name: str = f"{self._solutions_channel_prefix}:{self._knapsack_id}"
-        await self._pubsub.subscribe(channel_name)
+        # Registering before the request is produced makes sure a fast report is not missed
+        self._reports = self._listener.register(self._knapsack_id)
+        await self._listener.mark_waiting(self._knapsack_id)
         return self
 
-    async def wait_for_solution_report(self) -> SolutionReport:
-        timeout_or_finished = False
-        message = None
-        while not timeout_or_finished:
-            message = await self._pubsub.get_message(timeout=self._wait_for_report_timeout_seconds)
-            if isinstance(message, dict) and message["type"] == "subscribe":
-                continue
-            timeout_or_finished = True
-        if not message:
-            return SolutionReport(cause=SolutionReportCause.TIMEOUT)
-
-        response = SolutionReport(**json.loads(message["data"].decode()))
-        return response
+    async def wait_for_solution_report(self, answer_within_seconds: Optional[float] = None) -> SolutionReport:
+        # Waits for the final report, unless a solution was already found by the time an answer is due
+        loop = asyncio.get_running_loop()
+        timeout_at = loop.time() + self._wait_for_report_timeout_seconds
+        answer_at = timeout_at if answer_within_seconds is None else loop.time() + answer_within_seconds
+        latest_solution: Optional[SolutionReport] = None
+        while True:
+            wait_until = min(timeout_at, answer_at) if latest_solution else timeout_at
+            report = await self._next_report(wait_until - loop.time())
+            if not report:
+                return latest_solution or SolutionReport(cause=SolutionReportCause.TIMEOUT)
+            if report.is_final or loop.time() >= answer_at:
+                return report
+            latest_solution = report
+
+    async def iter_solution_reports(self) -> AsyncIterator[SolutionReport]:
+        loop = asyncio.get_running_loop()
+        timeout_at = loop.time() + self._wait_for_report_timeout_seconds
+        while True:
+            report = await self._next_report(timeout_at - loop.time())
+            if not report:
+                yield SolutionReport(cause=SolutionReportCause.TIMEOUT)
+                return
+            yield report
+            if report.is_final:
+                return
+
+    async def _next_report(self, timeout_seconds: float) -> Optional[SolutionReport]:
+        if not self._reports.empty():
+            return self._reports.get_nowait()
+        try:
+            return await asyncio.wait_for(self._reports.get(), max(timeout_seconds, 0))
+        except asyncio.TimeoutError:
+            return None
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self._pubsub_context.__aexit__(exc_type, exc_val, exc_tb)
+        self._listener.unregister(self._knapsack_id, self._reports)
+        await self._listener.unmark_waiting(self._knapsack_id)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from aioredis import Redis
 
+from logic.solution_reports_listener import get_waiters_key
 from logic.suggested_solution_service import SuggestedSolutionsService
 from models.solution import SolutionReportCause, SolutionReport, AlgorithmSolution
 
@@ -19,9 +20,20 @@ class SolutionReporter:
         await self._suggested_solution_service.register_suggested_solutions(solutions, knapsack_id)
         await self._redis.publish(self._channel_name(knapsack_id), solution_report.json())
 
+    async def report_partial_solution(self, knapsack_id: str):
+        solution_report = SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND, is_final=False)
+        await self._redis.publish(self._channel_name(knapsack_id), solution_report.json())
+
+    async def report_solutions_complete(self, knapsack_id: str):
+        solution_report = SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND)
+        await self._redis.publish(self._channel_name(knapsack_id), solution_report.json())
+
     async def report_error(self, knapsack_id: str, error: SolutionReportCause):
         solution_report = SolutionReport(cause=error)
         await self._redis.publish(self._channel_name(knapsack_id), solution_report.json())
 
+    async def has_waiters(self, knapsack_id: str) -> bool:
+        return bool(await self._redis.exists(get_waiters_key(self._solutions_channel_prefix, knapsack_id)))
+
     def _channel_name(self, knapsack_id: str):
         return f"{self._solutions_channel_prefix}:{knapsack_id}"
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+from typing import Optional
+
+from aioredis import Redis
+
+from logic.pubsub_listener import PubSubListener
+from models.solution import SolutionReport
+
+
+MARK_WAITING_SCRIPT = """
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+"""
+
+# The last waiter leaving deletes the counter, also when it already expired and DECR recreated it below zero
+UNMARK_WAITING_SCRIPT = """
+if redis.call('DECR', KEYS[1]) <= 0 then
+    redis.call('DEL', KEYS[1])
+end
+"""
+
+
+def get_waiters_key(solutions_channel_prefix: str, knapsack_id: str) -> str:
+    return f"{solutions_channel_prefix}_waiters:{knapsack_id}"
+
+
+class SolutionReportsListener(PubSubListener):
+    def __init__(
+        self,
+        redis: Redis,
+        solutions_channel_prefix: str,
+        resubscribe_delay_seconds: float = 1,
+        waiters_ttl_seconds: Optional[float] = None,
+    ):
+        super().__init__(
+            redis,
+            f"{solutions_channel_prefix}:*",
+            "Solution reports",
+            pattern=True,
+            resubscribe_delay_seconds=resubscribe_delay_seconds,
+        )
+        self._solutions_channel_prefix = solutions_channel_prefix
+        self._waiters_ttl_seconds = waiters_ttl_seconds
+        self._mark_waiting_script = redis.register_script(MARK_WAITING_SCRIPT)
+        self._unmark_waiting_script = redis.register_script(UNMARK_WAITING_SCRIPT)
+        self._waiters: dict[str, set[asyncio.Queue]] = {}
+
+    def register(self, knapsack_id: str) -> asyncio.Queue:
+        # Every waiter gets its own queue since a solver reports each solution it finds before the final report
+        waiter: asyncio.Queue = asyncio.Queue()
+        self._waiters.setdefault(knapsack_id, set()).add(waiter)
+        return waiter
+
+    def unregister(self, knapsack_id: str, waiter: asyncio.Queue) -> None:
+        waiters = self._waiters.get(knapsack_id, set())
+        waiters.discard(waiter)
+        if not waiters:
+            self._waiters.pop(knapsack_id, None)
+
+    async def mark_waiting(self, knapsack_id: str) -> None:
+        # Counted in redis so solvers can skip requests nobody waits for, it expires along with the waiting timeout
+        if self._waiters_ttl_seconds is None:
+            return
+        await self._mark_waiting_script(
+            keys=[get_waiters_key(self._solutions_channel_prefix, knapsack_id)],
+            args=[math.ceil(self._waiters_ttl_seconds)],
+        )
+
+    async def unmark_waiting(self, knapsack_id: str) -> None:
+        if self._waiters_ttl_seconds is None:
+            return
+        await self._unmark_waiting_script(keys=[get_waiters_key(self._solutions_channel_prefix, knapsack_id)])
+
+    async def _handle_messages(self, messages: list[dict]) -> None:
+        # Reports published while resubscribing are lost, their waiters fall back to the usual timeout
+        for message in messages:
+            self._dispatch(message)
+
+    def _dispatch(self, message: dict) -> None:
+        knapsack_id = message["channel"].decode()[len(self._solutions_channel_prefix) + 1 :]
+        waiters = self._waiters.get(knapsack_id)
+        if not waiters:
+            return
+        report = SolutionReport(**json.loads(message["data"].decode()))
+        for waiter in waiters:
+            waiter.put_nowait(report)
@@ -0,0 +1,11 @@
+from aioredis import Redis
+
+
+class SolveCancellationPublisher:
+    def __init__(self, redis: Redis, cancellations_channel: str):
+        self._redis = redis
+        self._cancellations_channel = cancellations_channel
+
+    async def cancel(self, knapsack_id: str) -> None:
+        # Only solvers running the knapsack act on it, a request still queued is dropped by its deadline instead
+        await self._redis.publish(self._cancellations_channel, knapsack_id)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from aioredis import Redis
+
+from logic.pubsub_listener import PubSubListener
+from logic.solver.deadline import Cancellation
+
+
+class SolveCancellationsListener(PubSubListener):
+    def __init__(self, redis: Redis, cancellations_channel: str, resubscribe_delay_seconds: float = 1):
+        super().__init__(
+            redis, cancellations_channel, "Solve cancellations", resubscribe_delay_seconds=resubscribe_delay_seconds
+        )
+        self._cancellations: dict[str, set[Cancellation]] = {}
+
+    def register(self, knapsack_id: str, cancellation: Cancellation) -> None:
+        self._cancellations.setdefault(knapsack_id, set()).add(cancellation)
+
+    def unregister(self, knapsack_id: str, cancellation: Cancellation) -> None:
+        cancellations = self._cancellations.get(knapsack_id, set())
+        cancellations.discard(cancellation)
+        if not cancellations:
+            self._cancellations.pop(knapsack_id, None)
+
+    async def _handle_messages(self, messages: list[dict]) -> None:
+        # Cancellations published while resubscribing are lost, their solves run until their deadline
+        for message in messages:
+            self._cancel(message["data"].decode())
+
+    def _cancel(self, knapsack_id: str) -> None:
+        for cancellation in self._cancellations.get(knapsack_id, set()):
+            cancellation.set()
@@ -0,0 +1,37 @@
+import json
+from typing import Optional
+from uuid import uuid4
+
+from aioredis import Redis
+
+from models.solution import SolutionReport
+from models.solve_job import SolveJob, SolveJobStatus
+
+
+class SolveJobsService:
+    def __init__(self, redis: Redis, solve_jobs_key_prefix: str, solve_job_ttl_seconds: int):
+        self._redis = redis
+        self._solve_jobs_key_prefix = solve_jobs_key_prefix
+        self._solve_job_ttl_seconds = solve_job_ttl_seconds
+
+    async def create_job(self, knapsack_id: str) -> SolveJob:
+        job = SolveJob(job_id=str(uuid4()), knapsack_id=knapsack_id)
+        await self._redis.set(self._job_key(job.job_id), job.json(), ex=self._solve_job_ttl_seconds)
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[SolveJob]:
+        encoded_job = await self._redis.get(self._job_key(job_id))
+        if not encoded_job:
+            return None
+
+        return SolveJob(**json.loads(encoded_job.decode()))
+
+    async def complete_job(self, job: SolveJob, report: SolutionReport) -> None:
+        completed_job = SolveJob(
+            job_id=job.job_id, knapsack_id=job.knapsack_id, status=SolveJobStatus.DONE, report=report
+        )
+        # Only overwrites a job that did not expire yet, keeping its original expiry
+        await self._redis.set(self._job_key(job.job_id), completed_job.json(), xx=True, keepttl=True)
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self._solve_jobs_key_prefix}:{job_id}"
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import AsyncExitStack
+
+from logger import logger
+from logic.solution_report_waiter import SolutionReportWaiter
+from logic.solve_jobs_service import SolveJobsService
+from models.solve_job import SolveJob
+
+
+class SolveJobsTracker:
+    def __init__(self):
+        self._tracked_jobs: set[asyncio.Task] = set()
+
+    def track(
+        self,
+        job: SolveJob,
+        solution_reports_waiter: SolutionReportWaiter,
+        waiter_exit_stack: AsyncExitStack,
+        solve_jobs_service: SolveJobsService,
+    ) -> None:
+        task = asyncio.create_task(
+            self._complete_job(job, solution_reports_waiter, waiter_exit_stack, solve_jobs_service)
+        )
+        self._tracked_jobs.add(task)
+        task.add_done_callback(self._tracked_jobs.discard)
+
+    def tracked_jobs(self) -> int:
+        return len(self._tracked_jobs)
+
+    async def close(self) -> None:
+        for task in self._tracked_jobs:
+            task.cancel()
+        await asyncio.gather(*self._tracked_jobs, return_exceptions=True)
+
+    @staticmethod
+    async def _complete_job(
+        job: SolveJob,
+        solution_reports_waiter: SolutionReportWaiter,
+        waiter_exit_stack: AsyncExitStack,
+        solve_jobs_service: SolveJobsService,
+    ) -> None:
+        async with waiter_exit_stack:
+            report = await solution_reports_waiter.wait_for_solution_report()
+        try:
+            await solve_jobs_service.complete_job(job, report)
+        except Exception as e:
+            logger.error(f"Failed completing solve job {job.job_id} of {job.knapsack_id}", exc_info=e)
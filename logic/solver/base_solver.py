@@ -1,6 +1,31 @@
+from typing import NamedTuple, Optional
+
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 
 
+class SolverResult(NamedTuple):
+    items: list[KnapsackItem]
+    proved_optimal: bool
+
+
 class BaseSolver:
-    def solve(self, items: list[KnapsackItem], volume: int) -> list[KnapsackItem]:
+    # Solvers are anytime: once the deadline expires they stop searching and return the best solution found so far
+    def solve(self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None) -> list[KnapsackItem]:
+        raise NotImplementedError()
+
+    def solve_with_proof(
+        self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None
+    ) -> SolverResult:
+        # Only exact solvers whose search ran to completion can vouch for their solution
+        return SolverResult(self.solve(items, volume, deadline), False)
+
+
+class ExactSolver(BaseSolver):
+    def solve(self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None) -> list[KnapsackItem]:
+        return self.solve_with_proof(items, volume, deadline).items
+
+    def solve_with_proof(
+        self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None
+    ) -> SolverResult:
         raise NotImplementedError()
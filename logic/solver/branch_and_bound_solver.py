@@ -1,9 +1,11 @@
 import sys
-from typing import NamedTuple
+from time import monotonic
+from typing import NamedTuple, Optional
 
 from ortools.algorithms import pywrapknapsack_solver
 
-from logic.solver.base_solver import BaseSolver
+from logic.solver.base_solver import ExactSolver, SolverResult
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 
 
@@ -12,15 +14,24 @@ class Solution(NamedTuple):
     upper_bound: int
 
 
-class BranchAndBoundSolver(BaseSolver):
-    def solve(self, items: list[KnapsackItem], volume: int) -> list[KnapsackItem]:
+class BranchAndBoundSolver(ExactSolver):
+    def solve_with_proof(
+        self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None
+    ) -> SolverResult:
         if any(i.value < 0 for i in items):
-            return []
+            return SolverResult([], False)
         solver = pywrapknapsack_solver.KnapsackSolver(
             pywrapknapsack_solver.KnapsackSolver.KNAPSACK_MULTIDIMENSION_BRANCH_AND_BOUND_SOLVER, "BranchAndBound"
         )
         values = [i.value for i in items]
         weights = [[i.volume for i in items]]
         solver.Init(values, weights, [volume])
+        time_limit = None
+        if deadline:
+            time_limit = deadline.remaining_seconds()
+            solver.set_time_limit(time_limit)
+        started_at = monotonic()
         solver.Solve()
-        return [items[i] for i in range(len(values)) if solver.BestSolutionContains(i)]
+        # OR-tools does not report why the search stopped, returning before its time limit means the tree was exhausted
+        proved_optimal = time_limit is None or monotonic() - started_at < time_limit
+        return SolverResult([items[i] for i in range(len(values)) if solver.BestSolutionContains(i)], proved_optimal)
@@ -1,17 +1,22 @@
+from typing import Optional
+
 from ortools.algorithms.pywrapknapsack_solver import KnapsackSolver
 
 from logic.solver.base_solver import BaseSolver
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 
 
 class BruteForceSolver(BaseSolver):
-    def solve(self, items: list[KnapsackItem], volume: int) -> list[KnapsackItem]:
+    def solve(self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None) -> list[KnapsackItem]:
         solver = KnapsackSolver(KnapsackSolver.KNAPSACK_BRUTE_FORCE_SOLVER, "KnapsackExample")
         values = [i.value for i in items]
         volumes = [[i.volume for i in items]]
         capacities = [volume]
 
         solver.Init(values, volumes, capacities)
+        if deadline:
+            solver.set_time_limit(deadline.remaining_seconds())
         solver.Solve()
 
         return [items[i] for i in range(len(values)) if solver.BestSolutionContains(i)]
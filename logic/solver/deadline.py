@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from time import time
+from typing import Optional, Protocol
+
+CANCELLATION_CHECK_INTERVAL_SECONDS = 0.05
+
+
+class Cancellation(Protocol):
+    def is_set(self) -> bool:
+        ...
+
+    def set(self) -> None:
+        ...
+
+
+class ChildCancellation:
+    # Set by its parent as well, setting it stops only its own work, the parent belongs to the caller
+    def __init__(self, own: Cancellation, parent: Optional[Cancellation] = None):
+        self._own = own
+        self._parent = parent
+
+    def is_set(self) -> bool:
+        return self._own.is_set() or (self._parent is not None and self._parent.is_set())
+
+    def set(self) -> None:
+        self._own.set()
+
+
+class Deadline:
+    def __init__(self, at: float, cancellation: Optional[Cancellation] = None):
+        self.at = at
+        self.cancellation = cancellation
+        self._cancelled = False
+        self._next_cancellation_check = 0.0
+
+    @classmethod
+    def after(cls, seconds: float, cancellation: Optional[Cancellation] = None) -> Deadline:
+        return cls(time() + seconds, cancellation)
+
+    def remaining_seconds(self) -> float:
+        return max(0.0, self.at - time())
+
+    def expired(self) -> bool:
+        now = time()
+        if now >= self.at:
+            return True
+        if self.cancellation is not None and not self._cancelled and now >= self._next_cancellation_check:
+            # The cancellation may live in another process, solvers poll expired() in tight loops so it is throttled
+            self._next_cancellation_check = now + CANCELLATION_CHECK_INTERVAL_SECONDS
+            self._cancelled = self.cancellation.is_set()
+        return self._cancelled
@@ -0,0 +1,74 @@
+from typing import Optional
+
+import numpy as np
+
+from logic.solver.base_solver import ExactSolver, SolverResult
+from logic.solver.deadline import Deadline
+from logic.solver.dynamic_programming_solver import DynamicProgrammingSolver, add_item_to_best_values
+from models.knapsack_item import KnapsackItem
+
+
+class DivideAndConquerDynamicProgrammingSolver(ExactSolver):
+    def __init__(self, leaf_table_cells: int = 1 << 20):
+        self._leaf_table_cells = leaf_table_cells
+        self._leaf_solver = DynamicProgrammingSolver()
+
+    def solve_with_proof(
+        self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None
+    ) -> SolverResult:
+        if volume < 0:
+            return SolverResult([], True)
+        candidates = [i for i in items if i.value > 0 and 0 <= i.volume <= volume]
+        return self._solve_range(candidates, volume, deadline)
+
+    def _solve_range(
+        self, items: list[KnapsackItem], capacity: int, deadline: Optional[Deadline] = None
+    ) -> SolverResult:
+        # A range is proved optimal only if its split and both halves were solved without running out of time
+        if not items:
+            return SolverResult([], True)
+        if deadline and deadline.expired():
+            return SolverResult(self._fill_greedily(items, capacity), False)
+        if len(items) <= 1 or len(items) * (capacity + 1) <= self._leaf_table_cells:
+            return self._leaf_solver.solve_with_proof(items, capacity, deadline)
+
+        middle = len(items) // 2
+        left, right = items[:middle], items[middle:]
+        split, split_completed = self._best_capacity_split(left, right, capacity, deadline)
+        left_result = self._solve_range(left, split, deadline)
+        right_result = self._solve_range(right, capacity - split, deadline)
+        return SolverResult(
+            left_result.items + right_result.items,
+            split_completed and left_result.proved_optimal and right_result.proved_optimal,
+        )
+
+    @staticmethod
+    def _best_capacity_split(
+        left: list[KnapsackItem], right: list[KnapsackItem], capacity: int, deadline: Optional[Deadline] = None
+    ) -> tuple[int, bool]:
+        # Forward pass over the left half and backward pass over the right half, both O(capacity) memory.
+        # Rows are released before recursing so the working set never exceeds a couple of rows.
+        left_best, left_completed = DivideAndConquerDynamicProgrammingSolver._best_values(left, capacity, deadline)
+        right_best, right_completed = DivideAndConquerDynamicProgrammingSolver._best_values(right, capacity, deadline)
+        return int(np.argmax(left_best + right_best[::-1])), left_completed and right_completed
+
+    @staticmethod
+    def _best_values(
+        items: list[KnapsackItem], capacity: int, deadline: Optional[Deadline] = None
+    ) -> tuple[np.ndarray, bool]:
+        best = np.zeros(capacity + 1, dtype=np.int64)
+        for item in items:
+            if deadline and deadline.expired():
+                return best, False
+            add_item_to_best_values(best, item.value, item.volume)
+        return best, True
+
+    @staticmethod
+    def _fill_greedily(items: list[KnapsackItem], capacity: int) -> list[KnapsackItem]:
+        # Out of time: fill the capacity assigned to this range by value per volume, never exceeding it
+        picked_items: list[KnapsackItem] = []
+        for item in sorted(items, key=lambda i: -i.value / max(i.volume, 1)):
+            if item.volume <= capacity:
+                picked_items.append(item)
+                capacity -= item.volume
+        return picked_items
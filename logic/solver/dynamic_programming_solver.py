@@ -1,36 +1,72 @@
-from logic.solver.base_solver import BaseSolver
+from typing import Optional
+
+import numpy as np
+
+from logic.solver.base_solver import ExactSolver, SolverResult
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 
 
-class KnapsackCell:
-    def __init__(self, total_value: int, items: list[KnapsackItem]):
-        self.total_value: int = total_value
-        self.items: list[KnapsackItem] = items
+def add_item_to_best_values(best: np.ndarray, value: int, weight: int, taken: Optional[np.ndarray] = None) -> bool:
+    capacity = len(best) - 1
+    if value <= 0 or weight < 0 or weight > capacity:
+        return False
+    candidate = best[: capacity + 1 - weight] + value
+    if taken is not None:
+        taken[:weight] = False
+        np.greater(candidate, best[weight:], out=taken[weight:])
+    np.maximum(best[weight:], candidate, out=best[weight:])
+    return True
 
-    def __lt__(self, other: "KnapsackCell"):
-        return self.total_value < other.total_value
 
+class DynamicProgrammingSolver(ExactSolver):
+    def solve_with_proof(
+        self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None
+    ) -> SolverResult:
+        # Densest items first, so a table cut short by the deadline already holds the most valuable ones
+        order = sorted(range(len(items)), key=lambda i: -items[i].value / max(items[i].volume, 1))
+        ordered_items = [items[i] for i in order]
+        values = [i.value for i in ordered_items]
+        volumes = [i.volume for i in ordered_items]
+        picked, completed = self._knapsack_dp(values, volumes, volume, deadline)
+        return SolverResult([items[i] for i in sorted(order[p] for p in picked)], completed)
 
-class DynamicProgrammingSolver(BaseSolver):
-    def solve(self, items: list[KnapsackItem], volume: int) -> list[KnapsackItem]:
-        values = [i.value for i in items]
-        volumes = [i.volume for i in items]
-        return self._knapsack_dp(values, volumes, volume, items)
+    @staticmethod
+    def _knapsack_dp(values, weights, capacity, deadline: Optional[Deadline] = None) -> tuple[list[int], bool]:
+        # Also tells whether every row was filled, only then the picked items are proved optimal
+        if capacity < 0:
+            return [], True
+        # best[j] holds the best total value reachable with volume j, decisions[i] bit j tells whether item i
+        # was taken when reaching volume j. Rows are bit-packed so reconstruction costs n * capacity / 8 bytes.
+        best = np.zeros(capacity + 1, dtype=np.int64)
+        decisions = np.zeros((len(values), capacity // 8 + 1), dtype=np.uint8)
+        taken = np.zeros(capacity + 1, dtype=bool)
+        for i, (value, weight) in enumerate(zip(values, weights)):
+            # Rows left at zero are never picked, so the table built so far is still a valid solution
+            if deadline and deadline.expired():
+                picked = DynamicProgrammingSolver._reconstruct(decisions, weights, capacity)
+                return picked + DynamicProgrammingSolver._fill_greedily(values, weights, i, capacity, picked), False
+            if add_item_to_best_values(best, value, weight, taken):
+                decisions[i] = np.packbits(taken)
+        return DynamicProgrammingSolver._reconstruct(decisions, weights, capacity), True
+
+    @staticmethod
+    def _reconstruct(decisions: np.ndarray, weights, capacity: int) -> list[int]:
+        picked: list[int] = []
+        remaining = capacity
+        for i in range(len(weights) - 1, -1, -1):
+            if decisions[i, remaining >> 3] >> (7 - (remaining & 7)) & 1:
+                picked.append(i)
+                remaining -= weights[i]
+        return picked
 
     @staticmethod
-    def _knapsack_dp(values, weights, capacity, items: list[KnapsackItem]) -> list[KnapsackItem]:
-        n = len(values)
-        table: list[list[KnapsackCell]] = [[(KnapsackCell(0, [])) for _ in range(capacity + 1)] for _ in range(n + 1)]
-        for i in range(1, n + 1):
-            for j in range(1, capacity + 1):
-                if weights[i - 1] > j:
-                    table[i][j] = table[i - 1][j]
-                else:
-                    upper_option: KnapsackCell = table[i - 1][j]
-                    upper_value_minus_current_weight: KnapsackCell = table[i - 1][j - weights[i - 1]]
-                    new_option = KnapsackCell(
-                        upper_value_minus_current_weight.total_value + values[i - 1],
-                        upper_value_minus_current_weight.items + [items[i - 1]],
-                    )
-                    table[i][j] = max(upper_option, new_option)
-        return table[n][capacity].items
+    def _fill_greedily(values, weights, start: int, capacity: int, picked: list[int]) -> list[int]:
+        # Out of time: the rows never filled are still densest first, top up whatever volume the table left unused
+        remaining = capacity - sum(weights[i] for i in picked)
+        filled: list[int] = []
+        for i in range(start, len(values)):
+            if values[i] > 0 and 0 <= weights[i] <= remaining:
+                filled.append(i)
+                remaining -= weights[i]
+        return filled
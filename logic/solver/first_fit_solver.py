@@ -1,7 +1,10 @@
+from typing import Optional
+
 from logic.solver.base_solver import BaseSolver
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 
 
 class FitFirstSolver(BaseSolver):
-    def solve(self, items: list[KnapsackItem], volume: int) -> list[KnapsackItem]:
+    def solve(self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None) -> list[KnapsackItem]:
         return [next(item for item in items if item.volume <= volume)]
@@ -1,6 +1,9 @@
-import random
+from typing import Optional
+
+import numpy as np
 
 from logic.solver.base_solver import BaseSolver
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 
 
@@ -10,134 +13,127 @@ class GeneticSolver(BaseSolver):
         self._mutation_probability = mutation_probability
         self._initial_population_size = initial_population_size
         self._minimum_fitness = -99999999999999999
+        self._rng = np.random.default_rng()
 
-    def solve(self, items: list[KnapsackItem], volume: int) -> list[KnapsackItem]:
-        results_culled = self._get_results_in_capacity(items, volume)
-        return results_culled or self._get_results_in_capacity(items, volume)  # retrying if culled results is empty
+    def solve(self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None) -> list[KnapsackItem]:
+        results_culled = self._get_results_in_capacity(items, volume, deadline)
+        if results_culled or (deadline and deadline.expired()):
+            return results_culled
+        return self._get_results_in_capacity(items, volume, deadline)  # retrying if culled results is empty
 
-    def _get_results_in_capacity(self, items, volume):
-        results = self._control_loop(items, volume)
+    def _get_results_in_capacity(self, items, volume, deadline: Optional[Deadline]):
+        results = self._control_loop(items, volume, deadline)
         return results if sum(r.volume for r in results) <= volume else []
 
-    def _control_loop(self, items: list[KnapsackItem], capacity: int):
-        items_count = len(items)
+    def _control_loop(self, items: list[KnapsackItem], capacity: int, deadline: Optional[Deadline]):
+        if not items:
+            return []
+        # Column 0 holds the items values and column 1 their volumes, so population @ profile scores every
+        # chromosome at once.
+        profile = np.array([[i.value, i.volume] for i in items], dtype=np.int64)
         population = self._generate_population(self._initial_population_size, items, capacity)
 
         for _ in range(self._generations):
-            parent1, parent2 = self._select_chromosomes(population, items, capacity)
+            if deadline and deadline.expired():
+                break
+            totals = population @ profile
+            fitness = self._calculate_fitness(totals, capacity)
+            parents = self._select_chromosomes(population, fitness)
 
-            child1, child2 = self._crossover(parent1, parent2, items_count)
+            children = self._crossover(parents)
+            children = self._mutate(children, self._rng.random(len(children)) < self._mutation_probability)
 
-            if random.uniform(0, 1) < self._mutation_probability:
-                child1 = self._mutate(child1, items_count)
-            if random.uniform(0, 1) < self._mutation_probability:
-                child2 = self._mutate(child2, items_count)
+            population = self._new_generation(population, totals, children, profile, capacity)
 
-            population = self._new_generation(population, [child1, child2], items, capacity)
+        return self._get_best(population, self._calculate_fitness(population @ profile, capacity), items)
 
-        return self._get_best(population, items, capacity)
+    def _generate_population(self, size: int, items: list[KnapsackItem], capacity: int) -> np.ndarray:
+        volumes = np.array([i.volume for i in items], dtype=np.int64)
+        values = np.array([i.value for i in items], dtype=np.float64)
+        items_count = len(items)
 
-    @staticmethod
-    def _generate_population(size: int, items: list[KnapsackItem], capacity: int) -> list[list[bool]]:
-        population = []
-        for _ in range(size):
-            genes = [False, True]
-            chromosome = []
-            for _ in range(len(items)):
-                chromosome.append(random.choice(genes))
-                if sum(k.value for i, k in enumerate(items) if i < len(chromosome) and chromosome[i]) > capacity:
-                    chromosome[-1] = False
-                    chromosome += [False] * (len(items) - len(chromosome))
-                    break
-            population.append(chromosome)
+        # Each chromosome visits the items in a random order biased towards high value per volume, and keeps
+        # every gene that was randomly switched on as long as the running volume stays within capacity.
+        ratio_ranks = np.argsort(np.argsort(-values / np.maximum(volumes, 1))) / items_count
+        visit_orders = np.argsort(ratio_ranks + self._rng.random((size, items_count)), axis=1)
+        switched_on = self._rng.random((size, items_count)) < 0.5
+
+        population = np.zeros((size, items_count), dtype=bool)
+        chromosomes = np.arange(size)
+        running_volumes = np.zeros(size, dtype=np.int64)
+        for position in range(items_count):
+            genes = visit_orders[:, position]
+            fits = switched_on[:, position] & (running_volumes + volumes[genes] <= capacity)
+            running_volumes += np.where(fits, volumes[genes], 0)
+            population[chromosomes, genes] = fits
         return population
 
-    def _select_chromosomes(
-        self, population: list[list[bool]], items: list[KnapsackItem], capacity: int
-    ) -> tuple[list[bool], list[bool]]:
-        fitness_values = []
-        for chromosome in population:
-            fitness_values.append(self._calculate_fitness(chromosome, items, capacity))
-
-        fitness_values = [float(i) / (sum(fitness_values) or 1) for i in fitness_values]
-
-        if sum(fitness_values) == 0:
-            fitness_values = [1 for _ in range(len(fitness_values))]
-
-        parent1 = random.choices(population, weights=fitness_values, k=1)[0]
-        parent2 = random.choices(population, weights=fitness_values, k=1)[0]
-
-        return parent1, parent2
-
-    def _calculate_fitness(self, chromosome: list[bool], items: list[KnapsackItem], capacity: int) -> int:
-        total_weight = 0
-        total_value = 0
-        for i in range(len(chromosome)):
-            if chromosome[i]:
-                total_weight += items[i].volume
-                total_value += items[i].value
-        if total_weight > capacity:
-            return self._minimum_fitness
-        else:
-            if total_value == 0:
-                return self._minimum_fitness
-            return max(self._minimum_fitness, total_value)
+    def _select_chromosomes(self, population: np.ndarray, fitness: np.ndarray) -> np.ndarray:
+        return population[self._rng.choice(len(population), size=2, p=self._selection_probabilities(fitness))]
+
+    def _selection_probabilities(self, fitness: np.ndarray) -> np.ndarray:
+        fits = fitness != self._minimum_fitness
+        if not fits.any():
+            return np.full(len(fitness), 1 / len(fitness))
+
+        weights = fitness.astype(np.float64)
+        lowest_fitness = weights[fits].min()
+        if lowest_fitness <= 0:
+            # Shift so the least valuable fitting chromosome still has a chance, e.g. for all-negative items
+            weights -= lowest_fitness - 1
+        weights[~fits] = 0
+        return weights / weights.sum()
+
+    def _calculate_fitness(self, totals: np.ndarray, capacity: int) -> np.ndarray:
+        total_value, total_weight = totals[:, 0], totals[:, 1]
+        misfits = (total_weight > capacity) | (total_value == 0)
+        return np.where(misfits, self._minimum_fitness, total_value)
+
+    def _crossover(self, parents: np.ndarray) -> np.ndarray:
+        items_count = parents.shape[1]
+        crossover_point = self._rng.integers(0, items_count)
+        from_first_parent = np.arange(items_count) < crossover_point
+        child1 = np.where(from_first_parent, parents[0], parents[1])
+        child2 = np.where(from_first_parent, parents[1], parents[0])
+        return np.stack((child1, child2))
+
+    def _mutate(self, chromosomes: np.ndarray, should_mutate: np.ndarray) -> np.ndarray:
+        rows = np.flatnonzero(should_mutate)
+        genes = self._rng.integers(0, chromosomes.shape[1], size=len(rows))
+        chromosomes[rows, genes] ^= True
+        return chromosomes
 
     @staticmethod
-    def _crossover(parent1: list[bool], parent2: list[bool], items_count: int):
-        crossover_point = random.randint(0, items_count - 1)
-        child1 = parent1[0:crossover_point] + parent2[crossover_point:]
-        child2 = parent2[0:crossover_point] + parent1[crossover_point:]
-
-        return child1, child2
-
-    @staticmethod
-    def _mutate(chromosome, items_count: int):
-        mutation_point = random.randint(0, items_count - 1)
-        if chromosome[mutation_point] == 0:
-            chromosome[mutation_point] = 1
-        else:
-            chromosome[mutation_point] = 0
-        return chromosome
-
-    def _get_best(self, population: list[list[bool]], items: list[KnapsackItem], capacity: int) -> list[KnapsackItem]:
-        fitness_values = []
-        for chromosome in population:
-            fitness_values.append(self._calculate_fitness(chromosome, items, capacity))
-
-        max_value = max(fitness_values)
-        max_index = fitness_values.index(max_value)
-        return [items[i] for i, include in enumerate(population[max_index]) if include]
+    def _get_best(population: np.ndarray, fitness: np.ndarray, items: list[KnapsackItem]) -> list[KnapsackItem]:
+        best_chromosome = population[np.argmax(fitness)]
+        return [items[i] for i in np.flatnonzero(best_chromosome)]
 
     def _new_generation(
-        self, population: list[list[bool]], children: list[list[bool]], items: list[KnapsackItem], capacity: int
-    ):
-        population = self._mutate_misfits(population, items, capacity)
-        return self._replace_children_into_population(population, children, items, capacity)
+        self, population: np.ndarray, totals: np.ndarray, children: np.ndarray, profile: np.ndarray, capacity: int
+    ) -> np.ndarray:
+        totals = self._mutate_misfits(population, totals, profile, capacity)
+        return self._replace_children_into_population(population, children, totals, capacity)
 
     def _mutate_misfits(
-        self, population: list[list[bool]], items: list[KnapsackItem], capacity: int
-    ) -> list[list[bool]]:
-        for i, chromosome in enumerate(population):
-            if self._calculate_fitness(chromosome, items, capacity) == self._minimum_fitness:
-                population[i] = self._mutate(chromosome, len(items))
-        return population
+        self, population: np.ndarray, totals: np.ndarray, profile: np.ndarray, capacity: int
+    ) -> np.ndarray:
+        misfits = np.flatnonzero(self._calculate_fitness(totals, capacity) == self._minimum_fitness)
+        genes = self._rng.integers(0, population.shape[1], size=len(misfits))
+        population[misfits, genes] ^= True
+        # Flipping a single gene moves the totals by exactly that item, no need to re-score the population
+        direction = np.where(population[misfits, genes], 1, -1)
+        totals = totals.copy()
+        totals[misfits] += direction[:, np.newaxis] * profile[genes]
+        return totals
 
     def _replace_children_into_population(
-        self, population: list[list[bool]], children: list[list[bool]], items: list[KnapsackItem], capacity: int
-    ) -> list[list[bool]]:
-        child_idx = 0
-        for i, chromosome in enumerate(population):
-            # Replace children instead of misfits
-            if self._calculate_fitness(chromosome, items, capacity) == self._minimum_fitness:
-                population[i] = children[child_idx]
-                child_idx += 1
-            if child_idx == len(children):
-                return population
+        self, population: np.ndarray, children: np.ndarray, totals: np.ndarray, capacity: int
+    ) -> np.ndarray:
+        # Replace children instead of misfits
+        misfits = np.flatnonzero(self._calculate_fitness(totals, capacity) == self._minimum_fitness)[: len(children)]
+        population[misfits] = children[: len(misfits)]
 
         # when no misfits left, replace rest of children into random places
-        while child_idx < len(children):
-            child_loc = random.randint(0, len(population) - 1)
-            population[child_loc] = children[child_idx]
-            child_idx += 1
+        remaining_children = children[len(misfits) :]
+        population[self._rng.integers(0, len(population), size=len(remaining_children))] = remaining_children
         return population
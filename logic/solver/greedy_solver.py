@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 
 from logic.solver.base_solver import BaseSolver
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 
 
@@ -16,9 +18,9 @@ class SortableKnapsackItem:
 
 
 class GreedySolver(BaseSolver):
-    def solve(self, items: list[KnapsackItem], volume: int) -> list[KnapsackItem]:
+    def solve(self, items: list[KnapsackItem], volume: int, deadline: Optional[Deadline] = None) -> list[KnapsackItem]:
         sorted_items: list[SortableKnapsackItem] = self._sort_items_by_specific_weight_descending(items)
-        picked_items = self._fill_sack(sorted_items, volume)
+        picked_items = self._fill_sack(sorted_items, volume, deadline)
         highest_value_item = max(items, key=lambda item: item.value)
 
         return max(picked_items, [highest_value_item], key=lambda itms: sum(i.value for i in itms))
@@ -28,10 +30,10 @@ class GreedySolver(BaseSolver):
         return list(reversed(sorted((SortableKnapsackItem(item=i, specific_weight=i.value / i.volume) for i in items))))
 
     @staticmethod
-    def _fill_sack(sorted_items: list[SortableKnapsackItem], volume: int):
+    def _fill_sack(sorted_items: list[SortableKnapsackItem], volume: int, deadline: Optional[Deadline]):
         picked_items: list[KnapsackItem] = []
         for item in sorted_items:
-            if volume == 0:
+            if volume == 0 or (deadline and deadline.expired()):
                 break
             if volume - item.item.volume >= 0:
                 picked_items.append(item.item)
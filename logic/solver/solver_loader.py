@@ -1,5 +1,6 @@
 from logic.solver.base_solver import BaseSolver
 from logic.solver.branch_and_bound_solver import BranchAndBoundSolver
+from logic.solver.divide_and_conquer_dp_solver import DivideAndConquerDynamicProgrammingSolver
 from logic.solver.dynamic_programming_solver import DynamicProgrammingSolver
 from logic.solver.first_fit_solver import FitFirstSolver
 from logic.solver.genetic_solver import GeneticSolver
@@ -27,6 +28,7 @@ class SolverLoader:
             ),
             Algorithms.BRANCH_AND_BOUND: BranchAndBoundSolver(),
             Algorithms.DYNAMIC_PROGRAMMING: DynamicProgrammingSolver(),
+            Algorithms.DYNAMIC_PROGRAMMING_DIVIDE_AND_CONQUER: DivideAndConquerDynamicProgrammingSolver(),
         }
 
     def load(self, algorithm: Algorithms):
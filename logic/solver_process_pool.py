@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import DictProxy, SyncManager
+from time import time
+from typing import Any, Callable, Optional
+
+from logger import logger
+from logic.solver.base_solver import SolverResult
+from logic.solver.deadline import Cancellation, Deadline
+from logic.solver.solver_loader import SolverLoader
+from models.algorithms import Algorithms
+from models.config.configuration import Config
+from models.knapsack_item import KnapsackItem
+
+_worker_solver_loader: Optional[SolverLoader] = None
+
+
+def _init_worker(config: Config) -> None:
+    global _worker_solver_loader
+    _worker_solver_loader = SolverLoader(config)
+
+
+def mark_task_started(task_starts: DictProxy, task_id: int) -> None:
+    task_starts[task_id] = (os.getpid(), time())
+
+
+def _solve(
+    algorithm: Algorithms,
+    items: list[KnapsackItem],
+    volume: int,
+    deadline_at: float,
+    cancellation: Optional[Cancellation],
+    task_id: int,
+    task_starts: DictProxy,
+) -> SolverResult:
+    mark_task_started(task_starts, task_id)
+    return _worker_solver_loader.load(algorithm).solve_with_proof(items, volume, Deadline(deadline_at, cancellation))
+
+
+def _as_shared_event(event: Cancellation) -> Cancellation:
+    return event
+
+
+class SharedCancellation:
+    # Every call on a manager proxy is a blocking round trip to the manager process. Only this process sets the
+    # cancellation, so it answers is_set() from a local flag and forwards set() from a thread. Workers get the proxy.
+    def __init__(self, shared_event: Cancellation, manager_calls: Executor):
+        self._shared_event = shared_event
+        self._manager_calls = manager_calls
+        self._local_event = threading.Event()
+
+    def is_set(self) -> bool:
+        return self._local_event.is_set()
+
+    def set(self) -> None:
+        if not self._local_event.is_set():
+            self._local_event.set()
+            self._manager_calls.submit(self._shared_event.set)
+
+    def __reduce__(self):
+        return _as_shared_event, (self._shared_event,)
+
+
+class SolverProcessPool:
+    def __init__(self, config: Config, workers: int, max_tasks_per_worker: int, timeout_grace_seconds: float):
+        self._config = config
+        self._workers = workers
+        self._max_tasks_per_worker = max_tasks_per_worker
+        self._timeout_grace_seconds = timeout_grace_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._submitted_tasks = 0
+        self._manager: Optional[SyncManager] = None
+        self._manager_lock = threading.Lock()
+        self._manager_calls = ThreadPoolExecutor(thread_name_prefix="solver-manager-calls")
+        self._task_starts: Optional[DictProxy] = None
+        self._task_ids = itertools.count()
+        self._in_flight: dict[ProcessPoolExecutor, set[asyncio.Future]] = {}
+        self._stuck_workers: dict[ProcessPoolExecutor, dict[asyncio.Future, int]] = {}
+
+    async def solve(
+        self, algorithm: Algorithms, items: list[KnapsackItem], volume: int, deadline: Deadline
+    ) -> SolverResult:
+        executor = self._get_executor()
+        task_starts = await self._call_manager(self._get_task_starts)
+        task_id = next(self._task_ids)
+        try:
+            future = asyncio.wrap_future(
+                executor.submit(
+                    _solve, algorithm, items, volume, deadline.at, deadline.cancellation, task_id, task_starts
+                )
+            )
+        except BrokenProcessPool as e:
+            logger.error(f"Worker processes died, could not run algorithm {algorithm}", exc_info=e)
+            self._retire(executor)
+            return SolverResult([], False)
+        self._track(executor, future)
+        try:
+            worker_pid = await self._wait_for_solve(future, task_id, task_starts, deadline)
+            if worker_pid is None:
+                return future.result()
+            logger.warning(f"Algorithm {algorithm} overran its deadline, terminating its worker process")
+            self._stuck_workers.setdefault(executor, {})[future] = worker_pid
+            self._retire(executor)
+            self._terminate_drained(executor)
+            return SolverResult([], False)
+        except BrokenProcessPool as e:
+            # Other solves of the executor are not killed on purpose anymore, a worker crashed on its own
+            logger.error(f"Worker processes died while running algorithm {algorithm}", exc_info=e)
+            self._retire(executor)
+            return SolverResult([], False)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        finally:
+            self._manager_calls.submit(task_starts.pop, task_id, None)
+
+    async def _wait_for_solve(
+        self, future: asyncio.Future, task_id: int, task_starts: DictProxy, deadline: Deadline
+    ) -> Optional[int]:
+        # Returns the pid of the worker once the solve overran, solvers honour the deadline by themselves and the
+        # grace only catches the ones that don't. It starts when a worker picks the solve up, not while it is queued.
+        while True:
+            started = await self._call_manager(task_starts.get, task_id)
+            timeout = self._timeout_grace_seconds
+            if started:
+                worker_pid, started_at = started
+                timeout = max(deadline.at, started_at) + self._timeout_grace_seconds - time()
+                if timeout <= 0 and not future.done():
+                    return worker_pid
+            done, _ = await asyncio.wait({future}, timeout=max(timeout, 0))
+            if done:
+                return None
+
+    async def create_cancellation(self) -> Cancellation:
+        # Worker processes are spawned, so the event has to be a manager proxy to be shared with them
+        shared_event = await self._call_manager(lambda: self._get_manager().Event())
+        return SharedCancellation(shared_event, self._manager_calls)
+
+    async def _call_manager(self, function: Callable[..., Any], *args) -> Any:
+        # Manager calls block on inter-process round trips, they run in threads so the event loop keeps going
+        return await asyncio.get_running_loop().run_in_executor(self._manager_calls, function, *args)
+
+    def _get_manager(self) -> SyncManager:
+        with self._manager_lock:
+            if not self._manager:
+                self._manager = multiprocessing.get_context("spawn").Manager()
+            return self._manager
+
+    def _get_task_starts(self) -> DictProxy:
+        manager = self._get_manager()
+        with self._manager_lock:
+            if self._task_starts is None:
+                self._task_starts = manager.dict()
+            return self._task_starts
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Workers are replaced after a fixed amount of tasks so memory fragmentation from large solves is given back
+        if self._executor and self._submitted_tasks >= self._workers * self._max_tasks_per_worker:
+            self._retire(self._executor)
+        if not self._executor:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._config,),
+            )
+            self._submitted_tasks = 0
+        self._submitted_tasks += 1
+        return self._executor
+
+    def _track(self, executor: ProcessPoolExecutor, future: asyncio.Future) -> None:
+        self._in_flight.setdefault(executor, set()).add(future)
+
+        def on_done(done_future: asyncio.Future) -> None:
+            if not done_future.cancelled():
+                # Solves given up on still complete, or fail once their worker is terminated
+                done_future.exception()
+            self._in_flight.get(executor, set()).discard(done_future)
+            self._stuck_workers.get(executor, {}).pop(done_future, None)
+            if not self._in_flight.get(executor):
+                self._in_flight.pop(executor, None)
+                self._stuck_workers.pop(executor, None)
+            else:
+                self._terminate_drained(executor)
+
+        future.add_done_callback(on_done)
+
+    def _retire(self, executor: ProcessPoolExecutor) -> None:
+        # Retired executors take no new solves, their workers exit once the solves already submitted are done
+        if executor is self._executor:
+            self._executor = None
+        executor.shutdown(wait=False)
+
+    def _terminate_drained(self, executor: ProcessPoolExecutor) -> None:
+        # A stuck solve can't be cancelled, only killed. Killing a worker breaks the whole executor, so it waits until
+        # every other solve of that executor is done.
+        stuck_workers = self._stuck_workers.get(executor, {})
+        if not stuck_workers or self._in_flight.get(executor, set()) - stuck_workers.keys():
+            return
+        for worker_pid in set(stuck_workers.values()):
+            try:
+                os.kill(worker_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._manager:
+            self._manager.shutdown()
+            self._manager = None
+            self._task_starts = None
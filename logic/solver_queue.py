@@ -0,0 +1,39 @@
+from typing import Optional, Mapping
+
+from models.algorithms import Algorithms, AlgorithmClass, ALGORITHM_CLASSES
+
+DEADLINE_HEADER = "x-deadline"
+
+
+def get_request_deadline(headers: Optional[Mapping]) -> Optional[float]:
+    deadline = (headers or {}).get(DEADLINE_HEADER)
+    return float(deadline) if deadline is not None else None
+
+
+def get_solver_queue_arguments(max_priority: int) -> Optional[dict[str, int]]:
+    # Producers and consumers must declare the queue alike, the broker refuses a declaration with other arguments
+    return {"x-max-priority": max_priority} if max_priority > 0 else None
+
+
+def get_solver_queue_names(solver_queue: str, per_algorithm_class: bool) -> list[str]:
+    if not per_algorithm_class:
+        return [solver_queue]
+    return [_get_class_queue_name(solver_queue, algorithm_class) for algorithm_class in AlgorithmClass]
+
+
+def get_solver_queue_name(solver_queue: str, per_algorithm_class: bool, algorithms: list[Algorithms]) -> str:
+    if not per_algorithm_class:
+        return solver_queue
+    return _get_class_queue_name(solver_queue, get_algorithm_class(algorithms))
+
+
+def get_algorithm_class(algorithms: list[Algorithms]) -> AlgorithmClass:
+    # A request runs all of its algorithms on one solver, so it goes to the queue of its most demanding one
+    for algorithm_class, class_algorithms in ALGORITHM_CLASSES.items():
+        if class_algorithms.intersection(algorithms):
+            return algorithm_class
+    return AlgorithmClass.LIGHT
+
+
+def _get_class_queue_name(solver_queue: str, algorithm_class: AlgorithmClass) -> str:
+    return f"{solver_queue}.{algorithm_class.value}"
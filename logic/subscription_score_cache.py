@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from time import monotonic
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+from logger import logger
+from models.subscription import SubscriptionScore
+
+
+class CachedSubscriptionScore(NamedTuple):
+    score: SubscriptionScore
+    is_stale: bool
+
+
+class _CacheEntry(NamedTuple):
+    score: SubscriptionScore
+    fresh_until: float
+    stale_until: float
+
+
+class SubscriptionScoreCache:
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        not_found_ttl_seconds: float,
+        stale_seconds: float,
+        clock: Callable[[], float] = monotonic,
+    ):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._not_found_ttl_seconds = not_found_ttl_seconds
+        self._stale_seconds = stale_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
+
+    def get(self, knapsack_id: str) -> Optional[CachedSubscriptionScore]:
+        entry = self._entries.get(knapsack_id)
+        if not entry:
+            return None
+        now = self._clock()
+        if now >= entry.stale_until:
+            del self._entries[knapsack_id]
+            return None
+        self._entries.move_to_end(knapsack_id)
+        return CachedSubscriptionScore(entry.score, now >= entry.fresh_until)
+
+    def set(self, knapsack_id: str, score: SubscriptionScore, found: bool) -> None:
+        # Missing subscriptions are cached for a shorter time, so new subscribers are picked up quickly
+        fresh_until = self._clock() + (self._ttl_seconds if found else self._not_found_ttl_seconds)
+        self._entries[knapsack_id] = _CacheEntry(score, fresh_until, fresh_until + self._stale_seconds)
+        self._entries.move_to_end(knapsack_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def refresh_in_background(
+        self, knapsack_id: str, fetch: Callable[[], Awaitable[tuple[SubscriptionScore, bool]]]
+    ) -> None:
+        if knapsack_id not in self._refresh_tasks:
+            self._refresh_tasks[knapsack_id] = asyncio.create_task(self._refresh(knapsack_id, fetch))
+
+    async def _refresh(self, knapsack_id: str, fetch: Callable[[], Awaitable[tuple[SubscriptionScore, bool]]]):
+        try:
+            score, found = await fetch()
+            self.set(knapsack_id, score, found)
+        except Exception as e:
+            logger.warning(f"Failed refreshing subscription score of {knapsack_id}, serving the stale one", exc_info=e)
+        finally:
+            self._refresh_tasks.pop(knapsack_id, None)
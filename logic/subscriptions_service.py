@@ -1,20 +1,40 @@
 from http import HTTPStatus
+from typing import Optional
 
 from httpx import AsyncClient
 
 from logger import logger
+from logic.subscription_score_cache import SubscriptionScoreCache
 from models.subscription import SubscriptionType, SubscriptionScore
 
 
 class SubscriptionsService:
-    def __init__(self, client: AsyncClient):
+    def __init__(self, client: AsyncClient, cache: Optional[SubscriptionScoreCache] = None):
         self._subscription_type_to_score = {
             SubscriptionType.PREMIUM: SubscriptionScore.PREMIUM,
             SubscriptionType.STANDARD: SubscriptionScore.STANDARD,
         }
         self._client: AsyncClient = client
+        self._cache = cache
 
     async def get_subscription_score(self, knapsack_id: str) -> SubscriptionScore:
+        if not self._cache:
+            score, _ = await self._fetch_subscription_score(knapsack_id)
+            return score
+
+        cached = self._cache.get(knapsack_id)
+        if cached and not cached.is_stale:
+            return cached.score
+        if cached:
+            # Serve the stale score right away so a slow subscriptions server does not delay the solve
+            self._cache.refresh_in_background(knapsack_id, lambda: self._fetch_subscription_score(knapsack_id))
+            return cached.score
+
+        score, found = await self._fetch_subscription_score(knapsack_id)
+        self._cache.set(knapsack_id, score, found)
+        return score
+
+    async def _fetch_subscription_score(self, knapsack_id: str) -> tuple[SubscriptionScore, bool]:
         res = await self._client.get(f"/user_subscription_maps/{knapsack_id}")
         if res.status_code != HTTPStatus.OK and res.status_code != HTTPStatus.NOT_FOUND:
             try:
@@ -25,8 +45,9 @@ class SubscriptionsService:
 
         elif res.status_code == HTTPStatus.NOT_FOUND:
             logger.info(f"Could not find subscription. Using 'standard' score. Error message: {res.content}")
-            return SubscriptionScore.STANDARD
+            return SubscriptionScore.STANDARD, False
 
-        return self._subscription_type_to_score.get(
+        score = self._subscription_type_to_score.get(
             res.json()["result"]["subscription_name"], SubscriptionScore.STANDARD
         )
+        return score, True
@@ -1,15 +1,179 @@
 import json
-from typing import Optional
+from datetime import datetime
+from typing import Iterable, Optional
 from uuid import uuid4
 
 from aioredis import Redis
 
 from logic.claims_service import ClaimsService
 from logic.time_service import TimeService
-from models.knapsack_item import KnapsackItem
-from models.solution import SuggestedSolution, AcceptedSolution, AlgorithmSolution
+from models.solution import SuggestedSolution, AlgorithmSolution, AcceptedSolution
 from models.suggested_solutions_actions_statuses import AcceptResult, RejectResult
 
+# Runs a variadic command over the values in chunks, staying below Lua's unpack limit
+CALL_CHUNKED_LUA = """
+local function call_chunked(command, key, values)
+    for i = 1, #values, 1000 do
+        redis.call(command, key, unpack(values, i, math.min(i + 999, #values)))
+    end
+end
+"""
+
+# Collects the script arguments from the given position on, avoiding a huge unpack
+ARGS_FROM_LUA = """
+local function args_from(first)
+    local values = {}
+    for i = first, #ARGV do
+        values[#values + 1] = ARGV[i]
+    end
+    return values
+end
+"""
+
+# Releases the claims of every item in the suggestion claims set outside the kept ids, then drops the set
+RELEASE_SUGGESTION_CLAIMS_LUA = (
+    CALL_CHUNKED_LUA
+    + """
+local function release_suggestion_claims(claims_hash, suggestion_claims, kept_ids)
+    local released = {}
+    for _, item_id in ipairs(redis.call('SMEMBERS', suggestion_claims)) do
+        if not kept_ids[item_id] then
+            released[#released + 1] = item_id
+        end
+    end
+    call_chunked('HDEL', claims_hash, released)
+    redis.call('DEL', suggestion_claims)
+end
+"""
+)
+
+# KEYS: suggestion key, suggestion claims set, suggestions expiry index.
+# ARGV: knapsack id, suggestion, ttl seconds, issue timestamp, suggested item ids.
+# The suggested item ids outlive the expiring suggestion, so their claims can still be released once it expires.
+REGISTER_SUGGESTION_SCRIPT = (
+    CALL_CHUNKED_LUA
+    + ARGS_FROM_LUA
+    + """
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+call_chunked('SADD', KEYS[2], args_from(5))
+redis.call('ZADD', KEYS[3], ARGV[4], ARGV[1])
+return 1
+"""
+)
+
+# KEYS: suggestions hash, suggestion key, suggestion claims set, suggestions expiry index.
+# ARGV: knapsack id, ttl seconds, issue timestamp, suggested item ids.
+# Moves a suggestion of the former single hash layout to its own expiring key, unless a newer one exists.
+MIGRATE_SUGGESTION_SCRIPT = (
+    CALL_CHUNKED_LUA
+    + ARGS_FROM_LUA
+    + """
+local encoded_suggestion = redis.call('HGET', KEYS[1], ARGV[1])
+if not encoded_suggestion then
+    return 0
+end
+redis.call('SET', KEYS[2], encoded_suggestion, 'EX', ARGV[2], 'NX')
+call_chunked('SADD', KEYS[3], args_from(4))
+redis.call('ZADD', KEYS[4], 'NX', ARGV[3], ARGV[1])
+redis.call('HDEL', KEYS[1], ARGV[1])
+return 1
+"""
+)
+
+# KEYS: suggestion key, suggestion claims set, items claims hash, accepted solutions index, suggestions expiry index.
+# ARGV: knapsack id, solution id, accept time, accept timestamp.
+# The accepted solution is assembled by hand since cjson encodes an empty items array as an object.
+ACCEPT_SOLUTION_SCRIPT = (
+    RELEASE_SUGGESTION_CLAIMS_LUA
+    + """
+local encoded_suggestion = redis.call('GET', KEYS[1])
+if not encoded_suggestion then
+    return 0
+end
+local accepted = cjson.decode(encoded_suggestion)['solutions'][ARGV[2]]
+if not accepted then
+    return 0
+end
+
+local accepted_ids = {}
+local encoded_items = {}
+for _, item in ipairs(accepted['items']) do
+    accepted_ids[item['id']] = true
+    encoded_items[#encoded_items + 1] = cjson.encode(item)
+end
+release_suggestion_claims(KEYS[3], KEYS[2], accepted_ids)
+redis.call(
+    'ZADD', KEYS[4], ARGV[4],
+    '{"time": ' .. cjson.encode(ARGV[3]) .. ', "solution": [' .. table.concat(encoded_items, ', ') ..
+    '], "knapsack_id": ' .. cjson.encode(ARGV[1]) .. '}'
+)
+redis.call('DEL', KEYS[1])
+redis.call('ZREM', KEYS[5], ARGV[1])
+return 1
+"""
+)
+
+# KEYS: suggestion key, suggestion claims set, items claims hash, suggestions expiry index. ARGV: knapsack id.
+# Claims left behind by an already expired suggestion are released as well.
+REJECT_SOLUTIONS_SCRIPT = (
+    RELEASE_SUGGESTION_CLAIMS_LUA
+    + """
+redis.call('ZREM', KEYS[4], ARGV[1])
+release_suggestion_claims(KEYS[3], KEYS[2], {})
+return redis.call('DEL', KEYS[1])
+"""
+)
+
+# KEYS: items claims hash, suggestions expiry index, then a suggestion key and suggestion claims set per knapsack.
+# ARGV: knapsack ids. Releases the claims of the expired suggestions, skipping suggestions registered again meanwhile.
+RELEASE_EXPIRED_SUGGESTIONS_SCRIPT = (
+    RELEASE_SUGGESTION_CLAIMS_LUA
+    + """
+local released = {}
+for i, knapsack_id in ipairs(ARGV) do
+    if redis.call('EXISTS', KEYS[i * 2 + 1]) == 0 then
+        release_suggestion_claims(KEYS[1], KEYS[i * 2 + 2], {})
+        redis.call('ZREM', KEYS[2], knapsack_id)
+        released[#released + 1] = knapsack_id
+    end
+end
+return released
+"""
+)
+
+# KEYS: suggestion key, suggestion claims set. ARGV: suggestion, added item ids.
+# Updates only a suggestion that was not accepted, rejected or expired meanwhile.
+UPDATE_SUGGESTION_SCRIPT = (
+    CALL_CHUNKED_LUA
+    + ARGS_FROM_LUA
+    + """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'KEEPTTL')
+call_chunked('SADD', KEYS[2], args_from(2))
+return 1
+"""
+)
+
+# KEYS: accepted solutions index, items claims hash. ARGV: accepted before timestamp, max solutions.
+# Removes the expired accepted solutions and releases all of their items claims, returning the removed solutions.
+RELEASE_EXPIRED_ACCEPTED_SOLUTIONS_SCRIPT = (
+    CALL_CHUNKED_LUA
+    + """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+local released = {}
+for _, encoded_solution in ipairs(expired) do
+    for _, item in ipairs(cjson.decode(encoded_solution)['solution']) do
+        released[#released + 1] = item['id']
+    end
+end
+call_chunked('HDEL', KEYS[2], released)
+call_chunked('ZREM', KEYS[1], expired)
+return expired
+"""
+)
+
 
 class SuggestedSolutionsService:
     def __init__(
@@ -19,93 +183,182 @@ class SuggestedSolutionsService:
         time_service: TimeService,
         solution_suggestions_hash_name: str,
         accepted_suggestions_list_name: str,
+        suggestions_expiry_index_name: str,
+        accepted_suggestions_index_name: str,
+        suggestions_key_prefix: str,
+        suggestion_ttl_seconds: int,
     ):
         self._redis = redis
         self._claims_service = claims_service
         self._time_service = time_service
         self._solution_suggestions_hash_name = solution_suggestions_hash_name
         self._accepted_suggestions_list_name = accepted_suggestions_list_name
+        self._suggestions_expiry_index_name = suggestions_expiry_index_name
+        self._accepted_suggestions_index_name = accepted_suggestions_index_name
+        self._suggestions_key_prefix = suggestions_key_prefix
+        self._suggestion_ttl_seconds = suggestion_ttl_seconds
+        self._register_script = redis.register_script(REGISTER_SUGGESTION_SCRIPT)
+        self._migrate_script = redis.register_script(MIGRATE_SUGGESTION_SCRIPT)
+        self._accept_script = redis.register_script(ACCEPT_SOLUTION_SCRIPT)
+        self._reject_script = redis.register_script(REJECT_SOLUTIONS_SCRIPT)
+        self._update_script = redis.register_script(UPDATE_SUGGESTION_SCRIPT)
+        self._release_expired_script = redis.register_script(RELEASE_EXPIRED_SUGGESTIONS_SCRIPT)
+        self._release_expired_accepted_script = redis.register_script(RELEASE_EXPIRED_ACCEPTED_SOLUTIONS_SCRIPT)
 
-    async def register_suggested_solutions(self, solutions: list[AlgorithmSolution], knapsack_id: str) -> None:
+    async def register_suggested_solutions(
+        self, solutions: list[AlgorithmSolution], knapsack_id: str
+    ) -> SuggestedSolution:
         solution_suggestion = SuggestedSolution(
             time=self._time_service.now(), solutions=self._assign_ids_to_suggested_solutions(solutions)
         )
-        await self._redis.hset(self._solution_suggestions_hash_name, knapsack_id, solution_suggestion.json())
-
-    async def accept_suggested_solution(self, knapsack_id: str, solution_id: str) -> AcceptResult:
-        is_suggestions_claimed = await self._claims_service.claim_suggested_solutions(knapsack_id)
-        if not is_suggestions_claimed:
-            return AcceptResult.CLAIM_FAILED
-
-        try:
-            solutions_suggestions = await self.get_solutions(knapsack_id)
-            if not solutions_suggestions:
-                return AcceptResult.SOLUTION_NOT_EXISTS
-            accepted_solution_items: AlgorithmSolution = solutions_suggestions.solutions[solution_id]
-            await self._release_claims_of_non_accepted_solutions(accepted_solution_items, solutions_suggestions)
-            await self._perform_accept_single_solution(accepted_solution_items, knapsack_id)
-        finally:
-            await self._claims_service.release_claim_suggested_solutions(knapsack_id)
-        return AcceptResult.ACCEPT_SUCCESS
+        await self._register_script(
+            keys=[
+                self._suggestion_key(knapsack_id),
+                self._suggestion_claims_key(knapsack_id),
+                self._suggestions_expiry_index_name,
+            ],
+            args=[
+                knapsack_id,
+                solution_suggestion.json(),
+                self._suggestion_ttl_seconds,
+                solution_suggestion.time.timestamp(),
+                *self._get_item_ids(solutions),
+            ],
+        )
+        return solution_suggestion
 
-    async def reject_suggested_solutions(self, knapsack_id: str) -> RejectResult:
-        is_suggestions_claimed = await self._claims_service.claim_suggested_solutions(knapsack_id)
-        if not is_suggestions_claimed:
-            return RejectResult.CLAIM_FAILED
-
-        try:
-            solutions_suggestions = await self.get_solutions(knapsack_id)
-            if not solutions_suggestions:
-                return RejectResult.SUGGESTION_NOT_EXISTS
-            await self._release_claims_of_non_accepted_solutions(
-                accepted_solution=AlgorithmSolution(items=[]), solutions_suggestions=solutions_suggestions
+    async def add_suggested_solution(
+        self, suggestion: SuggestedSolution, solution: AlgorithmSolution, knapsack_id: str
+    ) -> bool:
+        suggestion.solutions.update(self._assign_ids_to_suggested_solutions([solution]))
+        return bool(
+            await self._update_script(
+                keys=[self._suggestion_key(knapsack_id), self._suggestion_claims_key(knapsack_id)],
+                args=[suggestion.json(), *self._get_item_ids([solution])],
             )
-            await self._remove_solution_suggestion(knapsack_id)
-        finally:
-            await self._claims_service.release_claim_suggested_solutions(knapsack_id)
-        return RejectResult.REJECT_SUCCESS
-
-    async def is_solution_exists(self, knapsack_id: str, solution_id: str) -> bool:
-        solutions_suggestions = await self.get_solutions(knapsack_id)
-        if not solutions_suggestions:
-            return False
+        )
 
-        if solution_id not in solutions_suggestions.solutions:
-            return False
+    async def accept_suggested_solution(self, knapsack_id: str, solution_id: str) -> AcceptResult:
+        accept_time = self._time_service.now()
+        accepted = await self._accept_script(
+            keys=[
+                self._suggestion_key(knapsack_id),
+                self._suggestion_claims_key(knapsack_id),
+                self._claims_service.items_claim_hash,
+                self._accepted_suggestions_index_name,
+                self._suggestions_expiry_index_name,
+            ],
+            args=[knapsack_id, solution_id, accept_time.isoformat(), accept_time.timestamp()],
+        )
+        return AcceptResult.ACCEPT_SUCCESS if accepted else AcceptResult.SOLUTION_NOT_EXISTS
 
-        return True
+    async def reject_suggested_solutions(self, knapsack_id: str) -> RejectResult:
+        rejected = await self._reject_script(
+            keys=[
+                self._suggestion_key(knapsack_id),
+                self._suggestion_claims_key(knapsack_id),
+                self._claims_service.items_claim_hash,
+                self._suggestions_expiry_index_name,
+            ],
+            args=[knapsack_id],
+        )
+        return RejectResult.REJECT_SUCCESS if rejected else RejectResult.SUGGESTION_NOT_EXISTS
 
     async def get_solutions(self, knapsack_id: str) -> Optional[SuggestedSolution]:
-        encoded_solution = await self._redis.hget(self._solution_suggestions_hash_name, knapsack_id)
+        encoded_solution = await self._redis.get(self._suggestion_key(knapsack_id))
         if not encoded_solution:
             return None
 
         return SuggestedSolution(**json.loads(encoded_solution.decode()))
 
-    async def _release_claims_of_non_accepted_solutions(
-        self, accepted_solution: AlgorithmSolution, solutions_suggestions: SuggestedSolution
-    ) -> None:
-        accepted_solution_item_ids: set[str] = {i.id for i in accepted_solution.items}
-        items_claims_to_release: list[KnapsackItem] = [
-            i
-            for sol in solutions_suggestions.solutions.values()
-            for i in sol.items
-            if i.id not in accepted_solution_item_ids
+    async def get_solutions_many(self, knapsack_ids: list[str]) -> list[Optional[SuggestedSolution]]:
+        if not knapsack_ids:
+            return []
+        encoded_solutions = await self._redis.mget([self._suggestion_key(knapsack_id) for knapsack_id in knapsack_ids])
+        return [
+            SuggestedSolution(**json.loads(encoded_solution.decode())) if encoded_solution else None
+            for encoded_solution in encoded_solutions
         ]
-        await self._claims_service.release_items_claims(items_claims_to_release)
 
-    async def _perform_accept_single_solution(self, accepted_solution: AlgorithmSolution, knapsack_id: str):
-        await self._register_accepted_solution(accepted_solution.items, knapsack_id)
-        await self._remove_solution_suggestion(knapsack_id)
+    def get_knapsack_id(self, suggestion_key: str) -> Optional[str]:
+        prefix = f"{self._suggestions_key_prefix}:"
+        return suggestion_key[len(prefix) :] if suggestion_key.startswith(prefix) else None
+
+    async def get_expired_knapsack_ids(self, issued_before: datetime, count: int) -> list[str]:
+        knapsack_ids = await self._redis.zrangebyscore(
+            self._suggestions_expiry_index_name, "-inf", issued_before.timestamp(), start=0, num=count
+        )
+        return [knapsack_id.decode() for knapsack_id in knapsack_ids]
+
+    async def release_expired_suggestions(self, knapsack_ids: list[str]) -> list[str]:
+        if not knapsack_ids:
+            return []
+        suggestion_keys = []
+        for knapsack_id in knapsack_ids:
+            suggestion_keys += [self._suggestion_key(knapsack_id), self._suggestion_claims_key(knapsack_id)]
+        released = await self._release_expired_script(
+            keys=[self._claims_service.items_claim_hash, self._suggestions_expiry_index_name, *suggestion_keys],
+            args=knapsack_ids,
+        )
+        return [knapsack_id.decode() for knapsack_id in released]
+
+    async def migrate_suggestions_hash(self) -> int:
+        # Moves suggestions of the former single hash layout to their own keys, keeping their remaining time to live
+        migrated = 0
+        async for knapsack_id, encoded_suggestion in self._redis.hscan_iter(self._solution_suggestions_hash_name):
+            knapsack_id = knapsack_id.decode()
+            suggestion = SuggestedSolution(**json.loads(encoded_suggestion.decode()))
+            remaining_seconds = (
+                self._suggestion_ttl_seconds - (self._time_service.now() - suggestion.time).total_seconds()
+            )
+            migrated += await self._migrate_script(
+                keys=[
+                    self._solution_suggestions_hash_name,
+                    self._suggestion_key(knapsack_id),
+                    self._suggestion_claims_key(knapsack_id),
+                    self._suggestions_expiry_index_name,
+                ],
+                args=[
+                    knapsack_id,
+                    max(int(remaining_seconds), 1),
+                    suggestion.time.timestamp(),
+                    *self._get_item_ids(suggestion.solutions.values()),
+                ],
+            )
+        return migrated
 
-    async def _register_accepted_solution(self, accepted_solution_items: list[KnapsackItem], knapsack_id: str):
-        accepted_solution = AcceptedSolution(
-            time=self._time_service.now(), solution=accepted_solution_items, knapsack_id=knapsack_id
+    async def release_expired_accepted_solutions(self, accepted_before: datetime, count: int) -> list[AcceptedSolution]:
+        released = await self._release_expired_accepted_script(
+            keys=[self._accepted_suggestions_index_name, self._claims_service.items_claim_hash],
+            args=[accepted_before.timestamp(), count],
         )
-        await self._redis.rpush(self._accepted_suggestions_list_name, accepted_solution.json())
+        return [AcceptedSolution(**json.loads(encoded_solution.decode())) for encoded_solution in released]
 
-    async def _remove_solution_suggestion(self, knapsack_id: str):
-        await self._redis.hdel(self._solution_suggestions_hash_name, knapsack_id)
+    async def migrate_accepted_solutions_list(self, batch_size: int) -> int:
+        # Moves accepted solutions logged before the accepted solutions index existed into it. Moving the same
+        # solution twice after a crash is harmless since the index keeps a single copy of it.
+        migrated = 0
+        while True:
+            encoded_solutions = await self._redis.lrange(self._accepted_suggestions_list_name, 0, batch_size - 1)
+            if not encoded_solutions:
+                return migrated
+            accept_times = {
+                encoded_solution: AcceptedSolution(**json.loads(encoded_solution.decode())).time.timestamp()
+                for encoded_solution in encoded_solutions
+            }
+            await self._redis.zadd(self._accepted_suggestions_index_name, accept_times)
+            await self._redis.ltrim(self._accepted_suggestions_list_name, len(encoded_solutions), -1)
+            migrated += len(encoded_solutions)
+
+    def _suggestion_key(self, knapsack_id: str) -> str:
+        return f"{self._suggestions_key_prefix}:{knapsack_id}"
+
+    def _suggestion_claims_key(self, knapsack_id: str) -> str:
+        return f"{self._suggestions_key_prefix}_claims:{knapsack_id}"
+
+    @staticmethod
+    def _get_item_ids(solutions: Iterable[AlgorithmSolution]) -> set[str]:
+        return {item.id for solution in solutions for item in solution.items}
 
     @staticmethod
     def _assign_ids_to_suggested_solutions(solutions: list[AlgorithmSolution]) -> dict[str, AlgorithmSolution]:
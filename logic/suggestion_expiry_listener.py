@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from aioredis import Redis
+
+from logger import logger
+from logic.pubsub_listener import PubSubListener
+from logic.suggested_solution_service import SuggestedSolutionsService
+
+
+class SuggestionExpiryListener(PubSubListener):
+    def __init__(
+        self,
+        redis: Redis,
+        suggested_solution_service: SuggestedSolutionsService,
+        batch_size: int,
+        resubscribe_delay_seconds: float = 1,
+    ):
+        super().__init__(
+            redis,
+            f"__keyevent@{redis.connection_pool.connection_kwargs.get('db', 0)}__:expired",
+            "Suggestion expiry",
+            resubscribe_delay_seconds=resubscribe_delay_seconds,
+            batch_size=batch_size,
+        )
+        self._suggested_solution_service = suggested_solution_service
+
+    async def start(self) -> None:
+        if self._listen_task:
+            return
+        await self._enable_expired_events()
+        await super().start()
+
+    async def _enable_expired_events(self) -> None:
+        try:
+            flags = (await self._redis.config_get("notify-keyspace-events")).get("notify-keyspace-events", "")
+            if "E" not in flags or ("x" not in flags and "A" not in flags):
+                await self._redis.config_set("notify-keyspace-events", f"{flags}Ex")
+        except Exception as e:
+            # Managed servers may forbid CONFIG, expired suggestions are then left to the periodic sweep
+            logger.warning("Could not enable expired keyspace events", exc_info=e)
+
+    async def _handle_messages(self, messages: list[dict]) -> None:
+        # Expiries notified while resubscribing are lost, the periodic sweep releases their claims
+        knapsack_ids = [
+            knapsack_id
+            for knapsack_id in (
+                self._suggested_solution_service.get_knapsack_id(message["data"].decode()) for message in messages
+            )
+            if knapsack_id is not None
+        ]
+        if knapsack_ids:
+            await self._suggested_solution_service.release_expired_suggestions(knapsack_ids)
@@ -3,9 +3,16 @@ import asyncio
 import uvicorn
 
 import server
-from component_factory import get_solver_consumer, get_solution_maintainer, get_config, get_subscriptions_service
+from component_factory import (
+    get_solver_consumer,
+    get_solution_maintainer,
+    get_config,
+    get_subscriptions_service,
+    get_suggestion_expiry_listener,
+)
 from logic.consumer.solver_instance_consumer import SolverInstanceConsumer
 from logic.solution_maintainer import run_tasks
+from logic.solver_queue import get_solver_queue_names
 from models.config.configuration import Config, DeploymentType
 
 
@@ -17,17 +24,21 @@ def main(config: Config):
         return
     if config.deployment_type == DeploymentType.SOLVER:
         consumer = get_solver_consumer()
-        loop.run_until_complete(start_solver_consumer(consumer, config.solver_queue))
+        # Solver pods can be dedicated to some algorithm classes, by default they consume every solver queue
+        queue_names = config.solver_consume_queues or get_solver_queue_names(
+            config.solver_queue, config.solver_queue_per_algorithm_class
+        )
+        loop.run_until_complete(start_solver_consumer(consumer, *queue_names))
         return
     if config.deployment_type == DeploymentType.MAINTAINER:
         maintainer = get_solution_maintainer()
-        loop.run_until_complete(run_tasks(maintainer))
+        loop.run_until_complete(run_tasks(maintainer, get_suggestion_expiry_listener()))
         loop.run_forever()
 
 
-async def start_solver_consumer(consumer: SolverInstanceConsumer, queue_name: str):
+async def start_solver_consumer(consumer: SolverInstanceConsumer, *queue_names: str):
     async with consumer:
-        await consumer.start_consuming(queue_name)
+        await consumer.start_consuming(*queue_names)
 
 
 if __name__ == "__main__":
@@ -5,6 +5,27 @@ class Algorithms(str, Enum):
     GREEDY = "greedy"
     FIRST_FIT = "firstFit"
     DYNAMIC_PROGRAMMING = "dynamicProgramming"
+    DYNAMIC_PROGRAMMING_DIVIDE_AND_CONQUER = "dynamicProgrammingDivideAndConquer"
     GENETIC_LIGHT = "geneticFewGenerations"
     GENETIC_HEAVY = "geneticLotsGenerations"
     BRANCH_AND_BOUND = "branchAndBound"
+
+
+# Algorithms whose result is proven optimal when they finish before their deadline
+EXACT_ALGORITHMS = frozenset(
+    {Algorithms.DYNAMIC_PROGRAMMING, Algorithms.DYNAMIC_PROGRAMMING_DIVIDE_AND_CONQUER, Algorithms.BRANCH_AND_BOUND}
+)
+
+
+class AlgorithmClass(str, Enum):
+    EXACT = "exact"
+    HEAVY = "heavy"
+    LIGHT = "light"
+
+
+# Ordered from the most to the least demanding class
+ALGORITHM_CLASSES: dict[AlgorithmClass, frozenset[Algorithms]] = {
+    AlgorithmClass.EXACT: EXACT_ALGORITHMS,
+    AlgorithmClass.HEAVY: frozenset({Algorithms.GENETIC_HEAVY}),
+    AlgorithmClass.LIGHT: frozenset({Algorithms.GENETIC_LIGHT, Algorithms.GREEDY, Algorithms.FIRST_FIT}),
+}
@@ -19,17 +19,28 @@ class Config(NamedTuple):
     redis_connection_params: RedisConnectionParams
 
     solver_queue: str
+    solver_queue_max_priority: int
+    solver_queue_per_algorithm_class: bool
+    solver_consume_queues: list[str]
 
     items_claim_hash: str
-    suggested_solutions_claims_hash: str
     running_knapsack_claims_hash: str
 
     solutions_channel_prefix: str
     wait_for_report_timeout_seconds: float
+    solution_waiters_tracking_enabled: bool
+    solve_cancellations_channel: str
+    solve_jobs_key_prefix: str
+    solve_job_ttl_seconds: int
+    solve_batch_max_size: int
+    suggestions_key_prefix: str
     suggested_solutions_hash: str
     accepted_solutions_list: str
+    suggestions_expiry_index: str
+    accepted_solutions_index: str
 
     clean_old_suggestion_interval_seconds: int
+    clean_old_suggestions_batch_size: int
     clean_old_accepted_solutions_interval_seconds: int
     suggestion_ttl_seconds: int
     accepted_solution_ttl_seconds: int
@@ -49,5 +60,35 @@ class Config(NamedTuple):
 
     algo_decider_branch_and_bound_max_items: int
     algo_decider_dynamic_programming_max_iterations: int
+    algo_decider_dynamic_programming_max_table_bytes: int
+
+    solver_request_budget_seconds: float
+    solver_process_pool_workers: int
+    solver_process_pool_max_tasks_per_worker: int
+    solver_process_pool_timeout_grace_seconds: float
+    solver_portfolio_mode: bool
+    solver_prefetch_count: int
+    solver_max_concurrent_messages: int
+
+    redis_pool_max_connections: int
+    redis_pool_checkout_timeout_seconds: float
+    redis_pool_health_check_interval_seconds: float
+    redis_pool_metrics_enabled: bool
+    redis_pool_slow_checkout_seconds: float
+    redis_pool_metrics_log_interval_seconds: float
+
+    rabbit_channel_pool_max_channels: int
+    rabbit_channel_pool_metrics_enabled: bool
+    rabbit_channel_pool_metrics_log_interval_seconds: float
+
+    cluster_availability_sample_interval_seconds: float
+    cluster_availability_smoothing_factor: float
+    cluster_availability_hysteresis_ratio: float
 
     subscription_backend_base_url: str
+    subscription_client_max_connections: int
+    subscription_client_max_keepalive_connections: int
+    subscription_cache_max_entries: int
+    subscription_cache_ttl_seconds: float
+    subscription_cache_not_found_ttl_seconds: float
+    subscription_cache_stale_seconds: float
@@ -1,5 +1,9 @@
+from typing import Optional
+
 from models.base_model import BaseModel
 from models.knapsack_item import KnapsackItem
+from models.solution import SolutionReportCause, SuggestedSolution
+from models.solve_job import SolveJobStatus
 from models.suggested_solutions_actions_statuses import AcceptResult, RejectResult
 
 
@@ -7,6 +11,21 @@ class RouterSolveRequest(BaseModel):
     items: list[KnapsackItem]
     volume: int
     knapsack_id: str
+    deadline_seconds: Optional[float] = None
+
+
+class RouterSolveBatchRequest(BaseModel):
+    requests: list[RouterSolveRequest]
+
+
+class RouterSolveBatchResult(BaseModel):
+    knapsack_id: str
+    cause: SolutionReportCause
+    suggested_solution: Optional[SuggestedSolution]
+
+
+class RouterSolveBatchResponse(BaseModel):
+    results: list[RouterSolveBatchResult]
 
 
 class RouterResolveResponse(BaseModel):
@@ -33,3 +52,14 @@ class RejectSolutionResponse(BaseModel):
 
 class ItemClaimedResponse(BaseModel):
     is_claimed: bool
+
+
+class RouterSolveAsyncResponse(BaseModel):
+    job_id: str
+
+
+class SolveJobResponse(BaseModel):
+    job_id: str
+    status: SolveJobStatus
+    cause: Optional[SolutionReportCause]
+    suggested_solution: Optional[SuggestedSolution]
@@ -1,6 +1,9 @@
+from typing import Optional
+
 from models.algorithms import Algorithms
 from models.base_model import BaseModel
 from models.knapsack_item import KnapsackItem
+from models.subscription import SubscriptionScore
 
 
 class SolverInstanceRequest(BaseModel):
@@ -8,3 +11,6 @@ class SolverInstanceRequest(BaseModel):
     volume: int
     knapsack_id: str
     algorithms: list[Algorithms]
+    subscription_score: SubscriptionScore = SubscriptionScore.STANDARD
+    # Unix time after which nobody waits for the solution anymore
+    deadline: Optional[float] = None
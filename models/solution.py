@@ -13,10 +13,13 @@ class SolutionReportCause(str, Enum):
     SUGGESTION_ALREADY_EXISTS = "suggestion_already_exists"
     TIMEOUT = "timeout"
     GOT_EXCEPTION = "exception"
+    CANCELLED = "cancelled"
 
 
 class SolutionReport(BaseModel):
     cause: SolutionReportCause
+    # Solvers report every solution as soon as it is found, the final report follows the last one
+    is_final: bool = True
 
 
 class AlgorithmSolution(BaseModel):
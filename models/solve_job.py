@@ -0,0 +1,17 @@
+from enum import Enum
+from typing import Optional
+
+from models.base_model import BaseModel
+from models.solution import SolutionReport
+
+
+class SolveJobStatus(str, Enum):
+    PENDING = "pending"
+    DONE = "done"
+
+
+class SolveJob(BaseModel):
+    job_id: str
+    knapsack_id: str
+    status: SolveJobStatus = SolveJobStatus.PENDING
+    report: Optional[SolutionReport]
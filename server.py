@@ -1,7 +1,37 @@
 from fastapi import FastAPI
 
+from component_factory import (
+    open_redis_api_pool,
+    close_redis_api_pool,
+    open_rabbit_channel_pool,
+    close_rabbit_channel_pool,
+    open_solution_reports_listener,
+    close_solution_reports_listeners,
+    open_cluster_availability_sampler,
+    close_cluster_availability_samplers,
+    close_subscriptions_client,
+    close_solve_jobs_tracker,
+)
 from controllers.router_controller import router as router_controller_router
 
 app = FastAPI()
 
 app.include_router(router_controller_router, prefix="/knapsack-router")
+
+
+@app.on_event("startup")
+async def open_connection_pools():
+    open_redis_api_pool()
+    open_rabbit_channel_pool()
+    await open_solution_reports_listener()
+    await open_cluster_availability_sampler()
+
+
+@app.on_event("shutdown")
+async def close_connection_pools():
+    await close_solve_jobs_tracker()
+    await close_solution_reports_listeners()
+    await close_cluster_availability_samplers()
+    await close_redis_api_pool()
+    await close_rabbit_channel_pool()
+    await close_subscriptions_client()
@@ -1,21 +1,42 @@
+import asyncio
 import http
-from datetime import datetime, timedelta
-from unittest.mock import AsyncMock
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
+from fastapi import Request
 from fastapi.responses import JSONResponse
 
-from controllers.router_controller import route_solve, accept_solution, reject_solutions
-from logic.algorithm_decider import AlgorithmDecider
+from controllers.router_controller import (
+    route_solve,
+    accept_solution,
+    reject_solutions,
+    route_solve_async,
+    get_solve_job,
+    route_solve_batch,
+)
+from logic.algorithm_decider import AlgorithmDecider, AlgorithmDecision
 from logic.producer.solver_router_producer import SolverRouterProducer
 from logic.solution_report_waiter import SolutionReportWaiter
+from logic.solution_reports_listener import SolutionReportsListener
+from logic.solve_cancellation_publisher import SolveCancellationPublisher
+from logic.solve_jobs_service import SolveJobsService
+from logic.solve_jobs_tracker import SolveJobsTracker
 from logic.suggested_solution_service import SuggestedSolutionsService
 from logic.time_service import TimeService
 from models.algorithms import Algorithms
 from models.config.configuration import Config
 from models.knapsack_item import KnapsackItem
-from models.knapsack_router_dto import RouterSolveRequest, AcceptSolutionRequest, RejectSolutionsRequest
+from models.knapsack_router_dto import (
+    RouterSolveRequest,
+    AcceptSolutionRequest,
+    RejectSolutionsRequest,
+    RouterSolveAsyncResponse,
+    RouterSolveBatchRequest,
+)
 from models.solution import SuggestedSolution, SolutionReport, SolutionReportCause, AlgorithmSolution
+from models.solve_job import SolveJob, SolveJobStatus
+from models.subscription import SubscriptionScore
 from models.suggested_solutions_actions_statuses import AcceptResult, RejectResult
 from test.utils import get_random_string
 
@@ -41,10 +62,18 @@ def solution_reports_waiter_mock() -> SolutionReportWaiter:
     return AsyncMock(SolutionReportWaiter)
 
 
+@pytest.fixture
+def http_request_mock() -> Request:
+    http_request = MagicMock(Request)
+    http_request.is_disconnected = AsyncMock(return_value=False)
+    return http_request
+
+
 @pytest.mark.asyncio
 async def test_route_solve_solution_found(
     time_service_mock: TimeService,
     solution_reports_waiter_mock: SolutionReportWaiter,
+    http_request_mock: Request,
     solution_suggestions_service_with_mocks: SuggestedSolutionsService,
     knapsack_id,
     config: Config,
@@ -59,7 +88,7 @@ async def test_route_solve_solution_found(
     request = RouterSolveRequest(items=expected_items.items, volume=10, knapsack_id=knapsack_id)
     solve_request_producer = AsyncMock(SolverRouterProducer)
     algo_decider = AsyncMock(AlgorithmDecider)
-    algo_decider.decide = AsyncMock(return_value=[Algorithms.FIRST_FIT])
+    algo_decider.decide = AsyncMock(return_value=AlgorithmDecision([Algorithms.FIRST_FIT], SubscriptionScore.STANDARD))
     solution_reports_waiter_mock.wait_for_solution_report = AsyncMock(
         return_value=SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND)
     )
@@ -69,6 +98,7 @@ async def test_route_solve_solution_found(
 
     response = await route_solve(
         request,
+        http_request_mock,
         algo_decider,
         solve_request_producer,
         solution_reports_waiter_mock,
@@ -97,6 +127,7 @@ async def test_route_solve_errors(
     expected_status: http.HTTPStatus,
     time_service_mock: TimeService,
     solution_reports_waiter_mock: SolutionReportWaiter,
+    http_request_mock: Request,
     solution_suggestions_service_with_mocks: SuggestedSolutionsService,
     knapsack_id,
 ):
@@ -104,13 +135,14 @@ async def test_route_solve_errors(
     request = RouterSolveRequest(items=items, volume=10, knapsack_id=knapsack_id)
     solve_request_producer = AsyncMock(SolverRouterProducer)
     algo_decider = AsyncMock(AlgorithmDecider)
-    algo_decider.decide = AsyncMock(return_value=[Algorithms.FIRST_FIT])
+    algo_decider.decide = AsyncMock(return_value=AlgorithmDecision([Algorithms.FIRST_FIT], SubscriptionScore.STANDARD))
     solution_reports_waiter_mock.wait_for_solution_report = AsyncMock(return_value=SolutionReport(cause=cause))
     solution_suggestions_service_with_mocks.get_solutions = AsyncMock()
 
     # noinspection PyTypeChecker
     response: JSONResponse = await route_solve(
         request,
+        http_request_mock,
         algo_decider,
         solve_request_producer,
         solution_reports_waiter_mock,
@@ -124,11 +156,51 @@ async def test_route_solve_errors(
     assert expected_status == response.status_code
 
 
+@pytest.mark.asyncio
+async def test_route_solve_cancels_solve_when_client_disconnects(
+    solution_reports_waiter_mock: SolutionReportWaiter,
+    http_request_mock: Request,
+    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
+    knapsack_id,
+    config: Config,
+    monkeypatch,
+):
+    monkeypatch.setattr("controllers.router_controller.CLIENT_DISCONNECT_POLL_INTERVAL_SECONDS", 0.01)
+    request = RouterSolveRequest(
+        items=[KnapsackItem(id=get_random_string(), value=10, volume=10)], volume=10, knapsack_id=knapsack_id
+    )
+    algo_decider = AsyncMock(AlgorithmDecider)
+    algo_decider.decide = AsyncMock(return_value=AlgorithmDecision([Algorithms.FIRST_FIT], SubscriptionScore.STANDARD))
+
+    async def wait_without_report(answer_within_seconds):
+        await asyncio.Event().wait()
+
+    solution_reports_waiter_mock.wait_for_solution_report = AsyncMock(side_effect=wait_without_report)
+    http_request_mock.is_disconnected = AsyncMock(side_effect=[False, True])
+    solve_cancellation_publisher = AsyncMock(SolveCancellationPublisher)
+    solution_suggestions_service_with_mocks.get_solutions = AsyncMock()
+
+    # noinspection PyTypeChecker
+    response: JSONResponse = await route_solve(
+        request,
+        http_request_mock,
+        algo_decider,
+        AsyncMock(SolverRouterProducer),
+        solution_reports_waiter_mock,
+        solution_suggestions_service_with_mocks,
+        config,
+        solve_cancellation_publisher,
+    )
+
+    solve_cancellation_publisher.cancel.assert_called_once_with(knapsack_id)
+    solution_suggestions_service_with_mocks.get_solutions.assert_not_called()
+    assert http.HTTPStatus.BAD_REQUEST == response.status_code
+
+
 @pytest.mark.asyncio
 async def test_accept_solution_sanity(
     solution_suggestions_service_with_mocks: SuggestedSolutionsService, knapsack_id: str
 ):
-    solution_suggestions_service_with_mocks.is_solution_exists = AsyncMock(return_value=True)
     solution_suggestions_service_with_mocks.accept_suggested_solution = AsyncMock(
         return_value=AcceptResult.ACCEPT_SUCCESS
     )
@@ -138,7 +210,6 @@ async def test_accept_solution_sanity(
     response = await accept_solution(request, solution_suggestions_service_with_mocks)
 
     assert AcceptResult.ACCEPT_SUCCESS == response.result
-    solution_suggestions_service_with_mocks.is_solution_exists.assert_called_once_with(knapsack_id, solution_id)
     solution_suggestions_service_with_mocks.accept_suggested_solution.assert_called_once_with(knapsack_id, solution_id)
 
 
@@ -146,9 +217,8 @@ async def test_accept_solution_sanity(
 async def test_accept_solution_solution_not_exists(
     solution_suggestions_service_with_mocks: SuggestedSolutionsService, knapsack_id: str
 ):
-    solution_suggestions_service_with_mocks.is_solution_exists = AsyncMock(return_value=False)
     solution_suggestions_service_with_mocks.accept_suggested_solution = AsyncMock(
-        return_value=AcceptResult.ACCEPT_SUCCESS
+        return_value=AcceptResult.SOLUTION_NOT_EXISTS
     )
     solution_id: str = get_random_string()
     request = AcceptSolutionRequest(knapsack_id=knapsack_id, solution_id=solution_id)
@@ -156,17 +226,13 @@ async def test_accept_solution_solution_not_exists(
     response = await accept_solution(request, solution_suggestions_service_with_mocks)
 
     assert AcceptResult.SOLUTION_NOT_EXISTS == response.result
-    solution_suggestions_service_with_mocks.is_solution_exists.assert_called_once_with(knapsack_id, solution_id)
-    solution_suggestions_service_with_mocks.accept_suggested_solution.assert_not_called()
+    solution_suggestions_service_with_mocks.accept_suggested_solution.assert_called_once_with(knapsack_id, solution_id)
 
 
 @pytest.mark.asyncio
 async def test_reject_solution_sanity(
     solution_suggestions_service_with_mocks: SuggestedSolutionsService, knapsack_id: str
 ):
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(
-        return_value=SuggestedSolution(time=datetime.now(), solutions={})
-    )
     solution_suggestions_service_with_mocks.reject_suggested_solutions = AsyncMock(
         return_value=RejectResult.REJECT_SUCCESS
     )
@@ -175,7 +241,6 @@ async def test_reject_solution_sanity(
     response = await reject_solutions(request, solution_suggestions_service_with_mocks)
 
     assert RejectResult.REJECT_SUCCESS == response.result
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
     solution_suggestions_service_with_mocks.reject_suggested_solutions.assert_called_once_with(knapsack_id)
 
 
@@ -183,23 +248,22 @@ async def test_reject_solution_sanity(
 async def test_reject_solution_solution_not_exists(
     solution_suggestions_service_with_mocks: SuggestedSolutionsService, knapsack_id: str
 ):
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(return_value=None)
     solution_suggestions_service_with_mocks.reject_suggested_solutions = AsyncMock(
-        return_value=RejectResult.REJECT_SUCCESS
+        return_value=RejectResult.SUGGESTION_NOT_EXISTS
     )
     request = RejectSolutionsRequest(knapsack_id=knapsack_id)
 
     response = await reject_solutions(request, solution_suggestions_service_with_mocks)
 
     assert RejectResult.SUGGESTION_NOT_EXISTS == response.result
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    solution_suggestions_service_with_mocks.reject_suggested_solutions.assert_not_called()
+    solution_suggestions_service_with_mocks.reject_suggested_solutions.assert_called_once_with(knapsack_id)
 
 
 @pytest.mark.asyncio
 async def test_route_solve_empty_solutions(
     time_service_mock: TimeService,
     solution_reports_waiter_mock: SolutionReportWaiter,
+    http_request_mock: Request,
     solution_suggestions_service_with_mocks: SuggestedSolutionsService,
     knapsack_id: str,
     config: Config,
@@ -208,7 +272,7 @@ async def test_route_solve_empty_solutions(
     request = RouterSolveRequest(items=items, volume=10, knapsack_id=knapsack_id)
     solve_request_producer = AsyncMock(SolverRouterProducer)
     algo_decider = AsyncMock(AlgorithmDecider)
-    algo_decider.decide = AsyncMock(return_value=[Algorithms.FIRST_FIT])
+    algo_decider.decide = AsyncMock(return_value=AlgorithmDecision([Algorithms.FIRST_FIT], SubscriptionScore.STANDARD))
     solution_reports_waiter_mock.wait_for_solution_report = AsyncMock(
         return_value=SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND)
     )
@@ -223,6 +287,7 @@ async def test_route_solve_empty_solutions(
     # noinspection PyTypeChecker
     response: JSONResponse = await route_solve(
         request,
+        http_request_mock,
         algo_decider,
         solve_request_producer,
         solution_reports_waiter_mock,
@@ -235,3 +300,227 @@ async def test_route_solve_empty_solutions(
     solution_reports_waiter_mock.wait_for_solution_report.assert_called_once()
     solution_suggestions_service_with_mocks.get_solutions.assert_called_once()
     assert len(response.solutions) == 0
+
+
+@pytest.mark.asyncio
+async def test_route_solve_async_returns_job_before_report(
+    solution_reports_waiter_mock: SolutionReportWaiter, knapsack_id: str
+):
+    items = [KnapsackItem(id=get_random_string(), value=10, volume=10)]
+    request = RouterSolveRequest(items=items, volume=10, knapsack_id=knapsack_id)
+    solve_request_producer = AsyncMock(SolverRouterProducer)
+    algo_decider = AsyncMock(AlgorithmDecider)
+    algo_decider.decide = AsyncMock(return_value=AlgorithmDecision([Algorithms.FIRST_FIT], SubscriptionScore.STANDARD))
+    solve_jobs_service = AsyncMock(SolveJobsService)
+    solve_jobs_service.create_job = AsyncMock(return_value=SolveJob(job_id="job", knapsack_id=knapsack_id))
+    solve_jobs_tracker = MagicMock(SolveJobsTracker)
+
+    response = await route_solve_async(
+        request,
+        algo_decider,
+        solve_request_producer,
+        solution_reports_waiter_mock,
+        solve_jobs_service,
+        solve_jobs_tracker,
+    )
+
+    assert response == RouterSolveAsyncResponse(job_id="job")
+    solve_request_producer.produce_solver_instance_request.assert_called_once()
+    solution_reports_waiter_mock.__aenter__.assert_called_once()
+    solution_reports_waiter_mock.__aexit__.assert_not_called()
+    solution_reports_waiter_mock.wait_for_solution_report.assert_not_called()
+    solve_jobs_tracker.track.assert_called_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "report,expected_status,expected_cause",
+    [
+        (None, SolveJobStatus.PENDING, None),
+        (
+            SolutionReport(cause=SolutionReportCause.NO_ITEM_CLAIMED),
+            SolveJobStatus.DONE,
+            SolutionReportCause.NO_ITEM_CLAIMED,
+        ),
+        (
+            SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND),
+            SolveJobStatus.DONE,
+            SolutionReportCause.SOLUTION_FOUND,
+        ),
+    ],
+)
+async def test_get_solve_job(
+    report: SolutionReport,
+    expected_status: SolveJobStatus,
+    expected_cause: SolutionReportCause,
+    time_service_mock: TimeService,
+    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
+    knapsack_id: str,
+    config: Config,
+):
+    solve_jobs_service = AsyncMock(SolveJobsService)
+    solve_jobs_service.get_job = AsyncMock(
+        return_value=SolveJob(job_id="job", knapsack_id=knapsack_id, status=expected_status, report=report)
+    )
+    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(
+        return_value=SuggestedSolution(
+            time=time_service_mock.now(),
+            solutions={"aa": AlgorithmSolution(items=[KnapsackItem(id=get_random_string(), value=10, volume=10)])},
+        )
+    )
+
+    response = await get_solve_job("job", solve_jobs_service, solution_suggestions_service_with_mocks, config)
+
+    assert response.status == expected_status
+    assert response.cause == expected_cause
+    assert (response.suggested_solution is not None) == (expected_cause == SolutionReportCause.SOLUTION_FOUND)
+
+
+@pytest.mark.asyncio
+async def test_get_solve_job_not_found(
+    solution_suggestions_service_with_mocks: SuggestedSolutionsService, config: Config
+):
+    solve_jobs_service = AsyncMock(SolveJobsService)
+    solve_jobs_service.get_job = AsyncMock(return_value=None)
+
+    # noinspection PyTypeChecker
+    response: JSONResponse = await get_solve_job(
+        "job", solve_jobs_service, solution_suggestions_service_with_mocks, config
+    )
+
+    assert response.status_code == http.HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_route_solve_batch(
+    time_service_mock: TimeService,
+    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
+    config: Config,
+):
+    items = [KnapsackItem(id=get_random_string(), value=10, volume=10)]
+    requests = [
+        RouterSolveRequest(items=items, volume=10, knapsack_id="solved"),
+        RouterSolveRequest(items=items, volume=10, knapsack_id="not-claimed"),
+        RouterSolveRequest(items=[], volume=10, knapsack_id="empty"),
+    ]
+    solve_request_producer = AsyncMock(SolverRouterProducer)
+    algo_decider = AsyncMock(AlgorithmDecider)
+    algo_decider.decide_many = AsyncMock(
+        return_value=[
+            AlgorithmDecision([Algorithms.FIRST_FIT], SubscriptionScore.PREMIUM),
+            AlgorithmDecision([Algorithms.GREEDY], SubscriptionScore.STANDARD),
+        ]
+    )
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+
+    async def publish_reports(produced_requests):
+        for request, cause in zip(
+            produced_requests, [SolutionReportCause.SOLUTION_FOUND, SolutionReportCause.NO_ITEM_CLAIMED]
+        ):
+            listener._dispatch(
+                {
+                    "channel": f"solutions:{request.knapsack_id}".encode(),
+                    "data": SolutionReport(cause=cause).json().encode(),
+                }
+            )
+        return [None] * len(produced_requests)
+
+    solve_request_producer.produce_solver_instance_requests = AsyncMock(side_effect=publish_reports)
+    solution_suggestions_service_with_mocks.get_solutions_many = AsyncMock(
+        return_value=[SuggestedSolution(time=time_service_mock.now(), solutions={"aa": AlgorithmSolution(items=items)})]
+    )
+
+    response = await route_solve_batch(
+        RouterSolveBatchRequest(requests=requests),
+        algo_decider,
+        solve_request_producer,
+        listener,
+        solution_suggestions_service_with_mocks,
+        config,
+    )
+
+    algo_decider.decide_many.assert_called_once_with([("solved", 1, 10), ("not-claimed", 1, 10)])
+    produced_requests = solve_request_producer.produce_solver_instance_requests.call_args.args[0]
+    assert [SubscriptionScore.PREMIUM, SubscriptionScore.STANDARD] == [r.subscription_score for r in produced_requests]
+    solution_suggestions_service_with_mocks.get_solutions_many.assert_called_once_with(["solved"])
+    assert [(r.knapsack_id, r.cause) for r in response.results] == [
+        ("solved", SolutionReportCause.SOLUTION_FOUND),
+        ("not-claimed", SolutionReportCause.NO_ITEM_CLAIMED),
+        ("empty", SolutionReportCause.NO_ITEM_CLAIMED),
+    ]
+    assert response.results[0].suggested_solution.solutions["aa"].items == items
+    assert response.results[1].suggested_solution is None
+    assert listener._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_route_solve_batch_isolates_failed_knapsacks(
+    solution_suggestions_service_with_mocks: SuggestedSolutionsService, config: Config
+):
+    items = [KnapsackItem(id=get_random_string(), value=10, volume=10)]
+    requests = [
+        RouterSolveRequest(items=items, volume=10, knapsack_id=knapsack_id)
+        for knapsack_id in ["solved", "not-decided", "not-published"]
+    ]
+    algo_decider = AsyncMock(AlgorithmDecider)
+    algo_decider.decide_many = AsyncMock(
+        return_value=[
+            AlgorithmDecision([Algorithms.GREEDY], SubscriptionScore.STANDARD),
+            ConnectionError("subscriptions are down"),
+            AlgorithmDecision([Algorithms.GREEDY], SubscriptionScore.STANDARD),
+        ]
+    )
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+
+    async def publish_reports(produced_requests):
+        listener._dispatch(
+            {
+                "channel": f"solutions:{produced_requests[0].knapsack_id}".encode(),
+                "data": SolutionReport(cause=SolutionReportCause.NO_ITEM_CLAIMED).json().encode(),
+            }
+        )
+        return [None, ConnectionError("broker is down")]
+
+    solve_request_producer = AsyncMock(SolverRouterProducer)
+    solve_request_producer.produce_solver_instance_requests = AsyncMock(side_effect=publish_reports)
+    solution_suggestions_service_with_mocks.get_solutions_many = AsyncMock(return_value=[])
+
+    response = await route_solve_batch(
+        RouterSolveBatchRequest(requests=requests),
+        algo_decider,
+        solve_request_producer,
+        listener,
+        solution_suggestions_service_with_mocks,
+        config,
+    )
+
+    produced_requests = solve_request_producer.produce_solver_instance_requests.call_args.args[0]
+    assert [r.knapsack_id for r in produced_requests] == ["solved", "not-published"]
+    assert [(r.knapsack_id, r.cause) for r in response.results] == [
+        ("solved", SolutionReportCause.NO_ITEM_CLAIMED),
+        ("not-decided", SolutionReportCause.GOT_EXCEPTION),
+        ("not-published", SolutionReportCause.GOT_EXCEPTION),
+    ]
+    assert listener._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_route_solve_batch_rejects_duplicate_knapsacks(
+    solution_suggestions_service_with_mocks: SuggestedSolutionsService, config: Config
+):
+    items = [KnapsackItem(id=get_random_string(), value=10, volume=10)]
+    request = RouterSolveBatchRequest(requests=[RouterSolveRequest(items=items, volume=10, knapsack_id="a")] * 2)
+    solve_request_producer = AsyncMock(SolverRouterProducer)
+
+    # noinspection PyTypeChecker
+    response: JSONResponse = await route_solve_batch(
+        request,
+        AsyncMock(AlgorithmDecider),
+        solve_request_producer,
+        MagicMock(SolutionReportsListener),
+        solution_suggestions_service_with_mocks,
+        config,
+    )
+
+    assert response.status_code == http.HTTPStatus.BAD_REQUEST
+    solve_request_producer.produce_solver_instance_requests.assert_not_called()
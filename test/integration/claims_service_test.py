@@ -26,6 +26,18 @@ async def test_claim_items(config: Config):
     assert expected_claim == claim
 
 
+@pytest.mark.asyncio
+async def test_claim_items_skips_oversized_and_duplicate_items(config: Config):
+    claimer: ClaimsService = get_claims_service(config=config)
+    expected_claim = [KnapsackItem(id=get_random_string(), value=2, volume=1)]
+    oversized_item = KnapsackItem(id=get_random_string(), value=3, volume=2)
+
+    claim = await claimer.claim_items(expected_claim + [oversized_item] + expected_claim, 1, get_random_string())
+
+    assert expected_claim == claim
+    assert not await claimer.is_item_claimed(oversized_item.id)
+
+
 async def _claim_suggested_solution(redis_client, suggested_solution_claimed_items, suggested_solutions_hash_name):
     await redis_client.hset(suggested_solutions_hash_name, suggested_solution_claimed_items[0].id, get_random_string())
 
@@ -22,14 +22,25 @@ def config_thresholds(config: Config, threshold_config: ThresholdParameters):
         rabbit_connection_params=original.rabbit_connection_params,
         redis_connection_params=original.redis_connection_params,
         solver_queue=original.solver_queue,
+        solver_queue_max_priority=original.solver_queue_max_priority,
+        solver_queue_per_algorithm_class=original.solver_queue_per_algorithm_class,
+        solver_consume_queues=original.solver_consume_queues,
         items_claim_hash=original.items_claim_hash,
-        suggested_solutions_claims_hash=original.suggested_solutions_claims_hash,
         running_knapsack_claims_hash=original.running_knapsack_claims_hash,
         solutions_channel_prefix=original.solutions_channel_prefix,
         wait_for_report_timeout_seconds=original.wait_for_report_timeout_seconds,
+        solution_waiters_tracking_enabled=original.solution_waiters_tracking_enabled,
+        solve_cancellations_channel=original.solve_cancellations_channel,
+        solve_jobs_key_prefix=original.solve_jobs_key_prefix,
+        solve_job_ttl_seconds=original.solve_job_ttl_seconds,
+        solve_batch_max_size=original.solve_batch_max_size,
+        suggestions_key_prefix=original.suggestions_key_prefix,
         suggested_solutions_hash=original.suggested_solutions_hash,
         accepted_solutions_list=original.accepted_solutions_list,
+        suggestions_expiry_index=original.suggestions_expiry_index,
+        accepted_solutions_index=original.accepted_solutions_index,
         clean_old_suggestion_interval_seconds=original.clean_old_suggestion_interval_seconds,
+        clean_old_suggestions_batch_size=original.clean_old_suggestions_batch_size,
         clean_old_accepted_solutions_interval_seconds=original.clean_old_accepted_solutions_interval_seconds,
         suggestion_ttl_seconds=original.suggestion_ttl_seconds,
         accepted_solution_ttl_seconds=original.accepted_solution_ttl_seconds,
@@ -45,7 +56,33 @@ def config_thresholds(config: Config, threshold_config: ThresholdParameters):
         genetic_heavy_population=original.genetic_heavy_population,
         algo_decider_branch_and_bound_max_items=original.algo_decider_branch_and_bound_max_items,
         algo_decider_dynamic_programming_max_iterations=original.algo_decider_dynamic_programming_max_iterations,
+        algo_decider_dynamic_programming_max_table_bytes=original.algo_decider_dynamic_programming_max_table_bytes,
+        solver_request_budget_seconds=original.solver_request_budget_seconds,
+        solver_process_pool_workers=original.solver_process_pool_workers,
+        solver_process_pool_max_tasks_per_worker=original.solver_process_pool_max_tasks_per_worker,
+        solver_process_pool_timeout_grace_seconds=original.solver_process_pool_timeout_grace_seconds,
+        solver_portfolio_mode=original.solver_portfolio_mode,
+        solver_prefetch_count=original.solver_prefetch_count,
+        solver_max_concurrent_messages=original.solver_max_concurrent_messages,
+        redis_pool_max_connections=original.redis_pool_max_connections,
+        redis_pool_checkout_timeout_seconds=original.redis_pool_checkout_timeout_seconds,
+        redis_pool_health_check_interval_seconds=original.redis_pool_health_check_interval_seconds,
+        redis_pool_metrics_enabled=original.redis_pool_metrics_enabled,
+        redis_pool_slow_checkout_seconds=original.redis_pool_slow_checkout_seconds,
+        redis_pool_metrics_log_interval_seconds=original.redis_pool_metrics_log_interval_seconds,
+        rabbit_channel_pool_max_channels=original.rabbit_channel_pool_max_channels,
+        rabbit_channel_pool_metrics_enabled=original.rabbit_channel_pool_metrics_enabled,
+        rabbit_channel_pool_metrics_log_interval_seconds=original.rabbit_channel_pool_metrics_log_interval_seconds,
+        cluster_availability_sample_interval_seconds=original.cluster_availability_sample_interval_seconds,
+        cluster_availability_smoothing_factor=original.cluster_availability_smoothing_factor,
+        cluster_availability_hysteresis_ratio=original.cluster_availability_hysteresis_ratio,
         subscription_backend_base_url=original.subscription_backend_base_url,
+        subscription_client_max_connections=original.subscription_client_max_connections,
+        subscription_client_max_keepalive_connections=original.subscription_client_max_keepalive_connections,
+        subscription_cache_max_entries=original.subscription_cache_max_entries,
+        subscription_cache_ttl_seconds=original.subscription_cache_ttl_seconds,
+        subscription_cache_not_found_ttl_seconds=original.subscription_cache_not_found_ttl_seconds,
+        subscription_cache_stale_seconds=original.subscription_cache_stale_seconds,
     )
 
 
@@ -4,10 +4,19 @@ import pytest
 from aioredis import Redis
 
 from logic.solution_report_waiter import SolutionReportWaiter
+from logic.solution_reports_listener import SolutionReportsListener
 from models.config.configuration import Config
 from models.solution import SolutionReport, SolutionReportCause
 
 
+@pytest.fixture
+async def solution_reports_listener(redis_client: Redis, config: Config) -> SolutionReportsListener:
+    listener = SolutionReportsListener(redis_client, config.solutions_channel_prefix)
+    await listener.start()
+    yield listener
+    await listener.stop()
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "cause",
@@ -18,11 +27,14 @@ from models.solution import SolutionReport, SolutionReportCause
     ],
 )
 async def test_solution_reports_waiter(
-    cause: SolutionReportCause, redis_client: Redis, knapsack_id: str, solution_reports_channel_name, config: Config
+    cause: SolutionReportCause,
+    redis_client: Redis,
+    knapsack_id: str,
+    solution_reports_channel_name,
+    solution_reports_listener: SolutionReportsListener,
+    config: Config,
 ):
-    waiter = SolutionReportWaiter(
-        redis_client, config.solutions_channel_prefix, knapsack_id, config.wait_for_report_timeout_seconds
-    )
+    waiter = SolutionReportWaiter(solution_reports_listener, knapsack_id, config.wait_for_report_timeout_seconds)
     async with waiter:
         wait_task = asyncio.create_task(waiter.wait_for_solution_report())
         await redis_client.publish(solution_reports_channel_name, SolutionReport(cause=cause).json().encode())
@@ -31,8 +43,34 @@ async def test_solution_reports_waiter(
 
 
 @pytest.mark.asyncio
-async def test_solution_reports_waiter_got_timeout(redis_client: Redis, knapsack_id: str, config: Config):
-    waiter = SolutionReportWaiter(redis_client, config.solutions_channel_prefix, knapsack_id, 0.01)
+async def test_solution_reports_waiters_share_listener(
+    redis_client: Redis, solution_reports_listener: SolutionReportsListener, config: Config
+):
+    waiters = [
+        SolutionReportWaiter(solution_reports_listener, f"knapsack-{i}", config.wait_for_report_timeout_seconds)
+        for i in range(3)
+    ]
+    for waiter in waiters:
+        await waiter.__aenter__()
+    wait_tasks = [asyncio.create_task(waiter.wait_for_solution_report()) for waiter in waiters]
+    for i, cause in enumerate([SolutionReportCause.SOLUTION_FOUND, SolutionReportCause.NO_ITEM_CLAIMED]):
+        await redis_client.publish(
+            f"{config.solutions_channel_prefix}:knapsack-{i}", SolutionReport(cause=cause).json().encode()
+        )
+
+    assert (await wait_tasks[0]).cause == SolutionReportCause.SOLUTION_FOUND
+    assert (await wait_tasks[1]).cause == SolutionReportCause.NO_ITEM_CLAIMED
+    assert not wait_tasks[2].done()
+    for waiter in waiters:
+        await waiter.__aexit__(None, None, None)
+    wait_tasks[2].cancel()
+
+
+@pytest.mark.asyncio
+async def test_solution_reports_waiter_got_timeout(
+    knapsack_id: str, solution_reports_listener: SolutionReportsListener
+):
+    waiter = SolutionReportWaiter(solution_reports_listener, knapsack_id, 0.01)
     async with waiter:
         wait_task = asyncio.create_task(waiter.wait_for_solution_report())
         result: SolutionReport = await wait_task
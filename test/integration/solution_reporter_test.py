@@ -63,3 +63,26 @@ async def test_solution_reporter_report_error(
     assert expected_response == response
     assert suggested_solution is None
     register_solution_spy.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_solution_reporter_report_partial_solution(
+    redis_subscriber: PubSub,
+    knapsack_id: str,
+    solution_suggestions_service: SuggestedSolutionsService,
+    config: Config,
+):
+    solution_reporter = get_solution_reporter(config=config, suggested_solutions_service=solution_suggestions_service)
+
+    await solution_reporter.report_partial_solution(knapsack_id)
+    await solution_reporter.report_solutions_complete(knapsack_id)
+    reports = []
+    while len(reports) < 2:
+        msg = await redis_subscriber.get_message(ignore_subscribe_messages=True)
+        if msg:
+            reports.append(SolutionReport(**json.loads(msg["data"].decode())))
+
+    assert reports == [
+        SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND, is_final=False),
+        SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND, is_final=True),
+    ]
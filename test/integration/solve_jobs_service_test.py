@@ -0,0 +1,40 @@
+import pytest
+from aioredis import Redis
+
+from logic.solve_jobs_service import SolveJobsService
+from models.config.configuration import Config
+from models.solution import SolutionReport, SolutionReportCause
+from models.solve_job import SolveJobStatus
+
+
+@pytest.fixture
+def solve_jobs_service(redis_client: Redis, config: Config) -> SolveJobsService:
+    return SolveJobsService(redis_client, config.solve_jobs_key_prefix, config.solve_job_ttl_seconds)
+
+
+@pytest.mark.asyncio
+async def test_solve_job_lifecycle(
+    solve_jobs_service: SolveJobsService, redis_client: Redis, knapsack_id: str, config: Config
+):
+    job = await solve_jobs_service.create_job(knapsack_id)
+    assert await solve_jobs_service.get_job(job.job_id) == job
+
+    report = SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND)
+    await solve_jobs_service.complete_job(job, report)
+    completed_job = await solve_jobs_service.get_job(job.job_id)
+
+    assert completed_job.status == SolveJobStatus.DONE
+    assert completed_job.report == report
+    assert 0 < await redis_client.ttl(f"{config.solve_jobs_key_prefix}:{job.job_id}") <= config.solve_job_ttl_seconds
+
+
+@pytest.mark.asyncio
+async def test_expired_solve_job_is_not_completed(
+    solve_jobs_service: SolveJobsService, redis_client: Redis, knapsack_id: str, config: Config
+):
+    job = await solve_jobs_service.create_job(knapsack_id)
+    await redis_client.delete(f"{config.solve_jobs_key_prefix}:{job.job_id}")
+
+    await solve_jobs_service.complete_job(job, SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND))
+
+    assert await solve_jobs_service.get_job(job.job_id) is None
@@ -36,6 +36,7 @@ async def test_solver_consumer_consume(rabbit_channel: aio_pika.abc.AbstractChan
     items_claimer = AsyncMock(ClaimsService)
     solution_reporter = AsyncMock(SolutionReporter)
     algorithm_runner = MagicMock(AlgorithmRunner)
+    algorithm_runner.iter_algorithms = MagicMock(side_effect=_algorithm_results(expected_result))
     solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
     solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
 
@@ -45,6 +46,7 @@ async def test_solver_consumer_consume(rabbit_channel: aio_pika.abc.AbstractChan
         items_claimer,
         solution_reporter,
         solution_suggestion_service,
+        config,
     )
 
     async with consumer:
@@ -52,7 +54,16 @@ async def test_solver_consumer_consume(rabbit_channel: aio_pika.abc.AbstractChan
         await asyncio.sleep(1)
         consume_task.cancel()
 
-    algorithm_runner.run_algorithms.assert_called_once()
+    algorithm_runner.iter_algorithms.assert_called_once()
     items_claimer.claim_items.assert_called_once()
     items_claimer.release_items_claims.assert_called_once()
-    solution_reporter.report_solution_suggestions.assert_called_once()
+    solution_reporter.report_partial_solution.assert_called_once()
+    solution_reporter.report_solutions_complete.assert_called_once()
+
+
+def _algorithm_results(*solutions: list[KnapsackItem]):
+    async def iter_algorithms(items, volume, algorithms):
+        for index, solution in enumerate(solutions):
+            yield index, solution
+
+    return iter_algorithms
@@ -1,13 +1,17 @@
 import json
+import time
+from typing import Optional
 
 import aio_pika
 import pytest
 
 from logic.producer.solver_router_producer import SolverRouterProducer
+from logic.solver_queue import get_solver_queue_arguments, get_solver_queue_names
 from models.algorithms import Algorithms
 from models.config.configuration import Config
 from models.knapsack_item import KnapsackItem
 from models.knapsack_solver_instance_dto import SolverInstanceRequest
+from models.subscription import SubscriptionScore
 from test.utils import get_random_string
 
 
@@ -29,8 +33,65 @@ async def test_solver_router_producer(rabbit_channel: aio_pika.abc.AbstractChann
     assert expected_items == parsed_message.items
 
 
+@pytest.mark.asyncio
+async def test_solver_router_producer_delivers_higher_subscriptions_first(
+    rabbit_channel: aio_pika.abc.AbstractChannel, config: Config
+):
+    producer = SolverRouterProducer(rabbit_channel, config.solver_queue, max_priority=2)
+    requests = [
+        SolverInstanceRequest(
+            items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+            volume=1,
+            knapsack_id=get_random_string(),
+            algorithms=[Algorithms.GREEDY],
+            subscription_score=subscription_score,
+        )
+        for subscription_score in [SubscriptionScore.STANDARD, SubscriptionScore.PREMIUM]
+    ]
+    async with producer:
+        assert await producer.produce_solver_instance_requests(requests) == [None, None]
+
+    produced_message = await _read_message_from_queue(config, max_priority=2)
+    assert requests[1] == SolverInstanceRequest(**json.loads(produced_message))
+
+
+@pytest.mark.asyncio
+async def test_solver_router_producer_stamps_deadline(rabbit_channel: aio_pika.abc.AbstractChannel, config: Config):
+    producer = SolverRouterProducer(rabbit_channel, config.solver_queue, request_ttl_seconds=60)
+    request = SolverInstanceRequest(
+        items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+        volume=1,
+        knapsack_id=get_random_string(),
+        algorithms=[Algorithms.GREEDY],
+    )
+    async with producer:
+        await producer.produce_solver_instance_request(request)
+
+    produced_request = SolverInstanceRequest(**json.loads(await _read_message_from_queue(config)))
+    assert time.time() < produced_request.deadline <= time.time() + 60
+
+
+@pytest.mark.asyncio
+async def test_solver_router_producer_routes_by_algorithm_class(
+    rabbit_channel: aio_pika.abc.AbstractChannel, config: Config, queues_cleaner: list[str]
+):
+    queues_cleaner.extend(get_solver_queue_names(config.solver_queue, per_algorithm_class=True))
+    producer = SolverRouterProducer(rabbit_channel, config.solver_queue, per_algorithm_class=True)
+    request = SolverInstanceRequest(
+        items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+        volume=1,
+        knapsack_id=get_random_string(),
+        algorithms=[Algorithms.GREEDY, Algorithms.GENETIC_HEAVY],
+    )
+    async with producer:
+        await producer.produce_solver_instance_request(request)
+
+    produced_message = await _read_message_from_queue(config, queue_name=f"{config.solver_queue}.heavy")
+    assert request == SolverInstanceRequest(**json.loads(produced_message))
+
+
 # noinspection PyUnresolvedReferences
-async def _read_message_from_queue(config: Config):
+async def _read_message_from_queue(config: Config, max_priority: int = 0, queue_name: Optional[str] = None):
     host, port, user, password = config.rabbit_connection_params
     connection = await aio_pika.connect_robust(
         f"amqp://{user}:{password}@{host}:{port}/",
@@ -39,7 +100,9 @@ async def _read_message_from_queue(config: Config):
     async with connection:
         channel = await connection.channel()
 
-        queue = await channel.declare_queue(config.solver_queue)
+        queue = await channel.declare_queue(
+            queue_name or config.solver_queue, arguments=get_solver_queue_arguments(max_priority)
+        )
 
         async with queue.iterator() as queue_iter:
             async for message in queue_iter:
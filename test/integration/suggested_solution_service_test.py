@@ -1,5 +1,5 @@
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from unittest.mock import MagicMock, AsyncMock
 
 import pytest
@@ -22,6 +22,7 @@ async def test_register_suggested_solutions(
     claims_service_mock: ClaimsService,
     time_service_mock: TimeService,
     knapsack_id: str,
+    config: Config,
 ):
     expected_time = datetime.now()
     time_service_mock.now = MagicMock(return_value=expected_time)
@@ -31,22 +32,33 @@ async def test_register_suggested_solutions(
     ]
     await solution_suggestions_service_with_mocks.register_suggested_solutions(expected_solutions, knapsack_id)
 
-    # noinspection PyUnresolvedReferences
-    redis_mock.hset.assert_called_once()
-    # noinspection PyUnresolvedReferences
-    solution = SuggestedSolution(**json.loads(redis_mock.mock_calls[0].args[2]))
-
+    # noinspection PyProtectedMember
+    register_script: AsyncMock = solution_suggestions_service_with_mocks._register_script
+    register_script.assert_called_once()
+    script_keys, script_args = register_script.call_args.kwargs["keys"], register_script.call_args.kwargs["args"]
+    registered_knapsack_id, encoded_solution, ttl_seconds, issue_timestamp, *item_ids = script_args
+    solution = SuggestedSolution(**json.loads(encoded_solution))
+
+    assert [
+        f"{config.suggestions_key_prefix}:{knapsack_id}",
+        f"{config.suggestions_key_prefix}_claims:{knapsack_id}",
+        config.suggestions_expiry_index,
+    ] == script_keys
+    assert knapsack_id == registered_knapsack_id
+    assert config.suggestion_ttl_seconds == ttl_seconds
+    assert expected_time.timestamp() == issue_timestamp
+    assert {item.id for sol in expected_solutions for item in sol.items} == set(item_ids)
     assert expected_time == solution.time
     assert expected_solutions == [i for i in solution.solutions.values()]
 
 
 @pytest.mark.asyncio
 async def test_accept_suggested_solution(
-    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
-    redis_mock: Redis,
+    solution_suggestions_service: SuggestedSolutionsService,
+    claims_service: ClaimsService,
+    redis_client: Redis,
     time_service_mock: TimeService,
     knapsack_id: str,
-    claims_service_mock: ClaimsService,
     config: Config,
 ):
     expected_time = datetime.now()
@@ -56,128 +68,63 @@ async def test_accept_suggested_solution(
         KnapsackItem(id=get_random_string(), value=1, volume=1),
         shared_item_between_solutions,
     ]
-    chosen_solution_id: str = get_random_string()
     first_released_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
     second_released_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
-    all_solutions: dict[str, AlgorithmSolution] = {
-        get_random_string(): AlgorithmSolution(items=[first_released_item, shared_item_between_solutions]),
-        get_random_string(): AlgorithmSolution(items=[second_released_item]),
-        chosen_solution_id: AlgorithmSolution(items=expected_solution),
-    }
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(
-        return_value=SuggestedSolution(solutions=all_solutions, time=expected_time)
+    all_items = expected_solution + [first_released_item, second_released_item]
+    await claims_service.claim_items(all_items, 1, knapsack_id)
+    await solution_suggestions_service.register_suggested_solutions(
+        [
+            AlgorithmSolution(items=[first_released_item, shared_item_between_solutions]),
+            AlgorithmSolution(items=[second_released_item]),
+            AlgorithmSolution(items=expected_solution),
+        ],
+        knapsack_id,
     )
-    claims_service_mock.claim_suggested_solutions = AsyncMock(return_value=True)
-    claims_service_mock.release_items_claims = AsyncMock()
-    claims_service_mock.release_claim_suggested_solutions = AsyncMock()
-    redis_mock.rpush = AsyncMock()
-    redis_mock.hdel = AsyncMock()
+    suggestion = await solution_suggestions_service.get_solutions(knapsack_id)
+    chosen_solution_id = next(i for i, sol in suggestion.solutions.items() if sol.items == expected_solution)
 
-    result = await solution_suggestions_service_with_mocks.accept_suggested_solution(knapsack_id, chosen_solution_id)
+    result = await solution_suggestions_service.accept_suggested_solution(knapsack_id, chosen_solution_id)
 
     assert AcceptResult.ACCEPT_SUCCESS == result
-    claims_service_mock.claim_suggested_solutions.assert_called_once_with(knapsack_id)
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    claims_service_mock.release_items_claims.assert_called_once_with([first_released_item, second_released_item])
-    claims_service_mock.release_claim_suggested_solutions.assert_called_once_with(knapsack_id)
-    redis_mock.rpush.assert_called_once_with(
-        config.accepted_solutions_list,
-        AcceptedSolution(time=expected_time, solution=expected_solution, knapsack_id=knapsack_id).json(),
-    )
-    redis_mock.hdel.assert_called_once_with(config.suggested_solutions_hash, knapsack_id)
+    assert [await claims_service.is_item_claimed(i.id) for i in all_items] == [True, True, False, False]
+    assert await solution_suggestions_service.get_solutions(knapsack_id) is None
+    accepted = await redis_client.zrange(config.accepted_solutions_index, 0, -1, withscores=True)
+    assert [
+        (
+            AcceptedSolution(time=expected_time, solution=expected_solution, knapsack_id=knapsack_id),
+            expected_time.timestamp(),
+        )
+    ] == [(AcceptedSolution(**json.loads(a.decode())), score) for a, score in accepted]
 
 
 @pytest.mark.asyncio
-async def test_accept_suggested_solution_solution_claim_failed(
-    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
-    redis_mock: Redis,
+async def test_accept_suggested_solution_solution_not_exists(
+    solution_suggestions_service: SuggestedSolutionsService,
+    claims_service: ClaimsService,
+    redis_client: Redis,
     knapsack_id: str,
-    claims_service_mock: ClaimsService,
+    config: Config,
 ):
-    chosen_solution_id: str = get_random_string()
-    claims_service_mock.claim_suggested_solutions = AsyncMock(return_value=False)
-    claims_service_mock.release_items_claims = AsyncMock()
-    claims_service_mock.release_claim_suggested_solutions = AsyncMock()
+    item = KnapsackItem(id=get_random_string(), value=1, volume=1)
+    await claims_service.claim_items([item], 1, knapsack_id)
+    await solution_suggestions_service.register_suggested_solutions([AlgorithmSolution(items=[item])], knapsack_id)
 
-    result = await solution_suggestions_service_with_mocks.accept_suggested_solution(knapsack_id, chosen_solution_id)
+    result = await solution_suggestions_service.accept_suggested_solution(knapsack_id, get_random_string())
 
-    assert AcceptResult.CLAIM_FAILED == result
-    claims_service_mock.claim_suggested_solutions.assert_called_once_with(knapsack_id)
-    claims_service_mock.release_items_claims.assert_not_called()
-    claims_service_mock.release_claim_suggested_solutions.assert_not_called()
+    assert AcceptResult.SOLUTION_NOT_EXISTS == result
+    assert await claims_service.is_item_claimed(item.id)
+    assert await solution_suggestions_service.get_solutions(knapsack_id) is not None
+    assert not await redis_client.zrange(config.accepted_solutions_index, 0, -1)
 
 
 @pytest.mark.asyncio
 async def test_accept_suggested_solution_solution_deleted(
-    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
-    redis_mock: Redis,
-    knapsack_id: str,
-    claims_service_mock: ClaimsService,
+    solution_suggestions_service: SuggestedSolutionsService, redis_client: Redis, knapsack_id: str, config: Config
 ):
-    chosen_solution_id: str = get_random_string()
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(return_value=None)
-    claims_service_mock.claim_suggested_solutions = AsyncMock(return_value=True)
-    claims_service_mock.release_items_claims = AsyncMock()
-    claims_service_mock.release_claim_suggested_solutions = AsyncMock()
-    redis_mock.rpush = AsyncMock()
-    redis_mock.hdel = AsyncMock()
-
-    result = await solution_suggestions_service_with_mocks.accept_suggested_solution(knapsack_id, chosen_solution_id)
+    result = await solution_suggestions_service.accept_suggested_solution(knapsack_id, get_random_string())
 
     assert AcceptResult.SOLUTION_NOT_EXISTS == result
-    claims_service_mock.claim_suggested_solutions.assert_called_once_with(knapsack_id)
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    claims_service_mock.release_items_claims.assert_not_called()
-    redis_mock.rpush.assert_not_called()
-    redis_mock.hdel.assert_not_called()
-    claims_service_mock.release_claim_suggested_solutions.assert_called_once_with(knapsack_id)
-
-
-@pytest.mark.asyncio
-async def test_is_solution_exists(solution_suggestions_service_with_mocks: SuggestedSolutionsService, knapsack_id: str):
-    solution_id = get_random_string()
-    suggested_solution = SuggestedSolution(
-        time=datetime.now(),
-        solutions={solution_id: AlgorithmSolution(items=[KnapsackItem(id=get_random_string(), volume=1, value=1)])},
-    )
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(return_value=suggested_solution)
-
-    is_solution_exists = await solution_suggestions_service_with_mocks.is_solution_exists(knapsack_id, solution_id)
-
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    assert is_solution_exists is True
-
-
-@pytest.mark.asyncio
-async def test_is_solution_exists_suggestion_not_exists(
-    solution_suggestions_service_with_mocks: SuggestedSolutionsService, knapsack_id: str
-):
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(return_value=None)
-
-    solution_id = get_random_string()
-    is_solution_exists = await solution_suggestions_service_with_mocks.is_solution_exists(knapsack_id, solution_id)
-
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    assert is_solution_exists is False
-
-
-@pytest.mark.asyncio
-async def test_is_solution_exists_suggestion_exists_solution_not_exists(
-    solution_suggestions_service_with_mocks: SuggestedSolutionsService, knapsack_id: str
-):
-    suggested_solution = SuggestedSolution(
-        time=datetime.now(),
-        solutions={
-            get_random_string(): AlgorithmSolution(items=[KnapsackItem(id=get_random_string(), volume=1, value=1)])
-        },
-    )
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(return_value=suggested_solution)
-
-    solution_id = get_random_string()
-    is_solution_exists = await solution_suggestions_service_with_mocks.is_solution_exists(knapsack_id, solution_id)
-
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    assert is_solution_exists is False
+    assert not await redis_client.zrange(config.accepted_solutions_index, 0, -1)
 
 
 @pytest.mark.asyncio
@@ -193,11 +140,11 @@ async def test_get_solutions(
             get_random_string(): AlgorithmSolution(items=[KnapsackItem(id=get_random_string(), volume=1, value=1)])
         },
     )
-    redis_mock.hget = AsyncMock(return_value=expected_solution.json().encode())
+    redis_mock.get = AsyncMock(return_value=expected_solution.json().encode())
 
     suggested_solution = await solution_suggestions_service_with_mocks.get_solutions(knapsack_id)
 
-    redis_mock.hget.assert_called_once_with(config.suggested_solutions_hash, knapsack_id)
+    redis_mock.get.assert_called_once_with(f"{config.suggestions_key_prefix}:{knapsack_id}")
     assert expected_solution == suggested_solution
 
 
@@ -208,83 +155,216 @@ async def test_get_solutions_solutions_not_exist(
     redis_mock: Redis,
     config: Config,
 ):
-    redis_mock.hget = AsyncMock(return_value=None)
+    redis_mock.get = AsyncMock(return_value=None)
 
     suggested_solution = await solution_suggestions_service_with_mocks.get_solutions(knapsack_id)
 
-    redis_mock.hget.assert_called_once_with(config.suggested_solutions_hash, knapsack_id)
+    redis_mock.get.assert_called_once_with(f"{config.suggestions_key_prefix}:{knapsack_id}")
     assert suggested_solution is None
 
 
 @pytest.mark.asyncio
-async def test_reject_suggested_solutions(
+async def test_get_solutions_many(
     solution_suggestions_service_with_mocks: SuggestedSolutionsService,
     redis_mock: Redis,
-    knapsack_id: str,
-    claims_service_mock: ClaimsService,
     config: Config,
+):
+    expected_solution = SuggestedSolution(
+        time=datetime.now(),
+        solutions={
+            get_random_string(): AlgorithmSolution(items=[KnapsackItem(id=get_random_string(), volume=1, value=1)])
+        },
+    )
+    redis_mock.mget = AsyncMock(return_value=[expected_solution.json().encode(), None])
+
+    suggested_solutions = await solution_suggestions_service_with_mocks.get_solutions_many(["a", "b"])
+
+    redis_mock.mget.assert_called_once_with(
+        [f"{config.suggestions_key_prefix}:a", f"{config.suggestions_key_prefix}:b"]
+    )
+    assert suggested_solutions == [expected_solution, None]
+
+
+@pytest.mark.asyncio
+async def test_reject_suggested_solutions(
+    solution_suggestions_service: SuggestedSolutionsService, claims_service: ClaimsService, knapsack_id: str
 ):
     first_released_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
     second_released_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
-    all_solutions: dict[str, list[KnapsackItem]] = {
-        get_random_string(): AlgorithmSolution(items=[first_released_item]),
-        get_random_string(): AlgorithmSolution(items=[second_released_item]),
-    }
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(
-        return_value=SuggestedSolution(solutions=all_solutions, time=datetime.now())
+    await claims_service.claim_items([first_released_item, second_released_item], 1, knapsack_id)
+    await solution_suggestions_service.register_suggested_solutions(
+        [AlgorithmSolution(items=[first_released_item]), AlgorithmSolution(items=[second_released_item])], knapsack_id
     )
-    claims_service_mock.claim_suggested_solutions = AsyncMock(return_value=True)
-    claims_service_mock.release_items_claims = AsyncMock()
-    claims_service_mock.release_claim_suggested_solutions = AsyncMock()
-    redis_mock.hdel = AsyncMock()
 
-    result = await solution_suggestions_service_with_mocks.reject_suggested_solutions(knapsack_id)
+    result = await solution_suggestions_service.reject_suggested_solutions(knapsack_id)
 
     assert RejectResult.REJECT_SUCCESS == result
-    claims_service_mock.claim_suggested_solutions.assert_called_once_with(knapsack_id)
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    claims_service_mock.release_items_claims.assert_called_once_with([first_released_item, second_released_item])
-    redis_mock.hdel.assert_called_once_with(config.suggested_solutions_hash, knapsack_id)
-    claims_service_mock.release_claim_suggested_solutions.assert_called_once_with(knapsack_id)
+    assert not await claims_service.is_item_claimed(first_released_item.id)
+    assert not await claims_service.is_item_claimed(second_released_item.id)
+    assert await solution_suggestions_service.get_solutions(knapsack_id) is None
 
 
 @pytest.mark.asyncio
-async def test_reject_suggested_solution_solution_claim_failed(
-    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
-    redis_mock: Redis,
+async def test_reject_suggested_solution_solution_deleted(
+    solution_suggestions_service: SuggestedSolutionsService, knapsack_id: str
+):
+    result = await solution_suggestions_service.reject_suggested_solutions(knapsack_id)
+
+    assert RejectResult.SUGGESTION_NOT_EXISTS == result
+
+
+@pytest.mark.asyncio
+async def test_add_suggested_solution(solution_suggestions_service: SuggestedSolutionsService, knapsack_id: str):
+    first_solution = AlgorithmSolution(items=[KnapsackItem(id=get_random_string(), value=1, volume=1)])
+    second_solution = AlgorithmSolution(items=[])
+    suggestion = await solution_suggestions_service.register_suggested_solutions([first_solution], knapsack_id)
+
+    added = await solution_suggestions_service.add_suggested_solution(suggestion, second_solution, knapsack_id)
+
+    assert added
+    stored_suggestion = await solution_suggestions_service.get_solutions(knapsack_id)
+    assert [first_solution, second_solution] == list(stored_suggestion.solutions.values())
+
+
+@pytest.mark.asyncio
+async def test_add_suggested_solution_suggestion_rejected(
+    solution_suggestions_service: SuggestedSolutionsService, knapsack_id: str
+):
+    first_solution = AlgorithmSolution(items=[KnapsackItem(id=get_random_string(), value=1, volume=1)])
+    suggestion = await solution_suggestions_service.register_suggested_solutions([first_solution], knapsack_id)
+    await solution_suggestions_service.reject_suggested_solutions(knapsack_id)
+
+    added = await solution_suggestions_service.add_suggested_solution(
+        suggestion, AlgorithmSolution(items=[]), knapsack_id
+    )
+
+    assert not added
+    assert await solution_suggestions_service.get_solutions(knapsack_id) is None
+
+
+@pytest.mark.asyncio
+async def test_get_expired_knapsack_ids(
+    solution_suggestions_service: SuggestedSolutionsService, time_service_mock: TimeService, knapsack_id: str
+):
+    issue_time = datetime.now()
+    time_service_mock.now = MagicMock(return_value=issue_time - timedelta(seconds=10))
+    await solution_suggestions_service.register_suggested_solutions([AlgorithmSolution(items=[])], knapsack_id)
+    time_service_mock.now = MagicMock(return_value=issue_time)
+    await solution_suggestions_service.register_suggested_solutions([AlgorithmSolution(items=[])], "live")
+
+    expired = await solution_suggestions_service.get_expired_knapsack_ids(issue_time - timedelta(seconds=5), 10)
+
+    assert [knapsack_id] == expired
+
+
+@pytest.mark.asyncio
+async def test_reject_suggested_solutions_removes_from_expiry_index(
+    solution_suggestions_service: SuggestedSolutionsService, knapsack_id: str
+):
+    await solution_suggestions_service.register_suggested_solutions([AlgorithmSolution(items=[])], knapsack_id)
+
+    await solution_suggestions_service.reject_suggested_solutions(knapsack_id)
+
+    assert [] == await solution_suggestions_service.get_expired_knapsack_ids(datetime.now(), 10)
+
+
+@pytest.mark.asyncio
+async def test_release_expired_suggestions(
+    solution_suggestions_service: SuggestedSolutionsService,
+    claims_service: ClaimsService,
+    redis_client: Redis,
     knapsack_id: str,
-    claims_service_mock: ClaimsService,
+    config: Config,
 ):
-    claims_service_mock.claim_suggested_solutions = AsyncMock(return_value=False)
-    claims_service_mock.release_items_claims = AsyncMock()
-    claims_service_mock.release_claim_suggested_solutions = AsyncMock()
+    expired_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
+    live_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
+    await claims_service.claim_items([expired_item, live_item], 1, knapsack_id)
+    await solution_suggestions_service.register_suggested_solutions(
+        [AlgorithmSolution(items=[expired_item])], knapsack_id
+    )
+    await solution_suggestions_service.register_suggested_solutions([AlgorithmSolution(items=[live_item])], "live")
+    # Stands in for the server expiring the suggestion
+    await redis_client.delete(f"{config.suggestions_key_prefix}:{knapsack_id}")
 
-    result = await solution_suggestions_service_with_mocks.reject_suggested_solutions(knapsack_id)
+    released = await solution_suggestions_service.release_expired_suggestions([knapsack_id, "live"])
 
-    assert RejectResult.CLAIM_FAILED == result
-    claims_service_mock.claim_suggested_solutions.assert_called_once_with(knapsack_id)
-    claims_service_mock.release_items_claims.assert_not_called()
-    claims_service_mock.release_claim_suggested_solutions.assert_not_called()
+    assert [knapsack_id] == released
+    assert not await claims_service.is_item_claimed(expired_item.id)
+    assert await claims_service.is_item_claimed(live_item.id)
+    assert ["live"] == await solution_suggestions_service.get_expired_knapsack_ids(datetime.now(), 10)
+    await solution_suggestions_service.reject_suggested_solutions("live")
 
 
 @pytest.mark.asyncio
-async def test_reject_suggested_solution_solution_deleted(
-    solution_suggestions_service_with_mocks: SuggestedSolutionsService,
-    redis_mock: Redis,
+async def test_migrate_suggestions_hash(
+    solution_suggestions_service: SuggestedSolutionsService,
+    claims_service: ClaimsService,
+    redis_client: Redis,
     knapsack_id: str,
-    claims_service_mock: ClaimsService,
+    config: Config,
 ):
-    solution_suggestions_service_with_mocks.get_solutions = AsyncMock(return_value=None)
-    claims_service_mock.claim_suggested_solutions = AsyncMock(return_value=True)
-    claims_service_mock.release_items_claims = AsyncMock()
-    claims_service_mock.release_claim_suggested_solutions = AsyncMock()
-    redis_mock.hdel = AsyncMock()
+    item = KnapsackItem(id=get_random_string(), value=1, volume=1)
+    await claims_service.claim_items([item], 1, knapsack_id)
+    legacy_suggestion = SuggestedSolution(
+        time=datetime.now(), solutions={get_random_string(): AlgorithmSolution(items=[item])}
+    )
+    await redis_client.hset(config.suggested_solutions_hash, knapsack_id, legacy_suggestion.json())
 
-    result = await solution_suggestions_service_with_mocks.reject_suggested_solutions(knapsack_id)
+    migrated = await solution_suggestions_service.migrate_suggestions_hash()
 
-    assert RejectResult.SUGGESTION_NOT_EXISTS == result
-    claims_service_mock.claim_suggested_solutions.assert_called_once_with(knapsack_id)
-    solution_suggestions_service_with_mocks.get_solutions.assert_called_once_with(knapsack_id)
-    claims_service_mock.release_items_claims.assert_not_called()
-    redis_mock.hdel.assert_not_called()
-    claims_service_mock.release_claim_suggested_solutions.assert_called_once_with(knapsack_id)
+    assert 1 == migrated
+    assert not await redis_client.hgetall(config.suggested_solutions_hash)
+    assert legacy_suggestion == await solution_suggestions_service.get_solutions(knapsack_id)
+    assert 0 < await redis_client.ttl(f"{config.suggestions_key_prefix}:{knapsack_id}") <= config.suggestion_ttl_seconds
+    assert RejectResult.REJECT_SUCCESS == await solution_suggestions_service.reject_suggested_solutions(knapsack_id)
+    assert not await claims_service.is_item_claimed(item.id)
+
+
+@pytest.mark.asyncio
+async def test_release_expired_accepted_solutions(
+    solution_suggestions_service: SuggestedSolutionsService,
+    claims_service: ClaimsService,
+    time_service_mock: TimeService,
+    redis_client: Redis,
+    config: Config,
+):
+    accept_time = datetime.now()
+    expired_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
+    live_item = KnapsackItem(id=get_random_string(), value=1, volume=1)
+    for knapsack_id, item, accepted_at in [
+        ("expired", expired_item, accept_time - timedelta(seconds=10)),
+        ("live", live_item, accept_time),
+    ]:
+        await claims_service.claim_items([item], 1, knapsack_id)
+        suggestion = await solution_suggestions_service.register_suggested_solutions(
+            [AlgorithmSolution(items=[item])], knapsack_id
+        )
+        time_service_mock.now = MagicMock(return_value=accepted_at)
+        await solution_suggestions_service.accept_suggested_solution(knapsack_id, next(iter(suggestion.solutions)))
+
+    released = await solution_suggestions_service.release_expired_accepted_solutions(
+        accept_time - timedelta(seconds=5), 10
+    )
+
+    assert ["expired"] == [solution.knapsack_id for solution in released]
+    assert not await claims_service.is_item_claimed(expired_item.id)
+    assert await claims_service.is_item_claimed(live_item.id)
+    assert 1 == await redis_client.zcard(config.accepted_solutions_index)
+
+
+@pytest.mark.asyncio
+async def test_migrate_accepted_solutions_list(
+    solution_suggestions_service: SuggestedSolutionsService, redis_client: Redis, knapsack_id: str, config: Config
+):
+    legacy_solutions = [
+        AcceptedSolution(time=datetime.now() - timedelta(seconds=i), solution=[], knapsack_id=f"{knapsack_id}{i}")
+        for i in range(3)
+    ]
+    await redis_client.rpush(config.accepted_solutions_list, *(solution.json() for solution in legacy_solutions))
+
+    migrated = await solution_suggestions_service.migrate_accepted_solutions_list(2)
+
+    assert 3 == migrated
+    assert not await redis_client.lrange(config.accepted_solutions_list, 0, -1)
+    released = await solution_suggestions_service.release_expired_accepted_solutions(datetime.now(), 10)
+    assert sorted(legacy_solutions, key=lambda solution: solution.time) == released
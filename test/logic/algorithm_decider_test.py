@@ -3,9 +3,11 @@ from unittest.mock import AsyncMock
 
 import pytest
 
-from logic.algorithm_decider import AlgorithmDecider
+from component_factory import get_config
+from logic.algorithm_decider import AlgorithmDecider, AlgorithmDecision
 from logic.cluster_availability_service import ClusterAvailabilityService
-from models.algorithms import Algorithms
+from logic.solver_queue import get_algorithm_class
+from models.algorithms import Algorithms, AlgorithmClass
 from models.cluster_availability import ClusterAvailabilityScore
 from models.config.configuration import Config
 from models.subscription import SubscriptionScore
@@ -51,16 +53,17 @@ async def test_algorithm_decider(
     subscriptions_service = AsyncMock()
     subscriptions_service.get_subscription_score = AsyncMock(return_value=subscription)
     cluster_availability_service: ClusterAvailabilityService = AsyncMock()
-    cluster_availability_service.get_cluster_availability_score = AsyncMock(return_value=availability)
+    cluster_availability_service.get_queue_availability_score = AsyncMock(return_value=availability)
     decider = AlgorithmDecider(
         subscriptions_service,
         cluster_availability_service,
         config.algo_decider_branch_and_bound_max_items,
         config.algo_decider_dynamic_programming_max_iterations,
+        config.algo_decider_dynamic_programming_max_table_bytes,
     )
     algos = await decider.decide(knapsack_id, 10, 10)
 
-    assert algos == expected_algos
+    assert algos == AlgorithmDecision(expected_algos, subscription)
 
 
 class MockEnum(int, Enum):
@@ -72,16 +75,17 @@ async def test_algorithm_decider_handle_non_existing_score(config: Config, knaps
     subscriptions_service = AsyncMock()
     subscriptions_service.get_subscription_score = AsyncMock(return_value=MockEnum.MOCK)
     cluster_availability_service: ClusterAvailabilityService = AsyncMock()
-    cluster_availability_service.get_cluster_availability_score = AsyncMock(return_value=MockEnum.MOCK)
+    cluster_availability_service.get_queue_availability_score = AsyncMock(return_value=MockEnum.MOCK)
     decider = AlgorithmDecider(
         subscriptions_service,
         cluster_availability_service,
         config.algo_decider_branch_and_bound_max_items,
         config.algo_decider_dynamic_programming_max_iterations,
+        config.algo_decider_dynamic_programming_max_table_bytes,
     )
     algo = await decider.decide(knapsack_id, 10, 10)
 
-    assert algo == [Algorithms.FIRST_FIT]
+    assert algo.algorithms == [Algorithms.FIRST_FIT]
 
 
 @pytest.mark.asyncio
@@ -89,13 +93,13 @@ async def test_algorithm_decider_thresholds_bnb_to_dp(config: Config, knapsack_i
     subscriptions_service = AsyncMock()
     subscriptions_service.get_subscription_score = AsyncMock(return_value=SubscriptionScore.PREMIUM)
     cluster_availability_service: ClusterAvailabilityService = AsyncMock()
-    cluster_availability_service.get_cluster_availability_score = AsyncMock(
+    cluster_availability_service.get_queue_availability_score = AsyncMock(
         return_value=ClusterAvailabilityScore.AVAILABLE
     )
-    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1, 1000)
+    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1, 1000, 1000)
     algo = await decider.decide(knapsack_id, 2, 10)
 
-    assert algo == [
+    assert algo.algorithms == [
         Algorithms.DYNAMIC_PROGRAMMING,
         Algorithms.GENETIC_HEAVY,
         Algorithms.GENETIC_LIGHT,
@@ -108,13 +112,18 @@ async def test_algorithm_decider_thresholds_bnb_to_genetic(config: Config, knaps
     subscriptions_service = AsyncMock()
     subscriptions_service.get_subscription_score = AsyncMock(return_value=SubscriptionScore.PREMIUM)
     cluster_availability_service: ClusterAvailabilityService = AsyncMock()
-    cluster_availability_service.get_cluster_availability_score = AsyncMock(
+    cluster_availability_service.get_queue_availability_score = AsyncMock(
         return_value=ClusterAvailabilityScore.AVAILABLE
     )
-    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1, 2)
+    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1, 2, 1000)
     algo = await decider.decide(knapsack_id, 2, 10)
 
-    assert algo == [Algorithms.GENETIC_HEAVY, Algorithms.GENETIC_HEAVY, Algorithms.GENETIC_LIGHT, Algorithms.GREEDY]
+    assert algo.algorithms == [
+        Algorithms.GENETIC_HEAVY,
+        Algorithms.GENETIC_HEAVY,
+        Algorithms.GENETIC_LIGHT,
+        Algorithms.GREEDY,
+    ]
 
 
 @pytest.mark.asyncio
@@ -122,10 +131,127 @@ async def test_algorithm_decider_thresholds_dp_to_genetic(config: Config, knapsa
     subscriptions_service = AsyncMock()
     subscriptions_service.get_subscription_score = AsyncMock(return_value=SubscriptionScore.PREMIUM)
     cluster_availability_service: ClusterAvailabilityService = AsyncMock()
-    cluster_availability_service.get_cluster_availability_score = AsyncMock(
+    cluster_availability_service.get_queue_availability_score = AsyncMock(
         return_value=ClusterAvailabilityScore.MODERATE
     )
-    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1, 2)
+    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1, 2, 1000)
     algo = await decider.decide(knapsack_id, 2, 10)
 
-    assert algo == [Algorithms.GENETIC_HEAVY, Algorithms.GENETIC_HEAVY, Algorithms.GENETIC_LIGHT, Algorithms.GREEDY]
+    assert algo.algorithms == [
+        Algorithms.GENETIC_HEAVY,
+        Algorithms.GENETIC_HEAVY,
+        Algorithms.GENETIC_LIGHT,
+        Algorithms.GREEDY,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_algorithm_decider_thresholds_dp_to_divide_and_conquer(config: Config, knapsack_id: str):
+    subscriptions_service = AsyncMock()
+    subscriptions_service.get_subscription_score = AsyncMock(return_value=SubscriptionScore.PREMIUM)
+    cluster_availability_service: ClusterAvailabilityService = AsyncMock()
+    cluster_availability_service.get_queue_availability_score = AsyncMock(
+        return_value=ClusterAvailabilityScore.MODERATE
+    )
+    # The decision table outgrows the memory limit while the rows of a single capacity still fit
+    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1, 1_000_000, 10_000)
+    algo = await decider.decide(knapsack_id, 1000, 100)
+
+    assert algo.algorithms == [
+        Algorithms.DYNAMIC_PROGRAMMING_DIVIDE_AND_CONQUER,
+        Algorithms.GENETIC_HEAVY,
+        Algorithms.GENETIC_LIGHT,
+        Algorithms.GREEDY,
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "items_count,capacity,expected_algo",
+    [
+        (1000, 100_000, Algorithms.DYNAMIC_PROGRAMMING),
+        (1000, 1_000_000, Algorithms.DYNAMIC_PROGRAMMING_DIVIDE_AND_CONQUER),
+        (1000, 10_000_000, Algorithms.GENETIC_HEAVY),
+        (1, 2_000_000_000, Algorithms.GENETIC_HEAVY),
+        (2, 100_000_000, Algorithms.GENETIC_HEAVY),
+    ],
+)
+async def test_algorithm_decider_default_dp_thresholds(
+    items_count: int, capacity: int, expected_algo: Algorithms, knapsack_id: str
+):
+    config = get_config()
+    subscriptions_service = AsyncMock()
+    subscriptions_service.get_subscription_score = AsyncMock(return_value=SubscriptionScore.PREMIUM)
+    cluster_availability_service: ClusterAvailabilityService = AsyncMock()
+    cluster_availability_service.get_queue_availability_score = AsyncMock(
+        return_value=ClusterAvailabilityScore.MODERATE
+    )
+    decider = AlgorithmDecider(
+        subscriptions_service,
+        cluster_availability_service,
+        config.algo_decider_branch_and_bound_max_items,
+        config.algo_decider_dynamic_programming_max_iterations,
+        config.algo_decider_dynamic_programming_max_table_bytes,
+    )
+
+    algo = await decider.decide(knapsack_id, items_count, capacity)
+
+    assert algo.algorithms[0] == expected_algo
+
+
+@pytest.mark.asyncio
+async def test_algorithm_decider_decide_many(config: Config):
+    scores = {"premium": SubscriptionScore.PREMIUM, "standard": SubscriptionScore.STANDARD}
+    subscriptions_service = AsyncMock()
+    subscriptions_service.get_subscription_score = AsyncMock(side_effect=lambda knapsack_id: scores[knapsack_id])
+    cluster_availability_service: ClusterAvailabilityService = AsyncMock()
+    cluster_availability_service.get_queue_availability_score = AsyncMock(return_value=ClusterAvailabilityScore.BUSY)
+    decider = AlgorithmDecider(subscriptions_service, cluster_availability_service, 1000, 1000, 1000)
+    algos = await decider.decide_many([("premium", 10, 10), ("standard", 10, 10)])
+
+    assert algos == [
+        AlgorithmDecision([Algorithms.GENETIC_HEAVY], SubscriptionScore.PREMIUM),
+        AlgorithmDecision([Algorithms.GREEDY], SubscriptionScore.STANDARD),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_algorithm_decider_sizes_requests_on_their_own_queue(config: Config):
+    scores = {"premium": SubscriptionScore.PREMIUM, "standard": SubscriptionScore.STANDARD}
+    subscriptions_service = AsyncMock()
+    subscriptions_service.get_subscription_score = AsyncMock(side_effect=lambda knapsack_id: scores[knapsack_id])
+    queue_scores = {
+        AlgorithmClass.EXACT: ClusterAvailabilityScore.AVAILABLE,
+        AlgorithmClass.HEAVY: ClusterAvailabilityScore.VERY_BUSY,
+        AlgorithmClass.LIGHT: ClusterAvailabilityScore.AVAILABLE,
+    }
+    cluster_availability_sampler = AsyncMock()
+    cluster_availability_sampler.get_queue_availability_score = AsyncMock(
+        side_effect=lambda algorithms: queue_scores[get_algorithm_class(algorithms)]
+    )
+    decider = AlgorithmDecider(subscriptions_service, cluster_availability_sampler, 1000, 1000, 1000)
+
+    premium, standard = await decider.decide_many([("premium", 10, 10), ("standard", 10, 10)])
+
+    # The busy heavy queue leaves exact requests alone and only moves standard requests off it
+    assert premium.algorithms == [
+        Algorithms.BRANCH_AND_BOUND,
+        Algorithms.GENETIC_HEAVY,
+        Algorithms.GENETIC_LIGHT,
+        Algorithms.GREEDY,
+    ]
+    assert standard.algorithms == [Algorithms.GENETIC_LIGHT, Algorithms.GENETIC_LIGHT, Algorithms.GREEDY]
+
+
+@pytest.mark.asyncio
+async def test_algorithm_decider_decide_many_isolates_failed_lookups(config: Config):
+    failure = ConnectionError("subscriptions are down")
+    subscriptions_service = AsyncMock()
+    subscriptions_service.get_subscription_score = AsyncMock(side_effect=[SubscriptionScore.PREMIUM, failure])
+    cluster_availability_sampler = AsyncMock()
+    cluster_availability_sampler.get_queue_availability_score = AsyncMock(return_value=ClusterAvailabilityScore.BUSY)
+    decider = AlgorithmDecider(subscriptions_service, cluster_availability_sampler, 1000, 1000, 1000)
+
+    decisions = await decider.decide_many([("premium", 10, 10), ("failing", 10, 10)])
+
+    assert decisions == [AlgorithmDecision([Algorithms.GENETIC_HEAVY], SubscriptionScore.PREMIUM), failure]
@@ -1,25 +1,137 @@
 import random
 from unittest.mock import MagicMock
 
+import pytest
+
+from component_factory import get_config
 from logic.algorithm_runner import AlgorithmRunner
-from logic.solver.base_solver import BaseSolver
+from logic.solver.base_solver import BaseSolver, SolverResult
+from logic.solver.deadline import Deadline
 from logic.solver.solver_loader import SolverLoader
+from logic.solver_process_pool import SolverProcessPool
 from models.algorithms import Algorithms
 from models.knapsack_item import KnapsackItem
 from test.utils import get_random_string
 
 
-def test_algorithm_runner():
+@pytest.mark.asyncio
+async def test_algorithm_runner():
     solver_loader = MagicMock(SolverLoader)
     solver = MagicMock(BaseSolver)
     expected_result = [KnapsackItem(id=get_random_string(), value=10, volume=1)]
-    solver.solve = MagicMock(return_value=expected_result)
+    solver.solve_with_proof = MagicMock(return_value=SolverResult(expected_result, False))
     solver_loader.load = MagicMock(return_value=solver)
-    runner = AlgorithmRunner(solver_loader)
+    runner = AlgorithmRunner(solver_loader, 30)
     random_volume = random.randint(1, 5)
 
-    result = runner.run_algorithms(expected_result, random_volume, [MagicMock(Algorithms)])[0]
+    result = (await runner.run_algorithms(expected_result, random_volume, [MagicMock(Algorithms)]))[0]
 
     assert expected_result == result
     solver_loader.load.assert_called_once()
-    solver.solve.assert_called_once()
+    solver.solve_with_proof.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_algorithm_runner_splits_budget_between_algorithms():
+    solver_loader = MagicMock(SolverLoader)
+    solver = MagicMock(BaseSolver)
+    solver.solve_with_proof = MagicMock(return_value=SolverResult([], False))
+    solver_loader.load = MagicMock(return_value=solver)
+    runner = AlgorithmRunner(solver_loader, 30)
+
+    await runner.run_algorithms([], 1, [MagicMock(Algorithms), MagicMock(Algorithms), MagicMock(Algorithms)])
+
+    budgets = [call.args[2].remaining_seconds() for call in solver.solve_with_proof.call_args_list]
+    # Algorithms finishing early hand their unused share over to the ones after them
+    assert [round(budget) for budget in budgets] == [10, 15, 30]
+
+
+@pytest.mark.asyncio
+async def test_algorithm_runner_uses_given_deadline():
+    solver_loader = MagicMock(SolverLoader)
+    solver = MagicMock(BaseSolver)
+    solver.solve_with_proof = MagicMock(return_value=SolverResult([], False))
+    solver_loader.load = MagicMock(return_value=solver)
+    runner = AlgorithmRunner(solver_loader, 30)
+
+    await runner.run_algorithms([], 1, [MagicMock(Algorithms)], Deadline.after(2))
+
+    assert 1 < solver.solve_with_proof.call_args.args[2].remaining_seconds() <= 2
+
+
+@pytest.mark.asyncio
+async def test_algorithm_runner_passes_cancellation_to_every_algorithm():
+    solver_loader = MagicMock(SolverLoader)
+    solver = MagicMock(BaseSolver)
+    solver.solve_with_proof = MagicMock(return_value=SolverResult([], False))
+    solver_loader.load = MagicMock(return_value=solver)
+    runner = AlgorithmRunner(solver_loader, 30)
+    cancellation = await runner.create_cancellation()
+    cancellation.set()
+
+    results = [r async for r in runner.iter_algorithms([], 1, [Algorithms.GREEDY] * 2, cancellation=cancellation)]
+
+    assert len(results) == 2
+    assert all(call.args[2].expired() for call in solver.solve_with_proof.call_args_list)
+
+
+@pytest.mark.asyncio
+async def test_algorithm_runner_portfolio_skips_after_exact_algorithm():
+    solver_loader = MagicMock(SolverLoader)
+    solver = MagicMock(BaseSolver)
+    expected_result = [KnapsackItem(id=get_random_string(), value=10, volume=1)]
+    solver.solve_with_proof = MagicMock(
+        side_effect=[SolverResult(expected_result, False), SolverResult(expected_result, True)]
+    )
+    solver_loader.load = MagicMock(return_value=solver)
+    runner = AlgorithmRunner(solver_loader, 30, portfolio_mode=True)
+
+    result = await runner.run_algorithms(
+        expected_result, 1, [Algorithms.GREEDY, Algorithms.BRANCH_AND_BOUND, Algorithms.GENETIC_HEAVY]
+    )
+
+    assert result == [expected_result, expected_result, []]
+    assert solver.solve_with_proof.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_algorithm_runner_portfolio_keeps_going_without_optimality_proof():
+    solver_loader = MagicMock(SolverLoader)
+    solver = MagicMock(BaseSolver)
+    # An exact algorithm cut short, e.g. by a cancellation, returns in time but can't vouch for its solution
+    solver.solve_with_proof = MagicMock(return_value=SolverResult([], False))
+    solver_loader.load = MagicMock(return_value=solver)
+    runner = AlgorithmRunner(solver_loader, 30, portfolio_mode=True)
+
+    await runner.run_algorithms([], 1, [Algorithms.BRANCH_AND_BOUND, Algorithms.DYNAMIC_PROGRAMMING, Algorithms.GREEDY])
+
+    assert solver.solve_with_proof.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_algorithm_runner_portfolio_races_in_process_pool():
+    items = [KnapsackItem(id=get_random_string(), value=i % 11 + 1, volume=i % 7 + 1) for i in range(200)]
+    process_pool = SolverProcessPool(get_config(), 2, 10, 5)
+    runner = AlgorithmRunner(MagicMock(SolverLoader), 30, process_pool, portfolio_mode=True)
+    try:
+        result = await runner.run_algorithms(items, 50, [Algorithms.DYNAMIC_PROGRAMMING, Algorithms.GENETIC_HEAVY])
+    finally:
+        runner.shutdown()
+
+    assert sum(i.volume for i in result[0]) <= 50
+    assert sum(i.value for i in result[0]) >= sum(i.value for i in result[1])
+
+
+@pytest.mark.asyncio
+async def test_algorithm_runner_yields_each_solution_when_found():
+    solver_loader = MagicMock(SolverLoader)
+    solver = MagicMock(BaseSolver)
+    solutions = [[KnapsackItem(id=get_random_string(), value=1, volume=1)] for _ in range(2)]
+    solver.solve_with_proof = MagicMock(side_effect=[SolverResult(solution, False) for solution in solutions])
+    solver_loader.load = MagicMock(return_value=solver)
+    runner = AlgorithmRunner(solver_loader, 30)
+    results = runner.iter_algorithms([], 1, [Algorithms.GREEDY, Algorithms.FIRST_FIT])
+
+    assert await results.__anext__() == (0, solutions[0])
+    solver.solve_with_proof.assert_called_once()
+    assert await results.__anext__() == (1, solutions[1])
@@ -0,0 +1,103 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from component_factory import get_config
+from logic.cluster_availability_sampler import ClusterAvailabilitySampler
+from models.algorithms import Algorithms
+from models.cluster_availability import ClusterAvailabilityScore
+
+
+def _sampler(
+    queue_depths: list[int], smoothing_factor: float = 1, hysteresis_ratio: float = 0.5, per_algorithm_class=False
+):
+    channel = MagicMock()
+    channel.declare_queue = AsyncMock(
+        side_effect=[MagicMock(declaration_result=MagicMock(message_count=depth)) for depth in queue_depths]
+    )
+
+    @asynccontextmanager
+    async def acquire():
+        yield channel
+
+    channel_pool = MagicMock()
+    channel_pool.acquire = acquire
+    config = get_config()._replace(
+        solvers_moderate_busy_threshold=10,
+        solvers_busy_threshold=20,
+        solvers_very_busy_threshold=30,
+        cluster_availability_smoothing_factor=smoothing_factor,
+        cluster_availability_hysteresis_ratio=hysteresis_ratio,
+        solver_queue="solver",
+        solver_queue_per_algorithm_class=per_algorithm_class,
+    )
+    return ClusterAvailabilitySampler(channel_pool, config)
+
+
+@pytest.mark.asyncio
+async def test_sampler_becomes_busier_immediately():
+    sampler = _sampler([0, 25, 35])
+
+    assert [(await sampler.sample())["solver"] for _ in range(3)] == [
+        ClusterAvailabilityScore.AVAILABLE,
+        ClusterAvailabilityScore.BUSY,
+        ClusterAvailabilityScore.VERY_BUSY,
+    ]
+    assert await sampler.get_queue_availability_score([Algorithms.GREEDY]) == ClusterAvailabilityScore.VERY_BUSY
+
+
+@pytest.mark.asyncio
+async def test_sampler_hysteresis_delays_becoming_available():
+    # With a 0.5 ratio, leaving the moderate band (threshold 10) needs a depth below 5
+    sampler = _sampler([12, 8, 6, 4, 12, 9])
+
+    assert [(await sampler.sample())["solver"] for _ in range(6)] == [
+        ClusterAvailabilityScore.MODERATE,
+        ClusterAvailabilityScore.MODERATE,
+        ClusterAvailabilityScore.MODERATE,
+        ClusterAvailabilityScore.AVAILABLE,
+        ClusterAvailabilityScore.MODERATE,
+        ClusterAvailabilityScore.MODERATE,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sampler_smooths_queue_depth_spikes():
+    sampler = _sampler([0, 100, 0], smoothing_factor=0.2)
+
+    assert [(await sampler.sample())["solver"] for _ in range(3)] == [
+        ClusterAvailabilityScore.AVAILABLE,
+        ClusterAvailabilityScore.BUSY,
+        ClusterAvailabilityScore.BUSY,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sampler_keeps_last_score_when_sampling_fails():
+    sampler = _sampler([25])
+    await sampler.start()
+    sampler._channel_pool.acquire = MagicMock(side_effect=ConnectionError())
+
+    await sampler._sample_safely()
+
+    assert await sampler.get_queue_availability_score([Algorithms.GREEDY]) == ClusterAvailabilityScore.BUSY
+    await sampler.stop()
+
+
+@pytest.mark.asyncio
+async def test_sampler_scores_each_algorithm_class_queue():
+    # Depths of the exact, heavy and light queues
+    sampler = _sampler([0, 25, 12], per_algorithm_class=True)
+
+    assert await sampler.sample() == {
+        "solver.exact": ClusterAvailabilityScore.AVAILABLE,
+        "solver.heavy": ClusterAvailabilityScore.BUSY,
+        "solver.light": ClusterAvailabilityScore.MODERATE,
+    }
+    assert await sampler.get_queue_availability_score([Algorithms.BRANCH_AND_BOUND, Algorithms.GENETIC_HEAVY]) == (
+        ClusterAvailabilityScore.AVAILABLE
+    )
+    assert await sampler.get_queue_availability_score([Algorithms.GENETIC_HEAVY, Algorithms.GREEDY]) == (
+        ClusterAvailabilityScore.BUSY
+    )
@@ -1,3 +1,6 @@
+import asyncio
+import threading
+import time
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -7,6 +10,11 @@ from logic.claims_service import ClaimsService
 from logic.consumer.solver_instance_consumer import SolverInstanceConsumer
 from logic.rabbit_channel_context import RabbitChannelContext
 from logic.solution_reporter import SolutionReporter
+from logic.solve_cancellations_listener import SolveCancellationsListener
+from logic.solver.base_solver import SolverResult
+from logic.solver.solver_loader import SolverLoader
+from logic.solver_process_pool import SolverProcessPool
+from logic.solver_queue import DEADLINE_HEADER
 from logic.suggested_solution_service import SuggestedSolutionsService
 from models.algorithms import Algorithms
 from models.config.configuration import Config
@@ -33,21 +41,23 @@ async def test_solver_consumer_claims(config: Config):
     items_claimer.claim_items = AsyncMock(return_value=solution_request_items)
     solution_reporter = AsyncMock(SolutionReporter)
     algorithm_runner = MagicMock(AlgorithmRunner)
-    algorithm_runner.run_algorithms = MagicMock(return_value=[expected_result])
+    algorithm_runner.iter_algorithms = MagicMock(side_effect=_algorithm_results(expected_result))
     solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
     solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
 
     consumer = SolverInstanceConsumer(
-        channel_context, algorithm_runner, items_claimer, solution_reporter, solution_suggestion_service
+        channel_context, algorithm_runner, items_claimer, solution_reporter, solution_suggestion_service, config
     )
 
     async with consumer:
         await consumer.start_consuming(config.solver_queue)
 
-    algorithm_runner.run_algorithms.assert_called_once()
+    algorithm_runner.iter_algorithms.assert_called_once()
     items_claimer.claim_items.assert_called_once()
     items_claimer.release_items_claims.assert_called_once_with(non_accepted_items)
-    solution_reporter.report_solution_suggestions.assert_called_once()
+    solution_suggestion_service.register_suggested_solutions.assert_called_once()
+    solution_reporter.report_partial_solution.assert_called_once()
+    solution_reporter.report_solutions_complete.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -69,7 +79,7 @@ async def test_solver_consumer_suggestion_already_exists(config: Config, knapsac
     solution_suggestion_service.get_solutions = AsyncMock(return_value=["mock_existing_suggestion"])
 
     consumer = SolverInstanceConsumer(
-        channel_context, algorithm_runner, items_claimer, solution_reporter, solution_suggestion_service
+        channel_context, algorithm_runner, items_claimer, solution_reporter, solution_suggestion_service, config
     )
 
     async with consumer:
@@ -79,7 +89,8 @@ async def test_solver_consumer_suggestion_already_exists(config: Config, knapsac
     algorithm_runner.run_algorithm.assert_not_called()
     items_claimer.claim_items.assert_not_called()
     items_claimer.release_items_claims.assert_not_called()
-    solution_reporter.report_solution_suggestions.assert_not_called()
+    solution_reporter.report_partial_solution.assert_not_called()
+    solution_reporter.report_solutions_complete.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -99,31 +110,384 @@ async def test_solver_knapsack_already_running(config: Config, knapsack_id: str)
     claims_service.release_claim_running_knapsack = AsyncMock()
     solution_reporter = AsyncMock(SolutionReporter)
     algorithm_runner = MagicMock(AlgorithmRunner)
-    algorithm_runner.run_algorithms = MagicMock(return_value=[expected_solution])
+    algorithm_runner.iter_algorithms = MagicMock(side_effect=_algorithm_results(expected_solution))
     solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
     solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
 
     consumer = SolverInstanceConsumer(
-        channel_context, algorithm_runner, claims_service, solution_reporter, solution_suggestion_service
+        channel_context, algorithm_runner, claims_service, solution_reporter, solution_suggestion_service, config
     )
 
     async with consumer:
         await consumer.start_consuming(config.solver_queue)
 
-    solution_reporter.report_solution_suggestions.assert_called_once_with(
+    solution_suggestion_service.register_suggested_solutions.assert_called_once_with(
         [AlgorithmSolution(items=expected_solution)], knapsack_id
     )
-    algorithm_runner.run_algorithms.assert_called_once_with(request.items, request.volume, request.algorithms)
+    solution_reporter.report_solutions_complete.assert_called_once_with(knapsack_id)
+    algorithm_runner.iter_algorithms.assert_called_once()
+    assert algorithm_runner.iter_algorithms.call_args.args[:3] == (request.items, request.volume, request.algorithms)
     claims_service.claim_items.assert_called_once_with(request.items, request.volume, request.knapsack_id)
     claims_service.release_items_claims.assert_called_once_with([])
     claims_service.release_claim_running_knapsack.assert_called_once_with(knapsack_id)
 
 
+@pytest.mark.asyncio
+async def test_solver_consumer_handles_messages_concurrently(config: Config):
+    requests = [
+        SolverInstanceRequest(
+            items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+            volume=1,
+            knapsack_id=get_random_string(),
+            algorithms=[Algorithms.FIRST_FIT],
+        )
+        for _ in range(2)
+    ]
+    both_running = asyncio.Event()
+    running = []
+
+    async def iter_algorithms(items, volume, algorithms, deadline=None):
+        running.append(items)
+        if len(running) == 2:
+            both_running.set()
+        await asyncio.wait_for(both_running.wait(), 1)
+        yield 0, items
+
+    channel_context = await _mock_channel_with_messages(*requests)
+    claims_service = AsyncMock(ClaimsService)
+    claims_service.claim_items = AsyncMock(side_effect=lambda items, volume, knapsack_id: items)
+    algorithm_runner = MagicMock(AlgorithmRunner)
+    algorithm_runner.iter_algorithms = MagicMock(side_effect=iter_algorithms)
+    solution_reporter = AsyncMock(SolutionReporter)
+    solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
+    solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
+
+    consumer = SolverInstanceConsumer(
+        channel_context, algorithm_runner, claims_service, solution_reporter, solution_suggestion_service, config
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    channel = await channel_context.__aenter__()
+    channel.set_qos.assert_awaited_once_with(prefetch_count=config.solver_prefetch_count)
+    assert solution_reporter.report_solutions_complete.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_reports_every_new_solution(config: Config, knapsack_id: str):
+    first_solution = [KnapsackItem(id=get_random_string(), value=1, volume=1)]
+    second_solution = [KnapsackItem(id=get_random_string(), value=2, volume=1)]
+    request = SolverInstanceRequest(
+        items=first_solution + second_solution,
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.GREEDY, Algorithms.FIRST_FIT, Algorithms.DYNAMIC_PROGRAMMING],
+    )
+
+    channel_context = await _mock_channel_with_messages(request)
+    claims_service = AsyncMock(ClaimsService)
+    claims_service.claim_items = AsyncMock(return_value=request.items)
+    solution_reporter = AsyncMock(SolutionReporter)
+    algorithm_runner = MagicMock(AlgorithmRunner)
+    algorithm_runner.iter_algorithms = MagicMock(
+        side_effect=_algorithm_results(first_solution, first_solution, second_solution)
+    )
+    solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
+    solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
+    solution_suggestion_service.add_suggested_solution = AsyncMock(return_value=True)
+
+    consumer = SolverInstanceConsumer(
+        channel_context, algorithm_runner, claims_service, solution_reporter, solution_suggestion_service, config
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    solution_suggestion_service.register_suggested_solutions.assert_called_once_with(
+        [AlgorithmSolution(algorithm=Algorithms.GREEDY, items=first_solution)], knapsack_id
+    )
+    solution_suggestion_service.add_suggested_solution.assert_called_once()
+    assert solution_suggestion_service.add_suggested_solution.call_args.args[1] == AlgorithmSolution(
+        algorithm=Algorithms.DYNAMIC_PROGRAMMING, items=second_solution
+    )
+    assert solution_reporter.report_partial_solution.await_count == 2
+    solution_reporter.report_solutions_complete.assert_called_once_with(knapsack_id)
+    claims_service.release_items_claims.assert_called_once_with([])
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_stops_once_suggestion_was_accepted(config: Config, knapsack_id: str):
+    first_solution = [KnapsackItem(id=get_random_string(), value=1, volume=1)]
+    second_solution = [KnapsackItem(id=get_random_string(), value=2, volume=1)]
+    request = SolverInstanceRequest(
+        items=first_solution + second_solution,
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.GREEDY, Algorithms.DYNAMIC_PROGRAMMING],
+    )
+
+    channel_context = await _mock_channel_with_messages(request)
+    claims_service = AsyncMock(ClaimsService)
+    claims_service.claim_items = AsyncMock(return_value=request.items)
+    solution_reporter = AsyncMock(SolutionReporter)
+    algorithm_runner = MagicMock(AlgorithmRunner)
+    algorithm_runner.iter_algorithms = MagicMock(side_effect=_algorithm_results(first_solution, second_solution))
+    solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
+    solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
+    solution_suggestion_service.add_suggested_solution = AsyncMock(return_value=False)
+
+    consumer = SolverInstanceConsumer(
+        channel_context, algorithm_runner, claims_service, solution_reporter, solution_suggestion_service, config
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    solution_reporter.report_partial_solution.assert_called_once_with(knapsack_id)
+    solution_reporter.report_solutions_complete.assert_called_once_with(knapsack_id)
+    claims_service.release_items_claims.assert_called_once_with(second_solution)
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_skips_requests_past_their_deadline(config: Config, knapsack_id: str):
+    request = SolverInstanceRequest(
+        items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.GREEDY],
+        deadline=time.time() - 1,
+    )
+
+    channel_context = await _mock_channel_with_messages(request)
+    claims_service = AsyncMock(ClaimsService)
+    algorithm_runner = MagicMock(AlgorithmRunner)
+    consumer = SolverInstanceConsumer(
+        channel_context,
+        algorithm_runner,
+        claims_service,
+        AsyncMock(SolutionReporter),
+        AsyncMock(SuggestedSolutionsService),
+        config,
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    claims_service.claim_running_knapsack.assert_not_called()
+    claims_service.claim_items.assert_not_called()
+    algorithm_runner.iter_algorithms.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_solves_until_request_deadline(config: Config, knapsack_id: str):
+    request = SolverInstanceRequest(
+        items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.GREEDY],
+        deadline=time.time() + 1,
+    )
+
+    channel_context = await _mock_channel_with_messages(request)
+    claims_service = AsyncMock(ClaimsService)
+    claims_service.claim_items = AsyncMock(return_value=request.items)
+    algorithm_runner = MagicMock(AlgorithmRunner)
+    algorithm_runner.iter_algorithms = MagicMock(side_effect=_algorithm_results(request.items))
+    solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
+    solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
+    consumer = SolverInstanceConsumer(
+        channel_context,
+        algorithm_runner,
+        claims_service,
+        AsyncMock(SolutionReporter),
+        solution_suggestion_service,
+        config._replace(solver_request_budget_seconds=50),
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    assert algorithm_runner.iter_algorithms.call_args.args[3].at == request.deadline
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_skips_requests_nobody_waits_for(config: Config, knapsack_id: str):
+    request = SolverInstanceRequest(
+        items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.GREEDY],
+        deadline=time.time() + 60,
+    )
+
+    channel_context = await _mock_channel_with_messages(request)
+    claims_service = AsyncMock(ClaimsService)
+    solution_reporter = AsyncMock(SolutionReporter)
+    solution_reporter.has_waiters = AsyncMock(return_value=False)
+    consumer = SolverInstanceConsumer(
+        channel_context,
+        MagicMock(AlgorithmRunner),
+        claims_service,
+        solution_reporter,
+        AsyncMock(SuggestedSolutionsService),
+        config._replace(solution_waiters_tracking_enabled=True),
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    solution_reporter.has_waiters.assert_called_once_with(knapsack_id)
+    claims_service.claim_running_knapsack.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_releases_claims_once_cancelled(config: Config, knapsack_id: str):
+    first_solution = [KnapsackItem(id=get_random_string(), value=1, volume=1)]
+    second_solution = [KnapsackItem(id=get_random_string(), value=2, volume=1)]
+    request = SolverInstanceRequest(
+        items=first_solution + second_solution,
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.GREEDY, Algorithms.GENETIC_HEAVY],
+    )
+
+    async def iter_algorithms(items, volume, algorithms, deadline=None):
+        yield 0, first_solution
+        deadline.cancellation.set()
+        yield 1, second_solution
+
+    channel_context = await _mock_channel_with_messages(request)
+    claims_service = AsyncMock(ClaimsService)
+    claims_service.claim_items = AsyncMock(return_value=request.items)
+    solution_reporter = AsyncMock(SolutionReporter)
+    algorithm_runner = MagicMock(AlgorithmRunner)
+    algorithm_runner.create_cancellation = AsyncMock(return_value=threading.Event())
+    algorithm_runner.iter_algorithms = MagicMock(side_effect=iter_algorithms)
+    solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
+    solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
+    cancellations_listener = MagicMock(SolveCancellationsListener)
+    cancellations_listener.start = AsyncMock()
+    cancellations_listener.stop = AsyncMock()
+
+    consumer = SolverInstanceConsumer(
+        channel_context,
+        algorithm_runner,
+        claims_service,
+        solution_reporter,
+        solution_suggestion_service,
+        config,
+        cancellations_listener,
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    cancellation = algorithm_runner.create_cancellation.return_value
+    cancellations_listener.register.assert_called_once_with(knapsack_id, cancellation)
+    cancellations_listener.unregister.assert_called_once_with(knapsack_id, cancellation)
+    solution_suggestion_service.register_suggested_solutions.assert_called_once()
+    solution_suggestion_service.add_suggested_solution.assert_not_called()
+    claims_service.release_items_claims.assert_called_once_with(second_solution)
+    solution_suggestion_service.reject_suggested_solutions.assert_called_once_with(knapsack_id)
+    solution_reporter.report_error.assert_called_once_with(knapsack_id, SolutionReportCause.CANCELLED)
+    solution_reporter.report_solutions_complete.assert_not_called()
+    claims_service.release_claim_running_knapsack.assert_called_once_with(knapsack_id)
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_completes_when_exact_algorithm_wins_the_race(config: Config, knapsack_id: str):
+    exact_solution = [KnapsackItem(id=get_random_string(), value=2, volume=1)]
+    request = SolverInstanceRequest(
+        items=exact_solution,
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.DYNAMIC_PROGRAMMING, Algorithms.GENETIC_HEAVY],
+    )
+
+    async def solve(algorithm, items, volume, deadline):
+        if algorithm == Algorithms.DYNAMIC_PROGRAMMING:
+            return SolverResult(exact_solution, True)
+        while not deadline.expired():
+            await asyncio.sleep(0.01)
+        return SolverResult([], False)
+
+    process_pool = MagicMock(SolverProcessPool)
+    process_pool.create_cancellation = AsyncMock(side_effect=threading.Event)
+    process_pool.solve = AsyncMock(side_effect=solve)
+    algorithm_runner = AlgorithmRunner(MagicMock(SolverLoader), 30, process_pool, portfolio_mode=True)
+    claims_service = AsyncMock(ClaimsService)
+    claims_service.claim_items = AsyncMock(return_value=request.items)
+    solution_reporter = AsyncMock(SolutionReporter)
+    solution_suggestion_service = AsyncMock(SuggestedSolutionsService)
+    solution_suggestion_service.get_solutions = AsyncMock(return_value=None)
+    cancellations_listener = MagicMock(SolveCancellationsListener)
+    cancellations_listener.start = AsyncMock()
+    cancellations_listener.stop = AsyncMock()
+
+    consumer = SolverInstanceConsumer(
+        await _mock_channel_with_messages(request),
+        algorithm_runner,
+        claims_service,
+        solution_reporter,
+        solution_suggestion_service,
+        config,
+        cancellations_listener,
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    client_cancellation = cancellations_listener.register.call_args.args[1]
+    assert not client_cancellation.is_set()
+    solution_reporter.report_solutions_complete.assert_called_once_with(knapsack_id)
+    solution_reporter.report_error.assert_not_called()
+    solution_suggestion_service.reject_suggested_solutions.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_solver_consumer_logs_failed_messages(config: Config, knapsack_id: str, monkeypatch):
+    request = SolverInstanceRequest(
+        items=[KnapsackItem(id=get_random_string(), value=1, volume=1)],
+        volume=1,
+        knapsack_id=knapsack_id,
+        algorithms=[Algorithms.FIRST_FIT],
+    )
+    logger = MagicMock()
+    monkeypatch.setattr("logic.consumer.solver_instance_consumer.logger", logger)
+    failure = ConnectionError("redis is gone")
+    claims_service = AsyncMock(ClaimsService)
+    claims_service.claim_running_knapsack = AsyncMock(side_effect=failure)
+
+    consumer = SolverInstanceConsumer(
+        await _mock_channel_with_messages(request),
+        MagicMock(AlgorithmRunner),
+        claims_service,
+        AsyncMock(SolutionReporter),
+        AsyncMock(SuggestedSolutionsService),
+        config,
+    )
+
+    async with consumer:
+        await consumer.start_consuming(config.solver_queue)
+
+    logger.error.assert_called_once_with("Failed processing solver message", exc_info=failure)
+
+
+def _algorithm_results(*solutions: list[KnapsackItem]):
+    async def iter_algorithms(items, volume, algorithms, deadline=None):
+        for index, solution in enumerate(solutions):
+            yield index, solution
+
+    return iter_algorithms
+
+
 async def _mock_channel_with_messages(*requests: SolverInstanceRequest):
     async def queue_iterator():
         for request in requests:
             message_mock = MagicMock()
             message_mock.body = request.json().encode()
+            message_mock.headers = {DEADLINE_HEADER: request.deadline} if request.deadline is not None else {}
             yield message_mock
 
     queue_mock = AsyncMock()
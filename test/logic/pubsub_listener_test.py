@@ -0,0 +1,56 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from logic.pubsub_listener import PubSubListener
+
+
+class RecordingListener(PubSubListener):
+    def __init__(self, redis, pattern: bool = False):
+        super().__init__(redis, "channel:*" if pattern else "channel", "Recording", pattern, 0)
+        self.handled: list[list[bytes]] = []
+
+    async def _handle_messages(self, messages: list[dict]) -> None:
+        self.handled.append([message["data"] for message in messages])
+
+
+def _pubsub(*messages):
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.psubscribe = AsyncMock()
+    pubsub.reset = AsyncMock()
+    pubsub.get_message = AsyncMock(side_effect=list(messages) + [None] * 100)
+    return pubsub
+
+
+@pytest.mark.asyncio
+async def test_pubsub_listener_handles_only_messages_of_its_subscription_kind():
+    redis = MagicMock()
+    redis.pubsub = MagicMock(
+        return_value=_pubsub({"type": "message", "data": b"a"}, {"type": "pmessage", "data": b"b"})
+    )
+    listener = RecordingListener(redis, pattern=True)
+    await listener._subscribe()
+
+    await listener._receive()
+
+    listener._pubsub.psubscribe.assert_called_once_with("channel:*")
+    assert listener.handled == [[b"b"]]
+
+
+@pytest.mark.asyncio
+async def test_pubsub_listener_resubscribes_after_failure():
+    failing = _pubsub(ConnectionError("connection reset"))
+    working = _pubsub({"type": "message", "data": b"a"})
+    redis = MagicMock()
+    redis.pubsub = MagicMock(side_effect=[failing, working])
+    listener = RecordingListener(redis)
+
+    await listener.start()
+    await asyncio.sleep(0.05)
+    await listener.stop()
+
+    failing.reset.assert_called_once()
+    working.subscribe.assert_called_once_with("channel")
+    assert listener.handled == [[b"a"]]
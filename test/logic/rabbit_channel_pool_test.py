@@ -0,0 +1,93 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import aio_pika.abc
+import pytest
+from pytest_mock import MockerFixture
+
+from logic.rabbit_channel_pool import RabbitChannelPool
+from models.config.rabbit_connection_params import RabbitConnectionParams
+
+
+def _mock_connection(mocker: MockerFixture) -> AsyncMock:
+    def new_channel():
+        async def close():
+            pass
+
+        channel = AsyncMock(aio_pika.abc.AbstractChannel)
+        channel.is_closed = False
+        channel.reopen = AsyncMock()
+        # aio_pika's pool inspects close for partials, a mock attribute would never end that lookup
+        channel.close = close
+        return channel
+
+    connection = AsyncMock(aio_pika.abc.AbstractRobustConnection)
+    connection.channel = AsyncMock(side_effect=lambda: new_channel())
+    mocker.patch("logic.rabbit_channel_pool.aio_pika.connect_robust", AsyncMock(return_value=connection))
+    return connection
+
+
+@pytest.mark.asyncio
+async def test_rabbit_channel_pool_reuses_connection_and_channels(mocker: MockerFixture):
+    connection = _mock_connection(mocker)
+    pool = RabbitChannelPool(RabbitConnectionParams("localhost", 5672, "guest", "guest"), 2)
+
+    async with pool.acquire() as first_channel:
+        async with pool.acquire():
+            assert pool.in_use_channels() == 2
+            assert pool.idle_channels() == 0
+    async with pool.acquire() as reused_channel:
+        assert pool.idle_channels() == 1
+
+    assert connection.channel.await_count == 2
+    assert pool.in_use_channels() == 0
+    await pool.close()
+    connection.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_rabbit_channel_pool_is_bounded(mocker: MockerFixture):
+    _mock_connection(mocker)
+    pool = RabbitChannelPool(RabbitConnectionParams("localhost", 5672, "guest", "guest"), 1)
+
+    acquired = asyncio.Event()
+
+    async def acquire_channel():
+        async with pool.acquire():
+            acquired.set()
+
+    async with pool.acquire():
+        waiting_acquire = asyncio.create_task(acquire_channel())
+        await asyncio.sleep(0.1)
+        assert not acquired.is_set()
+    await asyncio.wait_for(waiting_acquire, 1)
+    assert acquired.is_set()
+
+
+@pytest.mark.asyncio
+async def test_rabbit_channel_pool_reopens_closed_channel(mocker: MockerFixture):
+    connection = _mock_connection(mocker)
+    pool = RabbitChannelPool(RabbitConnectionParams("localhost", 5672, "guest", "guest"), 1)
+    async with pool.acquire() as channel:
+        channel.is_closed = True
+
+    async with pool.acquire() as reopened_channel:
+        reopened_channel.reopen.assert_awaited_once()
+
+    assert connection.channel.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_rabbit_channel_pool_logs_metrics_periodically(mocker: MockerFixture):
+    _mock_connection(mocker)
+    logger = mocker.patch("logic.rabbit_channel_pool.logger")
+    pool = RabbitChannelPool(RabbitConnectionParams("localhost", 5672, "guest", "guest"), 2, True, 0.05)
+
+    async with pool.acquire():
+        await asyncio.sleep(0.1)
+    await pool.close()
+
+    assert "1/2 channels in use, 0 idle" in logger.info.call_args.args[0]
+    logger.info.reset_mock()
+    await asyncio.sleep(0.1)
+    logger.info.assert_not_called()
@@ -0,0 +1,70 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import aioredis
+import pytest
+
+from logic.redis_connection_pool import MeteredConnectionPool
+
+
+def _connection_class():
+    def make_connection(**kwargs):
+        connection = MagicMock(aioredis.Connection)
+        connection.connect = AsyncMock()
+        connection.can_read = AsyncMock(return_value=False)
+        connection.pid = os.getpid()
+        return connection
+
+    return make_connection
+
+
+@pytest.mark.asyncio
+async def test_metered_connection_pool_counts_checkouts():
+    pool = MeteredConnectionPool(connection_class=_connection_class(), max_connections=2, metrics_enabled=True)
+
+    first = await pool.get_connection("GET")
+    await pool.get_connection("GET")
+    assert pool.in_use_connections() == 2
+    await pool.release(first)
+    await pool.disconnect()
+
+    assert pool.checkouts == 2
+    assert pool.in_use_connections() == 1
+
+
+@pytest.mark.asyncio
+async def test_metered_connection_pool_waits_for_released_connection():
+    pool = MeteredConnectionPool(
+        connection_class=_connection_class(), max_connections=1, timeout=1, metrics_enabled=True
+    )
+    connection = await pool.get_connection("GET")
+
+    waiting_checkout = asyncio.create_task(pool.get_connection("GET"))
+    await asyncio.sleep(0.1)
+    await pool.release(connection)
+
+    assert await waiting_checkout is connection
+    await pool.disconnect()
+    assert pool.max_checkout_seconds >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_metered_connection_pool_logs_metrics_periodically(monkeypatch):
+    logger = MagicMock()
+    monkeypatch.setattr("logic.redis_connection_pool.logger", logger)
+    pool = MeteredConnectionPool(
+        connection_class=_connection_class(),
+        max_connections=2,
+        metrics_enabled=True,
+        metrics_log_interval_seconds=0.05,
+    )
+
+    await pool.get_connection("GET")
+    await asyncio.sleep(0.1)
+    await pool.disconnect()
+
+    assert "1/2 connections in use, 1 checkouts" in logger.info.call_args.args[0]
+    logger.info.reset_mock()
+    await asyncio.sleep(0.1)
+    logger.info.assert_not_called()
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from logic.solution_report_waiter import SolutionReportWaiter
+from logic.solution_reports_listener import SolutionReportsListener
+from models.solution import SolutionReport, SolutionReportCause
+
+
+def _report_message(knapsack_id: str, cause: SolutionReportCause, is_final: bool = True) -> dict:
+    return {
+        "type": "pmessage",
+        "pattern": b"solutions:*",
+        "channel": f"solutions:{knapsack_id}".encode(),
+        "data": SolutionReport(cause=cause, is_final=is_final).json().encode(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_dispatch_reaches_every_waiter_of_the_knapsack():
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+    first, second, other = listener.register("a"), listener.register("a"), listener.register("b")
+
+    listener._dispatch(_report_message("a", SolutionReportCause.SOLUTION_FOUND))
+
+    assert first.get_nowait().cause == SolutionReportCause.SOLUTION_FOUND
+    assert second.get_nowait().cause == SolutionReportCause.SOLUTION_FOUND
+    assert other.empty()
+
+
+@pytest.mark.asyncio
+async def test_dispatch_ignores_unregistered_knapsacks():
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+    waiter = listener.register("a")
+    listener.unregister("a", waiter)
+
+    listener._dispatch(_report_message("a", SolutionReportCause.SOLUTION_FOUND))
+
+    assert waiter.empty()
+    assert listener._waiters == {}
+
+
+@pytest.mark.asyncio
+async def test_waiter_waits_for_final_report():
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+    async with SolutionReportWaiter(listener, "a", 1) as waiter:
+        listener._dispatch(_report_message("a", SolutionReportCause.SOLUTION_FOUND, is_final=False))
+        listener._dispatch(_report_message("a", SolutionReportCause.NO_ITEM_CLAIMED))
+
+        report = await waiter.wait_for_solution_report()
+
+    assert report.cause == SolutionReportCause.NO_ITEM_CLAIMED
+
+
+@pytest.mark.asyncio
+async def test_waiter_answers_with_partial_solution_at_deadline():
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+    async with SolutionReportWaiter(listener, "a", 1) as waiter:
+        listener._dispatch(_report_message("a", SolutionReportCause.SOLUTION_FOUND, is_final=False))
+
+        report = await waiter.wait_for_solution_report(answer_within_seconds=0.01)
+
+    assert report == SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND, is_final=False)
+
+
+@pytest.mark.asyncio
+async def test_waiter_deadline_without_solution_waits_for_timeout():
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+    async with SolutionReportWaiter(listener, "a", 0.05) as waiter:
+        asyncio.get_running_loop().call_later(
+            0.02, listener._dispatch, _report_message("a", SolutionReportCause.SOLUTION_FOUND, is_final=False)
+        )
+
+        report = await waiter.wait_for_solution_report(answer_within_seconds=0)
+
+    assert report == SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND, is_final=False)
+
+
+@pytest.mark.asyncio
+async def test_waiter_iterates_reports_until_final():
+    listener = SolutionReportsListener(MagicMock(), "solutions")
+    async with SolutionReportWaiter(listener, "a", 1) as waiter:
+        listener._dispatch(_report_message("a", SolutionReportCause.SOLUTION_FOUND, is_final=False))
+        listener._dispatch(_report_message("a", SolutionReportCause.SOLUTION_FOUND))
+        listener._dispatch(_report_message("a", SolutionReportCause.SOLUTION_FOUND, is_final=False))
+
+        reports = [report.is_final async for report in waiter.iter_solution_reports()]
+
+    assert reports == [False, True]
+
+
+@pytest.mark.asyncio
+async def test_waiter_marks_itself_waiting_while_entered():
+    redis = MagicMock()
+    redis.register_script = MagicMock(side_effect=lambda script: AsyncMock())
+    listener = SolutionReportsListener(redis, "solutions", waiters_ttl_seconds=1.5)
+
+    async with SolutionReportWaiter(listener, "a", 1):
+        listener._mark_waiting_script.assert_called_once_with(keys=["solutions_waiters:a"], args=[2])
+        listener._unmark_waiting_script.assert_not_called()
+
+    listener._unmark_waiting_script.assert_called_once_with(keys=["solutions_waiters:a"])
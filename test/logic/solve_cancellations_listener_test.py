@@ -0,0 +1,29 @@
+import threading
+from unittest.mock import MagicMock
+
+from logic.solve_cancellations_listener import SolveCancellationsListener
+
+
+def test_cancel_sets_every_cancellation_of_the_knapsack():
+    listener = SolveCancellationsListener(MagicMock(), "solve_cancellations")
+    first, second, other = threading.Event(), threading.Event(), threading.Event()
+    listener.register("a", first)
+    listener.register("a", second)
+    listener.register("b", other)
+
+    listener._cancel("a")
+
+    assert first.is_set() and second.is_set()
+    assert not other.is_set()
+
+
+def test_cancel_ignores_unregistered_knapsacks():
+    listener = SolveCancellationsListener(MagicMock(), "solve_cancellations")
+    cancellation = threading.Event()
+    listener.register("a", cancellation)
+    listener.unregister("a", cancellation)
+
+    listener._cancel("a")
+
+    assert not cancellation.is_set()
+    assert listener._cancellations == {}
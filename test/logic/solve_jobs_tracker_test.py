@@ -0,0 +1,51 @@
+import asyncio
+from contextlib import AsyncExitStack
+from unittest.mock import AsyncMock
+
+import pytest
+
+from logic.solution_report_waiter import SolutionReportWaiter
+from logic.solve_jobs_service import SolveJobsService
+from logic.solve_jobs_tracker import SolveJobsTracker
+from models.solution import SolutionReport, SolutionReportCause
+from models.solve_job import SolveJob
+
+
+@pytest.mark.asyncio
+async def test_tracker_completes_job_with_report_and_releases_waiter():
+    job = SolveJob(job_id="job", knapsack_id="knapsack")
+    report = SolutionReport(cause=SolutionReportCause.SOLUTION_FOUND)
+    waiter = AsyncMock(SolutionReportWaiter)
+    waiter.wait_for_solution_report = AsyncMock(return_value=report)
+    solve_jobs_service = AsyncMock(SolveJobsService)
+    tracker = SolveJobsTracker()
+
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(waiter)
+        tracker.track(job, waiter, stack.pop_all(), solve_jobs_service)
+    waiter.__aexit__.assert_not_called()
+    await asyncio.sleep(0.01)
+
+    solve_jobs_service.complete_job.assert_awaited_once_with(job, report)
+    waiter.__aexit__.assert_called_once()
+    assert tracker.tracked_jobs() == 0
+
+
+@pytest.mark.asyncio
+async def test_tracker_close_cancels_waiting_jobs():
+    async def wait_for_report_forever():
+        await asyncio.sleep(60)
+
+    waiter = AsyncMock(SolutionReportWaiter)
+    waiter.wait_for_solution_report = AsyncMock(side_effect=wait_for_report_forever)
+    solve_jobs_service = AsyncMock(SolveJobsService)
+    tracker = SolveJobsTracker()
+    stack = AsyncExitStack()
+    await stack.enter_async_context(waiter)
+
+    tracker.track(SolveJob(job_id="job", knapsack_id="knapsack"), waiter, stack, solve_jobs_service)
+    await asyncio.sleep(0)
+    await tracker.close()
+
+    solve_jobs_service.complete_job.assert_not_called()
+    waiter.__aexit__.assert_called_once()
@@ -1,6 +1,7 @@
 from ortools.algorithms import pywrapknapsack_solver
 
 from logic.solver.branch_and_bound_solver import BranchAndBoundSolver
+from logic.solver.deadline import Deadline
 from models.knapsack_item import KnapsackItem
 from test.utils import get_random_string
 
@@ -28,3 +29,13 @@ def test_knapsack_branch_and_bound_large():
     res = BranchAndBoundSolver().solve(items, capacity)
     total_sum = sum(i.value for i in res)
     assert total_sum == 83
+
+
+def test_branch_and_bound_proves_optimality_only_on_valid_input():
+    items = [
+        KnapsackItem(id=get_random_string(), volume=5, value=10),
+        KnapsackItem(id=get_random_string(), volume=4, value=12),
+    ]
+    assert BranchAndBoundSolver().solve_with_proof(items, 8, Deadline.after(10)).proved_optimal
+    items.append(KnapsackItem(id=get_random_string(), volume=1, value=-1))
+    assert BranchAndBoundSolver().solve_with_proof(items, 8, Deadline.after(10)) == ([], False)
@@ -0,0 +1,62 @@
+import random
+
+from logic.solver.deadline import Deadline
+from logic.solver.divide_and_conquer_dp_solver import DivideAndConquerDynamicProgrammingSolver
+from logic.solver.dynamic_programming_solver import DynamicProgrammingSolver
+from models.knapsack_item import KnapsackItem
+from test.utils import get_random_string
+
+
+def test_knapsack_divide_and_conquer_dp():
+    items = [
+        KnapsackItem(id=get_random_string(), volume=10, value=60),
+        KnapsackItem(id=get_random_string(), volume=20, value=100),
+        KnapsackItem(id=get_random_string(), volume=30, value=120),
+    ]
+    result = DivideAndConquerDynamicProgrammingSolver(leaf_table_cells=1).solve(items, 50)
+    assert result == [items[1], items[2]]
+
+
+def test_knapsack_divide_and_conquer_dp_empty():
+    assert DivideAndConquerDynamicProgrammingSolver(leaf_table_cells=1).solve([], 50) == []
+
+
+def test_knapsack_divide_and_conquer_dp_large():
+    values = [12, 24, 10, 8, 22, 9, 15, 14, 6, 18, 5, 25, 23, 21, 27, 28, 19, 13, 26, 11]
+    weights = [10, 15, 8, 7, 16, 7, 9, 8, 5, 13, 4, 18, 17, 14, 20, 21, 12, 9, 19, 6]
+    items = [KnapsackItem(id=get_random_string(), volume=weights[i], value=values[i]) for i in range(len(weights))]
+    res = DivideAndConquerDynamicProgrammingSolver(leaf_table_cells=1).solve(items, 50)
+    assert sum(i.volume for i in res) <= 50
+    assert sum(i.value for i in res) == 83
+
+
+def test_knapsack_divide_and_conquer_dp_matches_dp():
+    rng = random.Random(11)
+    for _ in range(20):
+        items = [
+            KnapsackItem(id=get_random_string(), volume=rng.randint(0, 60), value=rng.randint(-5, 100))
+            for _ in range(rng.randint(1, 40))
+        ]
+        capacity = rng.randint(0, 200)
+        res = DivideAndConquerDynamicProgrammingSolver(leaf_table_cells=rng.choice([1, 64, 512])).solve(items, capacity)
+        expected = DynamicProgrammingSolver().solve(items, capacity)
+        assert sum(i.volume for i in res) <= capacity
+        assert sum(i.value for i in res) == sum(i.value for i in expected)
+
+
+def test_knapsack_divide_and_conquer_dp_expired_deadline_fills_greedily():
+    items = [
+        KnapsackItem(id=get_random_string(), volume=5, value=10),
+        KnapsackItem(id=get_random_string(), volume=4, value=12),
+        KnapsackItem(id=get_random_string(), volume=3, value=3),
+        KnapsackItem(id=get_random_string(), volume=0, value=1),
+    ]
+    res = DivideAndConquerDynamicProgrammingSolver(leaf_table_cells=1).solve(items, 8, Deadline.after(0))
+    assert {i.id for i in res} == {items[1].id, items[2].id, items[3].id}
+
+
+def test_knapsack_divide_and_conquer_dp_proves_optimality_only_when_not_cut_short():
+    items = [KnapsackItem(id=get_random_string(), volume=i % 7 + 1, value=i % 5 + 1) for i in range(50)]
+    solver = DivideAndConquerDynamicProgrammingSolver(leaf_table_cells=64)
+    assert solver.solve_with_proof(items, 30, Deadline.after(10)).proved_optimal
+    assert not solver.solve_with_proof(items, 30, Deadline.after(0)).proved_optimal
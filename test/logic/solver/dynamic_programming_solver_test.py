@@ -1,3 +1,9 @@
+import random
+import threading
+from unittest.mock import MagicMock
+
+from logic.solver.branch_and_bound_solver import BranchAndBoundSolver
+from logic.solver.deadline import Deadline
 from logic.solver.dynamic_programming_solver import DynamicProgrammingSolver
 from models.knapsack_item import KnapsackItem
 from test.utils import get_random_string
@@ -27,3 +33,60 @@ def test_knapsack_dp_large():
     res = DynamicProgrammingSolver().solve(items, capacity)
     total_sum = sum(i.value for i in res)
     assert total_sum == 83
+
+
+def test_knapsack_dp_skips_non_positive_and_oversized_items():
+    items = [
+        KnapsackItem(id=get_random_string(), volume=1, value=-5),
+        KnapsackItem(id=get_random_string(), volume=2, value=0),
+        KnapsackItem(id=get_random_string(), volume=60, value=1000),
+        KnapsackItem(id=get_random_string(), volume=5, value=7),
+    ]
+    assert DynamicProgrammingSolver().solve(items, 50) == [items[3]]
+
+
+def test_knapsack_dp_matches_branch_and_bound():
+    rng = random.Random(7)
+    for _ in range(20):
+        items = [
+            KnapsackItem(id=get_random_string(), volume=rng.randint(1, 40), value=rng.randint(1, 100))
+            for _ in range(rng.randint(1, 14))
+        ]
+        capacity = rng.randint(1, 120)
+        res = DynamicProgrammingSolver().solve(items, capacity)
+        expected = BranchAndBoundSolver().solve(items, capacity)
+        assert sum(i.volume for i in res) <= capacity
+        assert sum(i.value for i in res) == sum(i.value for i in expected)
+
+
+def test_knapsack_dp_expired_deadline_returns_feasible_solution():
+    items = [KnapsackItem(id=get_random_string(), volume=i % 7 + 1, value=i % 5 + 1) for i in range(50)]
+    res = DynamicProgrammingSolver().solve(items, 30, Deadline.after(0))
+    assert res
+    assert sum(i.volume for i in res) <= 30
+    assert len({i.id for i in res}) == len(res)
+
+
+def test_knapsack_dp_proves_optimality_only_when_table_completes():
+    items = [KnapsackItem(id=get_random_string(), volume=i % 7 + 1, value=i % 5 + 1) for i in range(50)]
+    assert DynamicProgrammingSolver().solve_with_proof(items, 30, Deadline.after(10)).proved_optimal
+    assert not DynamicProgrammingSolver().solve_with_proof(items, 30, Deadline.after(0)).proved_optimal
+    cancellation = threading.Event()
+    cancellation.set()
+    assert not DynamicProgrammingSolver().solve_with_proof(items, 30, Deadline.after(10, cancellation)).proved_optimal
+
+
+def test_knapsack_dp_cut_short_tops_up_table_greedily():
+    items = [
+        KnapsackItem(id=get_random_string(), volume=5, value=10),
+        KnapsackItem(id=get_random_string(), volume=4, value=12),
+        KnapsackItem(id=get_random_string(), volume=3, value=3),
+        KnapsackItem(id=get_random_string(), volume=2, value=-1),
+    ]
+    deadline = MagicMock(Deadline)
+    # Only the densest item makes it into the table before the deadline expires
+    deadline.expired = MagicMock(side_effect=[False, True])
+
+    res = DynamicProgrammingSolver().solve(items, 8, deadline)
+
+    assert {i.id for i in res} == {items[1].id, items[2].id}
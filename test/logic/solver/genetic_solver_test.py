@@ -1,5 +1,8 @@
+import random
+
 import pytest
 
+from logic.solver.deadline import Deadline
 from logic.solver.genetic_solver import GeneticSolver
 from models.knapsack_item import KnapsackItem
 from test.utils import get_random_string
@@ -63,3 +66,36 @@ def test_genetic_solver_minimization(items):
     all_volumes_within_capacity_range = all(0 < r <= capacity for r in volumes)
     assert all_values_smaller_than_zero
     assert all_volumes_within_capacity_range
+
+
+def test_genetic_solver_many_items_within_capacity():
+    rng = random.Random(3)
+    items = [
+        KnapsackItem(id=get_random_string(), volume=rng.randint(1, 50), value=rng.randint(1, 50)) for _ in range(300)
+    ]
+    capacity = 500
+    res = GeneticSolver(400, 0.2, 100).solve(items, capacity)
+    assert 0 < sum(i.volume for i in res) <= capacity
+    assert len({i.id for i in res}) == len(res)
+
+
+def test_genetic_solver_initial_population_within_capacity():
+    items = [
+        KnapsackItem(id=get_random_string(), volume=10, value=1),
+        KnapsackItem(id=get_random_string(), volume=1, value=100),
+        KnapsackItem(id=get_random_string(), volume=1, value=100),
+        KnapsackItem(id=get_random_string(), volume=6, value=3),
+    ]
+    capacity = 8
+    population = GeneticSolver(10, 0.2, 50)._generate_population(50, items, capacity)
+    volumes = population.astype(int) @ [i.volume for i in items]
+    assert population.shape == (50, len(items))
+    assert all(volumes <= capacity)
+    assert not population[:, 0].any()
+
+
+def test_genetic_solver_expired_deadline_returns_initial_best():
+    items = [KnapsackItem(id=get_random_string(), volume=i % 9 + 1, value=i % 4 + 1) for i in range(40)]
+    capacity = 25
+    res = GeneticSolver(10**9, 0.2, 20).solve(items, capacity, Deadline.after(0))
+    assert 0 < sum(i.volume for i in res) <= capacity
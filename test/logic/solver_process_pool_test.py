@@ -0,0 +1,123 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from unittest.mock import MagicMock
+
+import pytest
+
+from component_factory import get_config
+from logic.solver.base_solver import SolverResult
+from logic.solver.deadline import Deadline
+from logic.solver_process_pool import SharedCancellation, SolverProcessPool, mark_task_started
+from models.algorithms import Algorithms
+from models.knapsack_item import KnapsackItem
+from test.utils import get_random_string
+
+
+@pytest.mark.asyncio
+async def test_solver_process_pool_solves_in_worker():
+    pool = SolverProcessPool(get_config(), 1, 10, 5)
+    items = [
+        KnapsackItem(id=get_random_string(), value=10, volume=5),
+        KnapsackItem(id=get_random_string(), value=6, volume=3),
+        KnapsackItem(id=get_random_string(), value=6, volume=3),
+    ]
+    try:
+        result = await pool.solve(Algorithms.DYNAMIC_PROGRAMMING, items, 6, Deadline.after(10))
+    finally:
+        pool.shutdown()
+
+    assert {i.id for i in result.items} == {items[1].id, items[2].id}
+    assert result.proved_optimal
+
+
+@pytest.mark.asyncio
+async def test_solver_process_pool_recycles_workers():
+    pool = SolverProcessPool(get_config(), 1, 1, 5)
+    items = [KnapsackItem(id=get_random_string(), value=10, volume=5)]
+    try:
+        await pool.solve(Algorithms.GREEDY, items, 6, Deadline.after(10))
+        first_executor = pool._executor
+        result = await pool.solve(Algorithms.GREEDY, items, 6, Deadline.after(10))
+        assert pool._executor is not first_executor
+    finally:
+        pool.shutdown()
+
+    assert result.items == items
+
+
+def _solve_ignoring_deadline_when_heavy(
+    algorithm, items, volume, deadline_at, cancellation, task_id, task_starts
+) -> SolverResult:
+    mark_task_started(task_starts, task_id)
+    if algorithm == Algorithms.GENETIC_HEAVY:
+        time.sleep(60)
+    time.sleep(max(deadline_at - time.time(), 0))
+    return SolverResult(items, False)
+
+
+@pytest.mark.asyncio
+async def test_solver_process_pool_overrun_spares_other_solves(monkeypatch):
+    monkeypatch.setattr("logic.solver_process_pool._solve", _solve_ignoring_deadline_when_heavy)
+    pool = SolverProcessPool(get_config(), 2, 10, 0.5)
+    items = [KnapsackItem(id=get_random_string(), value=10, volume=5)]
+    try:
+        await pool.solve(Algorithms.GREEDY, items, 6, Deadline.after(0))
+        overrun, healthy = await asyncio.gather(
+            pool.solve(Algorithms.GENETIC_HEAVY, items, 6, Deadline.after(0.5)),
+            pool.solve(Algorithms.GREEDY, items, 6, Deadline.after(3)),
+        )
+        await asyncio.sleep(0.5)
+        assert pool._in_flight == {}
+    finally:
+        pool.shutdown()
+
+    assert overrun == SolverResult([], False)
+    assert healthy.items == items
+
+
+@pytest.mark.asyncio
+async def test_solver_process_pool_grace_starts_when_solve_runs(monkeypatch):
+    monkeypatch.setattr("logic.solver_process_pool._solve", _solve_ignoring_deadline_when_heavy)
+    pool = SolverProcessPool(get_config(), 1, 10, 0.5)
+    items = [KnapsackItem(id=get_random_string(), value=10, volume=5)]
+    try:
+        await pool.solve(Algorithms.GREEDY, items, 6, Deadline.after(0))
+        # The second solve waits in the queue well past its own deadline plus grace
+        results = await asyncio.gather(
+            pool.solve(Algorithms.GREEDY, items, 6, Deadline.after(2)),
+            pool.solve(Algorithms.GREEDY, items, 6, Deadline.after(0.1)),
+        )
+    finally:
+        pool.shutdown()
+
+    assert [result.items for result in results] == [items, items]
+
+
+def test_shared_cancellation_answers_locally_and_forwards_set():
+    shared_event = MagicMock()
+    manager_calls = MagicMock(Executor)
+    cancellation = SharedCancellation(shared_event, manager_calls)
+
+    assert not cancellation.is_set()
+    cancellation.set()
+    cancellation.set()
+
+    assert cancellation.is_set()
+    shared_event.is_set.assert_not_called()
+    manager_calls.submit.assert_called_once_with(shared_event.set)
+
+
+@pytest.mark.asyncio
+async def test_solver_process_pool_workers_see_cancellation():
+    pool = SolverProcessPool(get_config(), 1, 10, 5)
+    items = [KnapsackItem(id=get_random_string(), value=i % 11 + 1, volume=i % 7 + 1) for i in range(200)]
+    try:
+        cancellation = await pool.create_cancellation()
+        cancellation.set()
+        result = await pool.solve(Algorithms.DYNAMIC_PROGRAMMING, items, 50, Deadline.after(10, cancellation))
+    finally:
+        pool.shutdown()
+
+    assert not result.proved_optimal
+    assert result.items
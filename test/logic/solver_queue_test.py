@@ -0,0 +1,26 @@
+import pytest
+
+from logic.solver_queue import get_solver_queue_name, get_solver_queue_names
+from models.algorithms import Algorithms
+
+
+@pytest.mark.parametrize(
+    "algorithms,expected_queue",
+    [
+        ([Algorithms.GREEDY, Algorithms.FIRST_FIT], "solver.light"),
+        ([Algorithms.GREEDY, Algorithms.GENETIC_LIGHT, Algorithms.GENETIC_HEAVY], "solver.heavy"),
+        ([Algorithms.GREEDY, Algorithms.GENETIC_HEAVY, Algorithms.DYNAMIC_PROGRAMMING], "solver.exact"),
+        ([Algorithms.BRANCH_AND_BOUND], "solver.exact"),
+    ],
+)
+def test_get_solver_queue_name_routes_to_most_demanding_algorithm_class(algorithms, expected_queue):
+    assert get_solver_queue_name("solver", True, algorithms) == expected_queue
+
+
+def test_get_solver_queue_name_uses_single_queue_when_not_per_algorithm_class():
+    assert get_solver_queue_name("solver", False, [Algorithms.GENETIC_HEAVY]) == "solver"
+    assert get_solver_queue_names("solver", False) == ["solver"]
+
+
+def test_get_solver_queue_names_per_algorithm_class():
+    assert get_solver_queue_names("solver", True) == ["solver.exact", "solver.heavy", "solver.light"]
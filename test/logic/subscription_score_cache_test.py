@@ -0,0 +1,45 @@
+from unittest.mock import MagicMock
+
+from logic.subscription_score_cache import CachedSubscriptionScore, SubscriptionScoreCache
+from models.subscription import SubscriptionScore
+
+
+def _cache(max_entries: int = 10, stale_seconds: float = 0) -> tuple[SubscriptionScoreCache, MagicMock]:
+    clock = MagicMock(return_value=0)
+    return SubscriptionScoreCache(max_entries, 10, 2, stale_seconds, clock), clock
+
+
+def test_cache_expires_entries():
+    cache, clock = _cache()
+    cache.set("found", SubscriptionScore.PREMIUM, True)
+    cache.set("not-found", SubscriptionScore.STANDARD, False)
+
+    clock.return_value = 5
+    assert cache.get("found") == CachedSubscriptionScore(SubscriptionScore.PREMIUM, False)
+    assert cache.get("not-found") is None
+
+    clock.return_value = 10
+    assert cache.get("found") is None
+
+
+def test_cache_serves_stale_entries_within_stale_window():
+    cache, clock = _cache(stale_seconds=5)
+    cache.set("a", SubscriptionScore.PREMIUM, True)
+
+    clock.return_value = 12
+    assert cache.get("a") == CachedSubscriptionScore(SubscriptionScore.PREMIUM, True)
+
+    clock.return_value = 15
+    assert cache.get("a") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache, _ = _cache(max_entries=2)
+    cache.set("a", SubscriptionScore.PREMIUM, True)
+    cache.set("b", SubscriptionScore.PREMIUM, True)
+    cache.get("a")
+    cache.set("c", SubscriptionScore.PREMIUM, True)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
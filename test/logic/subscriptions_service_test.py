@@ -1,9 +1,11 @@
+import asyncio
 from http import HTTPStatus
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from httpx import AsyncClient
 
+from logic.subscription_score_cache import SubscriptionScoreCache
 from logic.subscriptions_service import SubscriptionsService
 from models.subscription import SubscriptionScore
 
@@ -52,3 +54,40 @@ async def test_subscription_unknown_error():
 
     with pytest.raises(SubscriptionTestException):
         await SubscriptionsService(client).get_subscription_score("mock")
+
+
+def _subscription_client(*subscription_types: str) -> AsyncMock:
+    responses = []
+    for subscription_type in subscription_types:
+        resp = MagicMock()
+        resp.status_code = HTTPStatus.OK if subscription_type else HTTPStatus.NOT_FOUND
+        resp.json = MagicMock(return_value={"result": {"subscription_name": subscription_type}})
+        responses.append(resp)
+    client = AsyncMock(AsyncClient)
+    client.get = AsyncMock(side_effect=responses)
+    return client
+
+
+async def test_subscription_score_is_cached():
+    client = _subscription_client("Premium", None)
+    service = SubscriptionsService(client, SubscriptionScoreCache(10, 60, 60, 0))
+
+    assert await service.get_subscription_score("premium") == SubscriptionScore.PREMIUM
+    assert await service.get_subscription_score("premium") == SubscriptionScore.PREMIUM
+    assert await service.get_subscription_score("missing") == SubscriptionScore.STANDARD
+    assert await service.get_subscription_score("missing") == SubscriptionScore.STANDARD
+    assert client.get.await_count == 2
+
+
+async def test_stale_subscription_score_is_revalidated_in_background():
+    clock = MagicMock(return_value=0)
+    client = _subscription_client("Basic", "Premium")
+    service = SubscriptionsService(client, SubscriptionScoreCache(10, 60, 60, 300, clock))
+    await service.get_subscription_score("mock")
+
+    clock.return_value = 61
+    assert await service.get_subscription_score("mock") == SubscriptionScore.STANDARD
+    await asyncio.sleep(0)
+
+    assert await service.get_subscription_score("mock") == SubscriptionScore.PREMIUM
+    assert client.get.await_count == 2
@@ -0,0 +1,74 @@
+from typing import Optional
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from logic.suggested_solution_service import SuggestedSolutionsService
+from logic.suggestion_expiry_listener import SuggestionExpiryListener
+
+
+class StubPubSub:
+    def __init__(self, *expired_keys: str):
+        self._messages = [{"type": "message", "data": key.encode()} for key in expired_keys]
+
+    async def get_message(self, ignore_subscribe_messages: bool, timeout: float) -> Optional[dict]:
+        return self._messages.pop(0) if self._messages else None
+
+
+def _suggested_solution_service() -> SuggestedSolutionsService:
+    service = SuggestedSolutionsService(
+        MagicMock(), MagicMock(), MagicMock(), "hash", "list", "expiry", "accepted", "suggestion", 60
+    )
+    service.release_expired_suggestions = AsyncMock()
+    return service
+
+
+def _listener(service: SuggestedSolutionsService, batch_size: int = 10) -> SuggestionExpiryListener:
+    redis = MagicMock()
+    redis.connection_pool.connection_kwargs = {}
+    return SuggestionExpiryListener(redis, service, batch_size)
+
+
+@pytest.mark.asyncio
+async def test_collects_pending_expired_suggestions_in_one_batch():
+    service = _suggested_solution_service()
+    listener = _listener(service)
+    listener._pubsub = StubPubSub("suggestion:a", "suggestion_claims:a", "other:b", "suggestion:c")
+
+    await listener._receive()
+
+    service.release_expired_suggestions.assert_called_once_with(["a", "c"])
+
+
+@pytest.mark.asyncio
+async def test_limits_batch_size():
+    service = _suggested_solution_service()
+    listener = _listener(service, batch_size=2)
+    listener._pubsub = StubPubSub("suggestion:a", "suggestion:b", "suggestion:c")
+
+    for _ in range(3):
+        await listener._receive()
+
+    assert [call.args[0] for call in service.release_expired_suggestions.call_args_list] == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_enables_expired_events_keeping_existing_flags():
+    listener = _listener(_suggested_solution_service())
+    listener._redis.config_get = AsyncMock(return_value={"notify-keyspace-events": "Kg"})
+    listener._redis.config_set = AsyncMock()
+
+    await listener._enable_expired_events()
+
+    listener._redis.config_set.assert_called_once_with("notify-keyspace-events", "KgEx")
+
+
+@pytest.mark.asyncio
+async def test_keeps_enabled_expired_events():
+    listener = _listener(_suggested_solution_service())
+    listener._redis.config_get = AsyncMock(return_value={"notify-keyspace-events": "AE"})
+    listener._redis.config_set = AsyncMock()
+
+    await listener._enable_expired_events()
+
+    listener._redis.config_set.assert_not_called()